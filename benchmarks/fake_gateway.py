@@ -0,0 +1,185 @@
+"""
+Local stand-in for the AWS RAG API Gateway.
+
+Serves deterministic MQL5-looking snippets through an ``httpx.MockTransport``
+so benchmarks and tests exercise the real ``MQL5MCPServer`` request path
+(retries, hedging, circuit breaker, formatting) without touching AWS.
+Latency, errors and throttling are injected from a seeded RNG, so a run
+with the same settings is reproducible.
+"""
+
+import asyncio
+import gzip
+import importlib
+import importlib.util
+import json
+import random
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+
+
+@dataclass
+class GatewayProfile:
+    """Behaviour of the stand-in gateway.
+
+    Latencies are in seconds. Each request draws a base latency from a
+    log-normal distribution around ``latency_median``; with probability
+    ``cold_start_rate`` it instead takes ``cold_start_latency`` (a cold
+    Lambda). ``error_rate`` and ``throttle_rate`` are the chances of an HTTP
+    500 or 429 reply.
+
+    With ``compress`` the gateway honours the request's Accept-Encoding, and
+    with ``msgpack`` it answers in MessagePack when the request accepts it.
+    Encodings and formats whose package is not installed are never chosen.
+
+    ``body_seconds`` spreads sending a successful response body over that
+    long, one chunk per snippet, like a long documentation page coming
+    through a slow Lambda response stream.
+    """
+
+    latency_median: float = 0.05
+    latency_sigma: float = 0.3
+    cold_start_rate: float = 0.0
+    cold_start_latency: float = 1.5
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    snippets: int = 5
+    snippet_chars: int = 600
+    seed: int = 1234
+    compress: bool = False
+    msgpack: bool = False
+    body_seconds: float = 0.0
+
+
+@dataclass
+class GatewayStats:
+    """What the stand-in gateway saw during a run."""
+
+    requests: int = 0
+    cancelled: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    queries: Counter = field(default_factory=Counter)
+    bytes_sent: int = 0
+    payload_bytes: int = 0
+    encodings: Counter = field(default_factory=Counter)
+    formats: Counter = field(default_factory=Counter)
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    """Content encodings the stand-in can produce with the installed packages."""
+    compressors: Dict[str, Callable[[bytes], bytes]] = {"gzip": gzip.compress, "deflate": zlib.compress}
+    if importlib.util.find_spec("brotli") is not None:
+        compressors["br"] = importlib.import_module("brotli").compress
+    if importlib.util.find_spec("zstandard") is not None:
+        compressors["zstd"] = importlib.import_module("zstandard").ZstdCompressor().compress
+    return compressors
+
+
+COMPRESSORS = _compressors()
+MSGPACK = importlib.import_module("msgpack") if importlib.util.find_spec("msgpack") is not None else None
+
+
+class FakeGateway:
+    """Configurable fake RAG endpoint usable as an httpx transport."""
+
+    def __init__(self, profile: Optional[GatewayProfile] = None):
+        self.profile = profile or GatewayProfile()
+        self.stats = GatewayStats()
+        self._rng = random.Random(self.profile.seed)
+
+    def transport(self) -> httpx.MockTransport:
+        """Return a transport that routes every request to this gateway."""
+        return httpx.MockTransport(self.handle)
+
+    def _draw_latency(self) -> float:
+        profile = self.profile
+        if profile.cold_start_rate and self._rng.random() < profile.cold_start_rate:
+            return profile.cold_start_latency
+        return self._rng.lognormvariate(0, profile.latency_sigma) * profile.latency_median
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """Answer one request after the injected latency."""
+        self.stats.requests += 1
+        if request.method != "POST":
+            return self._respond(request, 403, {"message": "Missing Authentication Token"})
+
+        body = json.loads(request.content or b"{}")
+        query = str(body.get("query", ""))
+        self.stats.queries[query] += 1
+
+        latency = self._draw_latency()
+        roll = self._rng.random()
+        try:
+            await asyncio.sleep(latency)
+        except asyncio.CancelledError:
+            self.stats.cancelled += 1
+            raise
+
+        if roll < self.profile.error_rate:
+            return self._respond(request, 500, {"message": "Internal server error"})
+        if roll < self.profile.error_rate + self.profile.throttle_rate:
+            return self._respond(request, 429, {"message": "Too Many Requests"})
+        payload = self.payload(query, int(body.get("max_snippets", self.profile.snippets)))
+        return self._respond(request, 200, payload)
+
+    def payload(self, query: str, max_snippets: int) -> Dict[str, List[Dict[str, object]]]:
+        """Build a deterministic search response for ``query``."""
+        count = min(max_snippets, self.profile.snippets)
+        filler = f"{query} parameters, return value and example usage. "
+        text = (filler * (self.profile.snippet_chars // len(filler) + 1))[: self.profile.snippet_chars]
+        return {
+            "snippets": [
+                {
+                    "snippet": text,
+                    "source": f"https://www.mql5.com/en/docs/{query.lower().replace(' ', '_')}/{i}",
+                    "score": round(1.0 - i * 0.1, 2),
+                }
+                for i in range(count)
+            ]
+        }
+
+    def _respond(self, request: httpx.Request, status: int, payload: object) -> httpx.Response:
+        if self.profile.msgpack and MSGPACK is not None and "application/msgpack" in request.headers.get("accept", ""):
+            content_type = "application/msgpack"
+            content = MSGPACK.packb(payload)
+        else:
+            content_type = "application/json"
+            content = json.dumps(payload).encode("utf-8")
+
+        headers = {"Content-Type": content_type}
+        self.stats.payload_bytes += len(content)
+        encoding = self._negotiate_encoding(request)
+        if encoding != "identity":
+            content = COMPRESSORS[encoding](content)
+            headers["Content-Encoding"] = encoding
+
+        self.stats.statuses[status] += 1
+        self.stats.encodings[encoding] += 1
+        self.stats.formats[content_type] += 1
+        self.stats.bytes_sent += len(content)
+        if status == 200 and self.profile.body_seconds > 0:
+            return httpx.Response(status, content=self._drip(content), headers=headers)
+        return httpx.Response(status, content=content, headers=headers)
+
+    async def _drip(self, content: bytes) -> AsyncIterator[bytes]:
+        """Yield ``content`` in even chunks spread over ``body_seconds``."""
+        chunks = max(1, self.profile.snippets)
+        size = -(-len(content) // chunks)
+        for i in range(0, len(content), size):
+            if i:
+                await asyncio.sleep(self.profile.body_seconds / chunks)
+            yield content[i:i + size]
+
+    def _negotiate_encoding(self, request: httpx.Request) -> str:
+        """Pick the first encoding the client offers that this gateway can produce."""
+        if not self.profile.compress:
+            return "identity"
+        for offered in request.headers.get("accept-encoding", "").split(","):
+            encoding = offered.split(";", 1)[0].strip().lower()
+            if encoding in COMPRESSORS:
+                return encoding
+        return "identity"
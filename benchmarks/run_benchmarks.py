@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the MQL5 MCP Server.
+
+Drives ``MQL5MCPServer``'s MCP tool handler at a configurable concurrency
+against the local stand-in gateway in ``fake_gateway.py`` and reports
+p50/p95/p99 latency, throughput and memory for each scenario. Results are
+written as JSON so runs can be compared:
+
+    uv run python benchmarks/run_benchmarks.py --output bench.json
+    uv run python benchmarks/run_benchmarks.py --compare bench.json
+
+Runs fully offline; no API key or network access is needed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR))
+sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+
+import mcp.types as types  # noqa: E402
+from fake_gateway import FakeGateway, GatewayProfile  # noqa: E402
+from mql5_mcp_server import MQL5MCPServer  # noqa: E402
+
+GATEWAY_URL = "https://bench.execute-api.us-east-1.amazonaws.com/prod/rag"
+
+QUERY_POOL = [
+    "ArrayResize", "ArraySize", "ArrayFree", "ArraySetAsSeries", "OrderSend",
+    "MqlTradeRequest", "MqlTradeResult", "PositionSelect", "CopyBuffer", "CopyRates",
+    "iMA", "iRSI", "SymbolInfoDouble", "AccountInfoDouble", "ENUM_TIMEFRAMES",
+    "CTrade", "OnTick", "OnInit", "IndicatorSetInteger", "ObjectCreate",
+    "how to close all positions", "difference between OrderSend and CTrade",
+    "custom indicator buffers", "timer events in expert advisors",
+]
+
+
+@dataclass
+class Scenario:
+    """One benchmark run: server config, gateway behaviour and load shape."""
+
+    name: str
+    description: str
+    server_config: Dict[str, Any] = field(default_factory=dict)
+    gateway: GatewayProfile = field(default_factory=GatewayProfile)
+    requests: int = 200
+    concurrency: int = 8
+    tool: str = "search_mql5_docs"
+    unique_queries: int = len(QUERY_POOL)
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario(
+        name="baseline_uncached",
+        description="Every call reaches the gateway (cache off)",
+        server_config={"cache_enabled": False},
+    ),
+    Scenario(
+        name="cached_repeats",
+        description="Repeated queries served by the in-memory cache",
+        unique_queries=8,
+    ),
+    Scenario(
+        name="cold_starts",
+        description="5% of gateway calls hit a cold Lambda",
+        server_config={"cache_enabled": False, "timeout_seconds": 3},
+        gateway=GatewayProfile(cold_start_rate=0.05),
+    ),
+    Scenario(
+        name="cold_starts_hedged",
+        description="Cold starts with hedged requests enabled",
+        server_config={
+            "cache_enabled": False,
+            "timeout_seconds": 3,
+            "hedging_enabled": True,
+            "latency_min_samples": 10,
+        },
+        gateway=GatewayProfile(cold_start_rate=0.05),
+    ),
+    Scenario(
+        name="throttled",
+        description="10% of gateway calls answered with HTTP 429",
+        server_config={"cache_enabled": False, "retry_base_delay_seconds": 0.02},
+        gateway=GatewayProfile(throttle_rate=0.1),
+    ),
+    Scenario(
+        name="errors_circuit_breaker",
+        description="20% gateway errors tripping the circuit breaker",
+        server_config={"cache_enabled": False, "circuit_breaker_failures": 3},
+        gateway=GatewayProfile(error_rate=0.2),
+    ),
+    Scenario(
+        name="symbol_fast_path",
+        description="Identifier queries answered from the symbol table",
+        server_config={"cache_enabled": False, "symbol_lookup_enabled": True},
+    ),
+    Scenario(
+        name="wire_uncompressed",
+        description="Plain JSON responses, the reference for the wire scenarios",
+        server_config={"cache_enabled": False, "gateway_compression": [], "gateway_response_format": "json"},
+        gateway=GatewayProfile(snippets=10, snippet_chars=1500),
+    ),
+    Scenario(
+        name="wire_compressed",
+        description="Compressed JSON responses (best encoding both sides support)",
+        server_config={"cache_enabled": False, "gateway_response_format": "json"},
+        gateway=GatewayProfile(snippets=10, snippet_chars=1500, compress=True),
+    ),
+    Scenario(
+        name="wire_msgpack",
+        description="Compressed MessagePack responses (JSON if msgpack is missing)",
+        server_config={"cache_enabled": False, "gateway_response_format": "auto"},
+        gateway=GatewayProfile(snippets=10, snippet_chars=1500, compress=True, msgpack=True),
+    ),
+    Scenario(
+        name="long_pages",
+        description="Long pages whose bodies take 400 ms to arrive, read in one piece",
+        server_config={"cache_enabled": False, "gateway_response_format": "json"},
+        gateway=GatewayProfile(snippets=8, snippet_chars=4000, body_seconds=0.4),
+        requests=80,
+    ),
+    Scenario(
+        name="long_pages_streaming",
+        description="The same long pages streamed, snippets parsed as they arrive",
+        server_config={"cache_enabled": False, "gateway_response_format": "json", "streaming_enabled": True},
+        gateway=GatewayProfile(snippets=8, snippet_chars=4000, body_seconds=0.4),
+        requests=80,
+    ),
+    Scenario(
+        name="batch_fanout",
+        description="Batches of 6 queries through search_mql5_docs_batch",
+        server_config={"cache_enabled": False},
+        tool="search_mql5_docs_batch",
+        requests=40,
+        concurrency=2,
+    ),
+]
+
+
+def percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def build_server(scenario: Scenario, gateway: FakeGateway, workdir: Path) -> MQL5MCPServer:
+    """Create a server whose HTTP client talks to ``gateway``."""
+    os.environ.setdefault("MQL5_RAG_API_KEY", "benchmark-key")
+    config_path = workdir / f"{scenario.name}.yaml"
+    # The symbol fast path would answer most of QUERY_POOL without the
+    # gateway, so only the scenario that measures it turns it on
+    config = {"aws_api_gateway_url": GATEWAY_URL, "symbol_lookup_enabled": False, **scenario.server_config}
+    config_path.write_text(yaml.safe_dump(config), encoding="utf-8")
+
+    server = MQL5MCPServer(config_path=config_path)
+    server.http_client = server._create_http_client(transport=gateway.transport())
+    return server
+
+
+def tool_arguments(scenario: Scenario, rng: random.Random) -> Dict[str, Any]:
+    """Draw arguments for one tool call from the scenario's query pool."""
+    pool = QUERY_POOL[: scenario.unique_queries]
+    if scenario.tool == "search_mql5_docs_batch":
+        return {"queries": rng.sample(pool, min(6, len(pool)))}
+    return {"query": rng.choice(pool)}
+
+
+async def drive_load(server: MQL5MCPServer, scenario: Scenario, seed: int = 42) -> Dict[str, Any]:
+    """Call the server's tool handler ``scenario.requests`` times at fixed concurrency."""
+    handler = server.server.request_handlers[types.CallToolRequest]
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    outcomes: Counter = Counter()
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(scenario.requests):
+        queue.put_nowait(tool_arguments(scenario, rng))
+
+    async def worker() -> None:
+        while not queue.empty():
+            arguments = queue.get_nowait()
+            request = types.CallToolRequest(
+                method="tools/call",
+                params=types.CallToolRequestParams(name=scenario.tool, arguments=arguments),
+            )
+            started = time.perf_counter()
+            result = await handler(request)
+            latencies.append(time.perf_counter() - started)
+            for content in result.root.content:
+                text = getattr(content, "text", "")
+                outcomes["ok" if text.startswith("# MQL5 Documentation") else text[:60]] += 1
+
+    # Untimed call so one-off import and validator setup costs stay out of the numbers
+    await handler(types.CallToolRequest(
+        method="tools/call",
+        params=types.CallToolRequestParams(name="get_server_metrics", arguments={}),
+    ))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(scenario.concurrency)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "duration_s": round(duration, 4),
+        "throughput_rps": round(len(latencies) / duration, 2) if duration else None,
+        "latency_ms": {
+            "p50": _ms(percentile(latencies, 50)),
+            "p95": _ms(percentile(latencies, 95)),
+            "p99": _ms(percentile(latencies, 99)),
+            "max": _ms(latencies[-1] if latencies else None),
+            "mean": _ms(sum(latencies) / len(latencies) if latencies else None),
+        },
+        "outcomes": dict(outcomes),
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+async def run_scenario(scenario: Scenario, workdir: Path, trace_memory: bool = False) -> Dict[str, Any]:
+    """Run one scenario end to end and collect its report.
+
+    ``trace_memory`` adds the Python heap peak from ``tracemalloc``; it slows
+    every allocation, so latency figures from such runs are not comparable.
+    """
+    gateway = FakeGateway(scenario.gateway)
+    server = build_server(scenario, gateway, workdir)
+
+    heap_peak_mb = None
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        report = await drive_load(server, scenario)
+        phases = server.metrics.snapshot()["phases"]
+        if trace_memory:
+            heap_peak_mb = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 3)
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        if server.http_client is not None:
+            await server.http_client.aclose()
+        await server._close_disk_cache()
+
+    return {
+        "name": scenario.name,
+        "description": scenario.description,
+        "tool": scenario.tool,
+        "requests": scenario.requests,
+        "concurrency": scenario.concurrency,
+        "server_config": scenario.server_config,
+        "gateway_profile": asdict(scenario.gateway),
+        **report,
+        "gateway_requests": gateway.stats.requests,
+        "gateway_cancelled": gateway.stats.cancelled,
+        "gateway_statuses": {str(k): v for k, v in gateway.stats.statuses.items()},
+        "gateway_bytes": gateway.stats.bytes_sent,
+        "gateway_payload_bytes": gateway.stats.payload_bytes,
+        "gateway_encodings": dict(gateway.stats.encodings),
+        "gateway_formats": dict(gateway.stats.formats),
+        "bytes_per_response": round(gateway.stats.bytes_sent / gateway.stats.requests) if gateway.stats.requests else None,
+        "decode_ms": {
+            name.rsplit("_", 1)[0]: summary["mean_ms"]
+            for name, summary in phases.items() if name.endswith("_decode")
+        },
+        "first_snippet_ms": phases.get("first_snippet", {}).get("mean_ms"),
+        "python_heap_peak_mb": heap_peak_mb,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 2)
+
+
+async def run_benchmarks(
+    scenarios: List[Scenario],
+    requests: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    trace_memory: bool = False,
+) -> Dict[str, Any]:
+    """Run ``scenarios`` in order and return the full report."""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for scenario in scenarios:
+            if requests is not None:
+                scenario = replace(scenario, requests=requests)
+            if concurrency is not None:
+                scenario = replace(scenario, concurrency=concurrency)
+            print(f"Running {scenario.name}...", file=sys.stderr)
+            results.append(await run_scenario(scenario, Path(tmp), trace_memory))
+
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "trace_memory": trace_memory,
+        "scenarios": results,
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> str:
+    """Render per-scenario latency and throughput changes against a baseline."""
+    previous = {s["name"]: s for s in baseline.get("scenarios", [])}
+    lines = [f"{'scenario':<26}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}"]
+    for scenario in current["scenarios"]:
+        old = previous.get(scenario["name"])
+        if old is None:
+            continue
+        pairs = [(f"{p} ms", old["latency_ms"][p], scenario["latency_ms"][p]) for p in ("p50", "p95", "p99")]
+        pairs.append(("throughput rps", old["throughput_rps"], scenario["throughput_rps"]))
+        for metric, before, after in pairs:
+            if before is None or after is None:
+                continue
+            change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+            lines.append(f"{scenario['name']:<26}{metric:<16}{before:>12.2f}{after:>12.2f}{change:>10}")
+    return "\n".join(lines)
+
+
+def print_summary(report: Dict[str, Any]) -> None:
+    """Print a one-line summary per scenario to stderr."""
+    for s in report["scenarios"]:
+        latency = s["latency_ms"]
+        first_snippet = f" first_snippet={s['first_snippet_ms']:.2f}ms" if s.get("first_snippet_ms") is not None else ""
+        print(
+            f"{s['name']:<26} p50={latency['p50']:>8.2f}ms p95={latency['p95']:>8.2f}ms "
+            f"p99={latency['p99']:>8.2f}ms {s['throughput_rps']:>8.1f} req/s "
+            f"gateway={s['gateway_requests']:<5} bytes/resp={s['bytes_per_response']} rss={s['peak_rss_mb']}MB"
+            f"{first_snippet}",
+            file=sys.stderr
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark the MQL5 MCP Server against a local stand-in gateway")
+    parser.add_argument("--scenario", action="append", help="Run only the named scenario (repeatable)")
+    parser.add_argument("--requests", type=int, help="Override requests per scenario")
+    parser.add_argument("--concurrency", type=int, help="Override concurrency per scenario")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    parser.add_argument("--compare", type=Path, help="Compare against a previous JSON report")
+    parser.add_argument("--trace-memory", action="store_true", help="Also report the Python heap peak (slows the run)")
+    parser.add_argument("--log-level", default="WARNING", help="Server log level during the run")
+    parser.add_argument("--list", action="store_true", help="List scenarios and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for scenario in SCENARIOS:
+            print(f"{scenario.name:<26}{scenario.description}")
+        return 0
+
+    scenarios = SCENARIOS
+    if args.scenario:
+        known = {s.name: s for s in SCENARIOS}
+        unknown = [name for name in args.scenario if name not in known]
+        if unknown:
+            print(f"Unknown scenario(s): {', '.join(unknown)}", file=sys.stderr)
+            return 1
+        scenarios = [known[name] for name in args.scenario]
+
+    logging.getLogger().setLevel(getattr(logging, args.log_level.upper(), logging.WARNING))
+    report = asyncio.run(run_benchmarks(scenarios, args.requests, args.concurrency, args.trace_memory))
+    print_summary(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        print(compare_reports(baseline, report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Compare separate per-client servers against one shared daemon.
+
+Simulates several MCP clients (Claude Desktop windows, IDE plugins), each
+opening its own MCP session and searching the same query pool. In the
+``separate`` mode every client gets its own server, the way stdio launches
+work today. In the ``shared`` mode all clients are sessions of one daemon.
+Both modes talk MCP over a localhost socket to the stand-in gateway, so
+only the sharing differs:
+
+    uv run python benchmarks/shared_daemon.py --clients 4 --requests 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from mcp import ClientSession
+
+from run_benchmarks import QUERY_POOL, Scenario, _ms, build_server, percentile  # noqa: E402
+from fake_gateway import FakeGateway, GatewayProfile  # noqa: E402
+from mql5_daemon import open_connection, socket_transport  # noqa: E402
+from mql5_mcp_server import MQL5MCPServer  # noqa: E402
+
+
+async def start_daemon(scenario: Scenario, gateway: FakeGateway, workdir: Path) -> MQL5MCPServer:
+    """Build a server and start its daemon listener on a free localhost port."""
+    server = build_server(scenario, gateway, workdir)
+    server.daemon = server._create_daemon()
+    await server.daemon.start()
+    return server
+
+
+async def run_client(address: str, requests: int, seed: int, latencies: List[float]) -> None:
+    """One simulated client: a single MCP session making ``requests`` searches."""
+    rng = random.Random(seed)
+    reader, writer = await open_connection(address)
+    async with socket_transport(reader, writer) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            for _ in range(requests):
+                started = time.perf_counter()
+                await session.call_tool("search_mql5_docs", {"query": rng.choice(QUERY_POOL)})
+                latencies.append(time.perf_counter() - started)
+    writer.close()
+
+
+async def run_mode(shared: bool, clients: int, requests: int, profile: GatewayProfile) -> Dict[str, Any]:
+    """Run every client against one daemon (``shared``) or a daemon each."""
+    scenario = Scenario(
+        name="shared" if shared else "separate",
+        description="",
+        server_config={"daemon_address": "127.0.0.1:0", "daemon_idle_timeout_seconds": 0},
+        gateway=profile,
+    )
+    gateway = FakeGateway(profile)
+    latencies: List[float] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        servers = [await start_daemon(scenario, gateway, Path(tmp)) for _ in range(1 if shared else clients)]
+        serving = [asyncio.create_task(server.daemon.serve()) for server in servers]
+        addresses = [servers[0 if shared else i].daemon.address for i in range(clients)]
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(*(
+                run_client(address, requests, seed, latencies) for seed, address in enumerate(addresses)
+            ))
+        finally:
+            duration = time.perf_counter() - started
+            for task in serving:
+                task.cancel()
+            await asyncio.gather(*serving, return_exceptions=True)
+            for server in servers:
+                if server.http_client is not None:
+                    await server.http_client.aclose()
+
+    latencies.sort()
+    return {
+        "mode": scenario.name,
+        "servers": len(servers),
+        "clients": clients,
+        "requests": len(latencies),
+        "duration_s": round(duration, 4),
+        "latency_ms": {
+            "p50": _ms(percentile(latencies, 50)),
+            "p95": _ms(percentile(latencies, 95)),
+            "p99": _ms(percentile(latencies, 99)),
+        },
+        "gateway_requests": gateway.stats.requests,
+    }
+
+
+def main(argv: Any = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Compare per-client servers with one shared daemon")
+    parser.add_argument("--clients", type=int, default=4, help="Simulated MCP clients")
+    parser.add_argument("--requests", type=int, default=50, help="Searches per client")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    profile = GatewayProfile()
+    report = {
+        "modes": [
+            asyncio.run(run_mode(shared, args.clients, args.requests, profile))
+            for shared in (False, True)
+        ]
+    }
+    for mode in report["modes"]:
+        latency = mode["latency_ms"]
+        print(
+            f"{mode['mode']:<10} servers={mode['servers']:<3} p50={latency['p50']:>8.2f}ms "
+            f"p95={latency['p95']:>8.2f}ms gateway={mode['gateway_requests']}",
+            file=sys.stderr
+        )
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Time offline replays of the cache and gateway policy simulator.
+
+Builds a synthetic trace with a skewed query popularity, like real search
+traffic, and replays it against several cache policies with and without
+the client rate limit and circuit breaker, reporting the seconds each
+replay takes:
+
+    uv run python benchmarks/simulator_replay.py --searches 300000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent / "src"))
+
+from mql5_simulator import CachePolicy, GatewaySettings, LatencyModel, simulate  # noqa: E402
+from mql5_trace import TraceEntry  # noqa: E402
+
+POLICIES = ["none", "lru:1000:3600", "lfu:1000:3600", "lru:10000:0"]
+
+
+def synthetic_trace(searches: int, distinct: int, seed: int = 42) -> List[TraceEntry]:
+    """``searches`` searches over ``distinct`` queries with Zipf-like popularity."""
+    rng = random.Random(seed)
+    queries = [f"query{i}" for i in range(distinct)]
+    weights = [1 / (rank + 1) for rank in range(distinct)]
+    picks = rng.choices(queries, weights=weights, k=searches)
+    return [TraceEntry(t=i * 0.05, q=q, n=5, ms=150.0, o="gateway") for i, q in enumerate(picks)]
+
+
+def main(argv: Any = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Time simulator replays of a synthetic trace")
+    parser.add_argument("--searches", type=int, default=300_000, help="Searches in the trace")
+    parser.add_argument("--distinct", type=int, default=20_000, help="Distinct queries in the trace")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    entries = synthetic_trace(args.searches, args.distinct)
+    latency = LatencyModel.from_entries(entries)
+    gateways = {
+        "cache only": GatewaySettings(),
+        "rate limit and breaker": GatewaySettings(rate_limit=(10.0, 20.0), breaker={"failure_threshold": 5}),
+    }
+    runs: List[Dict[str, Any]] = []
+    for gateway_name, gateway in gateways.items():
+        for spec in POLICIES:
+            started = time.perf_counter()
+            result = simulate(entries, CachePolicy.parse(spec), latency, gateway)
+            seconds = time.perf_counter() - started
+            runs.append({"policy": spec, "gateway": gateway_name, "seconds": round(seconds, 3),
+                         "hit_rate": round(result.hit_rate, 4)})
+            print(f"{spec:<16}{gateway_name:<24}{seconds:>8.2f}s  hit rate {result.hit_rate:.1%}", file=sys.stderr)
+
+    if args.output:
+        report = {"searches": args.searches, "distinct": args.distinct, "runs": runs}
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
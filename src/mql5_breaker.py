@@ -0,0 +1,181 @@
+"""
+Circuit breaker for the MQL5 MCP Server's gateway endpoints.
+
+A breaker is closed while its endpoint is healthy. It opens once enough
+recent searches have failed at a high enough rate, measured over a sliding
+time window rather than as a run of consecutive failures. After a cooldown
+it turns half-open and lets a limited number of probe requests through:
+a successful probe closes it again, a failed one reopens it with twice
+the cooldown, up to a maximum. Short outages therefore cost seconds of
+search instead of a fixed five minutes, while a backend that stays down
+is probed less and less often.
+"""
+
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when no circuit breaker lets a request through."""
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open state machine with a sliding error window.
+
+    ``on_transition`` is called with the new state after every change.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        window_seconds: float = 60.0,
+        base_cooldown_seconds: float = 5.0,
+        max_cooldown_seconds: float = 300.0,
+        half_open_probes: int = 1,
+        probe_timeout_seconds: float = 10.0,
+        on_transition: Optional[Callable[[str], None]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if half_open_probes < 1:
+            raise ValueError("half_open_probes must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.window_seconds = window_seconds
+        self.base_cooldown_seconds = base_cooldown_seconds
+        self.max_cooldown_seconds = max(max_cooldown_seconds, base_cooldown_seconds)
+        self.half_open_probes = half_open_probes
+        self.probe_timeout_seconds = probe_timeout_seconds
+        self.cooldown_seconds = base_cooldown_seconds
+        self.trips = 0
+        self._state = CLOSED
+        self._open_until = 0.0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._probes: Deque[float] = deque()
+        self._on_transition = on_transition
+        self._clock = clock
+
+    @property
+    def state(self) -> str:
+        """Current state; an open breaker turns half-open once its cooldown has passed."""
+        if self._state == OPEN and self._clock() >= self._open_until:
+            self._probes.clear()
+            self._transition(HALF_OPEN)
+        return self._state
+
+    @property
+    def failure_count(self) -> int:
+        """Failed searches within the sliding window."""
+        self._prune(self._clock())
+        return self._failures
+
+    def can_request(self) -> bool:
+        """Check whether a request would be let through right now, without taking a probe slot."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        self._expire_probes(self._clock())
+        return len(self._probes) < self.half_open_probes
+
+    def acquire(self) -> bool:
+        """Let a request through, taking a probe slot when half-open."""
+        if not self.can_request():
+            return False
+        if self._state == HALF_OPEN:
+            self._probes.append(self._clock())
+        return True
+
+    def release(self) -> None:
+        """Give back the probe slot of a request that was abandoned, recording no outcome."""
+        if self._state == HALF_OPEN and self._probes:
+            self._probes.pop()
+
+    def record_success(self) -> None:
+        """Record a successful search; a successful probe closes the breaker."""
+        now = self._clock()
+        self._record(now, failed=False)
+        if self.state == HALF_OPEN:
+            self.cooldown_seconds = self.base_cooldown_seconds
+            self._outcomes.clear()
+            self._failures = 0
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a failed search, opening the breaker if the window says so."""
+        now = self._clock()
+        self._record(now, failed=True)
+        state = self.state
+        if state == HALF_OPEN:
+            self.cooldown_seconds = min(self.max_cooldown_seconds, self.cooldown_seconds * 2)
+            self._open(now)
+        elif state == CLOSED and self._should_trip():
+            self.cooldown_seconds = self.base_cooldown_seconds
+            self._open(now)
+
+    def error_rate(self) -> float:
+        """Share of failed searches within the sliding window."""
+        self._prune(self._clock())
+        return self._failures / len(self._outcomes) if self._outcomes else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the breaker state for monitoring."""
+        state = self.state
+        now = self._clock()
+        return {
+            "state": state,
+            "failure_count": self.failure_count,
+            "window_requests": len(self._outcomes),
+            "window_error_rate": round(self.error_rate(), 4),
+            "cooldown_seconds": self.cooldown_seconds,
+            "retry_in_seconds": round(max(0.0, self._open_until - now), 3) if state == OPEN else 0.0,
+            "trips": self.trips,
+        }
+
+    def _should_trip(self) -> bool:
+        return (
+            self._failures >= self.failure_threshold
+            and self._failures / len(self._outcomes) >= self.error_rate_threshold
+        )
+
+    def _open(self, now: float) -> None:
+        self._open_until = now + self.cooldown_seconds
+        self._probes.clear()
+        self.trips += 1
+        self._transition(OPEN)
+
+    def _record(self, now: float, failed: bool) -> None:
+        if self._state == HALF_OPEN and self._probes:
+            self._probes.popleft()
+        self._outcomes.append((now, failed))
+        if failed:
+            self._failures += 1
+        self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        while self._outcomes and self._outcomes[0][0] <= horizon:
+            _, failed = self._outcomes.popleft()
+            if failed:
+                self._failures -= 1
+
+    def _expire_probes(self, now: float) -> None:
+        # Probes whose outcome never arrived (cancelled, or charged to
+        # another endpoint after a retry) free their slot eventually
+        while self._probes and now - self._probes[0] >= self.probe_timeout_seconds:
+            self._probes.popleft()
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        if self._on_transition is not None:
+            self._on_transition(state)
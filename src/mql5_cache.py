@@ -0,0 +1,168 @@
+"""
+In-process result cache for the MQL5 MCP Server.
+
+Bounded cache with per-entry TTL that sits in front of the AWS RAG gateway,
+so repeated lookups within one session are answered without a network
+round trip.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Supported eviction policies: "lru" refreshes an entry on every hit,
+# "fifo" evicts strictly in insertion order, "lfu" evicts the entry with
+# the fewest hits (the least recently used of those on a tie).
+EVICTION_POLICIES = ("lru", "fifo", "lfu")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query for use as a cache key.
+
+    Collapses runs of whitespace and case-folds the text so that
+    "ArrayResize", " arrayresize " and "ARRAYRESIZE" share one entry.
+    """
+    return " ".join(query.split()).casefold()
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counters as a plain dictionary."""
+        return asdict(self)
+
+
+class ResultCache:
+    """
+    Bounded in-memory cache with TTL expiry.
+
+    Entries are stored in an ``OrderedDict`` so every eviction policy runs
+    in O(1): the oldest (FIFO) or least recently used (LRU) entry is always
+    at the front. LFU additionally keeps one insertion-ordered bucket of
+    keys per hit count.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        eviction_policy: str = "lru",
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Create an empty cache.
+
+        Args:
+            max_entries: Maximum number of entries kept before evicting
+            ttl_seconds: Lifetime of an entry; 0 or less disables expiry
+            eviction_policy: One of ``EVICTION_POLICIES``
+            clock: Monotonic time source, injectable for testing
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if eviction_policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {eviction_policy}")
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.eviction_policy = eviction_policy
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        # LFU only: hit count per key and keys per hit count
+        self._frequency: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}
+        self._min_frequency = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key) is not None
+
+    def _lookup(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """Return the live entry for ``key``, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at = entry[0]
+        if self.ttl_seconds > 0 and self._clock() >= expires_at:
+            self._remove(key)
+            self.stats.expirations += 1
+            return None
+        return entry
+
+    def _remove(self, key: Hashable) -> None:
+        del self._entries[key]
+        if self.eviction_policy == "lfu":
+            frequency = self._frequency.pop(key)
+            bucket = self._buckets[frequency]
+            del bucket[key]
+            if not bucket:
+                del self._buckets[frequency]
+
+    def _count_hit(self, key: Hashable) -> None:
+        frequency = self._frequency[key]
+        bucket = self._buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+        self._frequency[key] = frequency + 1
+        self._buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def _evict(self) -> None:
+        if self.eviction_policy == "lfu":
+            # Expired or replaced entries can leave the minimum stale
+            if self._min_frequency not in self._buckets:
+                self._min_frequency = min(self._buckets)
+            key = next(iter(self._buckets[self._min_frequency]))
+            self._remove(key)
+        else:
+            self._entries.popitem(last=False)
+        self.stats.evictions += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for ``key`` or None on a miss."""
+        entry = self._lookup(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        self.stats.hits += 1
+        if self.eviction_policy == "lru":
+            self._entries.move_to_end(key)
+        elif self.eviction_policy == "lfu":
+            self._count_hit(key)
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting old entries if full."""
+        expires_at = self._clock() + self.ttl_seconds
+        # A refreshed entry keeps its LFU hit count
+        frequency = 0
+        if key in self._entries:
+            frequency = self._frequency.get(key, 0)
+            self._remove(key)
+        # Evict before inserting so LFU never picks the new entry
+        while len(self._entries) >= self.max_entries:
+            self._evict()
+        self._entries[key] = (expires_at, value)
+        if self.eviction_policy == "lfu":
+            self._frequency[key] = frequency
+            self._buckets.setdefault(frequency, OrderedDict())[key] = None
+            self._min_frequency = min(self._min_frequency, frequency)
+
+    def clear(self) -> None:
+        """Drop every entry; statistics are kept."""
+        self._entries.clear()
+        self._frequency.clear()
+        self._buckets.clear()
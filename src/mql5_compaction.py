@@ -0,0 +1,194 @@
+"""
+Search result compaction for the MQL5 MCP Server.
+
+Tool responses end up in the model's context, so every redundant snippet
+costs tokens on every later turn. Before rendering, snippets are:
+
+1. de-duplicated: a snippet whose word shingles are mostly contained in a
+   higher-scoring snippet is merged into it (its source is kept as a
+   cross-reference);
+2. trimmed to a character budget in score order, truncating at most one
+   snippet at a word boundary; and
+3. grouped by source so each page is introduced once.
+
+With at most a few dozen snippets per response, exact shingle sets are
+cheaper than MinHash signatures and give exact similarities.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+SHINGLE_WORDS = 3
+
+# Chars per token for budget estimates; close for English prose and code
+CHARS_PER_TOKEN = 4
+
+# A truncated snippet shorter than this is more noise than help
+MIN_TRUNCATED_CHARS = 200
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@dataclass
+class CompactSnippet:
+    """One snippet that survived de-duplication."""
+
+    text: str
+    source: str
+    score: float
+    also_in: List[str] = field(default_factory=list)
+    truncated: bool = False
+    shingles: FrozenSet[Tuple[str, ...]] = field(default_factory=frozenset, repr=False)
+
+
+@dataclass
+class SourceGroup:
+    """Snippets from one source, highest score first."""
+
+    source: str
+    score: float
+    snippets: List[CompactSnippet]
+
+
+@dataclass
+class CompactionResult:
+    """Grouped snippets plus what compaction removed."""
+
+    groups: List[SourceGroup]
+    duplicates: int = 0
+    omitted: int = 0
+    truncated: int = 0
+
+
+def shingle_set(text: str, size: int = SHINGLE_WORDS) -> FrozenSet[Tuple[str, ...]]:
+    """Return the set of lower-cased ``size``-word shingles in ``text``."""
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return frozenset([tuple(words)]) if words else frozenset()
+    return frozenset(tuple(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def containment(kept: FrozenSet[Tuple[str, ...]], candidate: FrozenSet[Tuple[str, ...]]) -> float:
+    """Share of ``candidate``'s shingles that ``kept`` already covers.
+
+    Not symmetric: a longer candidate that only quotes ``kept`` scores low,
+    so its extra text is never merged away.
+    """
+    if not kept or not candidate:
+        return 0.0
+    return len(kept & candidate) / len(candidate)
+
+
+def remove_near_duplicates(
+    snippets: List[CompactSnippet], threshold: float
+) -> Tuple[List[CompactSnippet], int]:
+    """Merge each snippet into an earlier one it mostly duplicates.
+
+    ``snippets`` must be sorted by descending score, so the kept copy is
+    always the better-ranked one.
+
+    Returns:
+        The kept snippets and how many were merged away
+    """
+    kept: List[CompactSnippet] = []
+    for snippet in snippets:
+        snippet.shingles = shingle_set(snippet.text)
+        original = next(
+            (k for k in kept if containment(k.shingles, snippet.shingles) >= threshold),
+            None
+        )
+        if original is None:
+            kept.append(snippet)
+        elif snippet.source != original.source and snippet.source not in original.also_in:
+            original.also_in.append(snippet.source)
+    return kept, len(snippets) - len(kept)
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """Cut ``text`` to at most ``max_chars`` at a word boundary, marking the cut."""
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars - 2)
+    if cut <= 0:
+        cut = max_chars - 2
+    return text[:cut].rstrip() + " …"
+
+
+def fit_to_budget(
+    snippets: List[CompactSnippet], max_chars: int
+) -> Tuple[List[CompactSnippet], int, int]:
+    """Keep the best-scoring snippets whose text fits in ``max_chars``.
+
+    Snippets that do not fit are skipped, except that one may be truncated
+    when enough budget is left for it to be useful.
+
+    Returns:
+        The selected snippets, how many were omitted and how many truncated
+    """
+    selected: List[CompactSnippet] = []
+    remaining = max_chars
+    truncated = 0
+    for snippet in snippets:
+        if len(snippet.text) <= remaining:
+            selected.append(snippet)
+            remaining -= len(snippet.text)
+        elif not truncated and remaining >= MIN_TRUNCATED_CHARS:
+            snippet.text = truncate_text(snippet.text, remaining)
+            snippet.truncated = True
+            selected.append(snippet)
+            remaining -= len(snippet.text)
+            truncated = 1
+    return selected, len(snippets) - len(selected), truncated
+
+
+def group_by_source(snippets: List[CompactSnippet]) -> List[SourceGroup]:
+    """Group snippets by source, ordering groups by their best snippet."""
+    groups: Dict[str, SourceGroup] = {}
+    for snippet in snippets:
+        group = groups.get(snippet.source)
+        if group is None:
+            groups[snippet.source] = SourceGroup(snippet.source, snippet.score, [snippet])
+        else:
+            group.snippets.append(snippet)
+    return list(groups.values())
+
+
+def compact_snippets(
+    raw_snippets: List[Dict[str, Any]],
+    max_snippets: int,
+    dedupe_threshold: float = 0.8,
+    max_tokens: Optional[int] = None,
+) -> CompactionResult:
+    """Run the full compaction pipeline on gateway-format snippets.
+
+    Args:
+        raw_snippets: ``{"snippet", "source", "score"}`` dictionaries
+        max_snippets: Snippets considered, best first
+        dedupe_threshold: Shingle containment at which snippets merge; 0 disables
+        max_tokens: Estimated token budget for snippet text; None or 0 disables
+    """
+    snippets = [
+        CompactSnippet(
+            text=str(raw.get("snippet", "")),
+            source=str(raw.get("source", "Unknown")),
+            score=float(raw.get("score", 0.0)),
+        )
+        for raw in raw_snippets[:max_snippets]
+    ]
+    snippets.sort(key=lambda s: s.score, reverse=True)
+
+    duplicates = 0
+    if dedupe_threshold > 0:
+        snippets, duplicates = remove_near_duplicates(snippets, dedupe_threshold)
+
+    omitted = truncated = 0
+    if max_tokens:
+        snippets, omitted, truncated = fit_to_budget(snippets, max_tokens * CHARS_PER_TOKEN)
+
+    return CompactionResult(
+        groups=group_by_source(snippets),
+        duplicates=duplicates,
+        omitted=omitted,
+        truncated=truncated,
+    )
@@ -0,0 +1,67 @@
+"""
+Pre-validated configuration snapshots for fast server startup.
+
+Parsing ``config.yaml`` needs PyYAML's pure-Python loader and a full
+pydantic validation pass on every launch, and Claude Desktop launches the
+server once per session. After a successful load the validated settings
+are written as JSON next to the config file. Later launches reuse them
+as long as the config file's contents and the settings schema are
+unchanged; hashing a few kilobytes costs microseconds, and unlike an mtime
+check it cannot miss two edits made within one timestamp tick.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def snapshot_path(config_path: Path) -> Path:
+    """Return the snapshot location for ``config_path``."""
+    return config_path.with_name(f".{config_path.name}.snapshot.json")
+
+
+def _source_digest(config_path: Path) -> str:
+    return hashlib.sha256(config_path.read_bytes()).hexdigest()
+
+
+def load_snapshot(config_path: Path, fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Return the snapshotted settings if they are still current, else None."""
+    try:
+        with open(snapshot_path(config_path), "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        current = _source_digest(config_path)
+    except (OSError, ValueError):
+        return None
+
+    if (
+        not isinstance(snapshot, dict)
+        or snapshot.get("version") != SNAPSHOT_FORMAT_VERSION
+        or snapshot.get("fingerprint") != fingerprint
+        or snapshot.get("source") != current
+    ):
+        return None
+    return snapshot.get("config")
+
+
+def save_snapshot(config_path: Path, fingerprint: str, config: Dict[str, Any]) -> None:
+    """Write a snapshot of validated settings; failures are logged and ignored."""
+    path = snapshot_path(config_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        snapshot = {
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "source": _source_digest(config_path),
+            "config": config,
+        }
+        tmp_path.write_text(json.dumps(snapshot), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.debug(f"Could not write config snapshot {path}: {e}")
@@ -0,0 +1,468 @@
+"""
+Shared local daemon for the MQL5 MCP Server.
+
+Every MCP client normally launches its own server over stdio, so each
+Claude Desktop window or IDE integration has its own HTTP connections,
+circuit breakers, caches and rate limits. In daemon mode one long-lived
+server listens on a Unix socket (a localhost TCP port where Unix sockets
+are unavailable) and serves every client as a separate MCP session, so
+they all share that state.
+
+Clients keep launching the server over stdio. Started with ``--connect``,
+that process is only a shim: it relays stdin and stdout to the daemon,
+starting the daemon first if nothing is listening. Both sides use the
+stdio framing of one JSON-RPC message per line, so the shim never parses
+MCP messages.
+
+A Unix socket is only accessible to its owner. A TCP port is open to every
+local user, so a TCP daemon writes a random token to a file only its user
+can read, and a connection must send that token as its first line before
+it gets a session.
+"""
+
+import asyncio
+import contextlib
+import errno
+import getpass
+import hmac
+import logging
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import (
+    IO,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import anyio
+import anyio.lowlevel
+import mcp.types as types
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from mcp.shared.message import SessionMessage
+
+logger = logging.getLogger(__name__)
+
+# Without Unix sockets each user gets a port of their own in this range
+TCP_PORT_BASE = 49152
+TCP_PORT_RANGE = 16384
+
+# asyncio's default line limit is 64 KiB; batch results can be larger
+STREAM_LIMIT = 16 * 1024 * 1024
+
+# Time a TCP connection has to present the token
+AUTH_TIMEOUT_SECONDS = 5.0
+
+ReadStream = MemoryObjectReceiveStream[Union[SessionMessage, Exception]]
+WriteStream = MemoryObjectSendStream[SessionMessage]
+
+
+class DaemonUnavailable(Exception):
+    """Raised when the daemon cannot be reached or started."""
+
+
+class DaemonAlreadyRunning(Exception):
+    """Raised when another daemon is already listening on the address."""
+
+
+def runtime_dir() -> Path:
+    """Per-user directory for the daemon socket and token files."""
+    base = os.environ.get("XDG_RUNTIME_DIR") or (sys.platform == "win32" and os.environ.get("LOCALAPPDATA"))
+    return (Path(base) if base else Path.home() / ".cache") / "mql5-mcp"
+
+
+def default_address() -> str:
+    """Per-user socket path, or a localhost port where Unix sockets are unavailable."""
+    if not hasattr(socket, "AF_UNIX"):
+        port = TCP_PORT_BASE + zlib.crc32(getpass.getuser().encode("utf-8")) % TCP_PORT_RANGE
+        return f"127.0.0.1:{port}"
+    return str(runtime_dir() / "daemon.sock")
+
+
+def token_path(address: str) -> Path:
+    """File holding the token of the TCP daemon on ``address``."""
+    host, port = parse_address(address)
+    return runtime_dir() / f"daemon-{host}-{port}.token"
+
+
+def parse_address(address: str) -> Union[Tuple[str, int], str]:
+    """Split ``host:port`` into a TCP address; anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and host and port.isdigit():
+        return host, int(port)
+    return address
+
+
+async def _open_socket(address: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    target = parse_address(address)
+    if isinstance(target, tuple):
+        return await asyncio.open_connection(*target, limit=STREAM_LIMIT)
+    return await asyncio.open_unix_connection(target, limit=STREAM_LIMIT)
+
+
+async def open_connection(address: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect to a daemon listening on ``address``, presenting its token over TCP.
+
+    Raises:
+        OSError: If nothing accepts the connection, or the token file of a
+            TCP daemon cannot be read
+    """
+    token = None
+    if isinstance(parse_address(address), tuple):
+        token = token_path(address).read_bytes().strip()
+    reader, writer = await _open_socket(address)
+    if token is not None:
+        writer.write(token + b"\n")
+    return reader, writer
+
+
+async def is_listening(address: str, timeout: float = 1.0) -> bool:
+    """Check whether something accepts connections on ``address``."""
+    try:
+        _, writer = await asyncio.wait_for(_open_socket(address), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+
+@contextlib.asynccontextmanager
+async def socket_transport(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> AsyncIterator[Tuple[ReadStream, WriteStream]]:
+    """MCP message streams over a socket connection, framed like the stdio transport.
+
+    Works for either end, so tests and benchmarks can run client sessions
+    against the daemon with the same helper.
+    """
+    read_stream_writer: MemoryObjectSendStream[Union[SessionMessage, Exception]]
+    read_stream: ReadStream
+    write_stream: WriteStream
+    write_stream_reader: MemoryObjectReceiveStream[SessionMessage]
+
+    read_stream_writer, read_stream = anyio.create_memory_object_stream(0)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream(0)
+
+    async def socket_reader() -> None:
+        try:
+            async with read_stream_writer:
+                while line := await reader.readline():
+                    try:
+                        message = types.JSONRPCMessage.model_validate_json(line)
+                    except Exception as exc:
+                        await read_stream_writer.send(exc)
+                        continue
+                    await read_stream_writer.send(SessionMessage(message))
+        except (anyio.ClosedResourceError, ConnectionError, ValueError):
+            # ValueError: a line longer than STREAM_LIMIT
+            await anyio.lowlevel.checkpoint()
+
+    async def socket_writer() -> None:
+        try:
+            async with write_stream_reader:
+                async for session_message in write_stream_reader:
+                    data = session_message.message.model_dump_json(by_alias=True, exclude_none=True)
+                    writer.write(data.encode("utf-8") + b"\n")
+                    await writer.drain()
+        except (anyio.ClosedResourceError, ConnectionError):
+            await anyio.lowlevel.checkpoint()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(socket_reader)
+        tg.start_soon(socket_writer)
+        try:
+            yield read_stream, write_stream
+        finally:
+            # The session is over once the body returns; stop pumping
+            tg.cancel_scope.cancel()
+
+
+class SessionDaemon:
+    """
+    Accept MCP client connections and serve each one as a session.
+
+    ``serve_session`` is called with the read and write streams of every
+    connection, typically ``Server.run`` of one shared server instance.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        serve_session: Callable[[ReadStream, WriteStream], Awaitable[None]],
+        idle_timeout_seconds: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.address = address
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.active_sessions = 0
+        self.total_sessions = 0
+        self._serve_session = serve_session
+        self._clock = clock
+        self._idle_since = clock()
+        self._listener: Optional[asyncio.AbstractServer] = None
+        self._socket_path: Optional[Path] = None
+        self._socket_inode = 0
+        self._lock_fd: Optional[int] = None
+        self._token: Optional[bytes] = None
+        self._token_path: Optional[Path] = None
+        self._sessions: Set["asyncio.Task[None]"] = set()
+
+    async def start(self) -> str:
+        """Start listening and return the bound address.
+
+        Raises:
+            DaemonAlreadyRunning: If another daemon answers on the address,
+                or is starting up on it
+        """
+        target = parse_address(self.address)
+        if isinstance(target, tuple):
+            if await is_listening(self.address):
+                raise DaemonAlreadyRunning(self.address)
+            try:
+                self._listener = await asyncio.start_server(self._handle, *target, limit=STREAM_LIMIT)
+            except OSError as e:
+                # Another daemon bound the port since the check
+                if e.errno == errno.EADDRINUSE:
+                    raise DaemonAlreadyRunning(self.address) from e
+                raise
+            host, port = self._listener.sockets[0].getsockname()[:2]
+            self.address = f"{host}:{port}"
+            self._write_token()
+        else:
+            path = Path(target)
+            path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            # Held while this daemon runs, so shims starting together cannot
+            # both find the socket unused and replace each other's
+            self._lock(path.with_name(path.name + ".lock"))
+            try:
+                if await is_listening(self.address):
+                    raise DaemonAlreadyRunning(self.address)
+                # Left behind by a daemon that did not shut down cleanly
+                with contextlib.suppress(FileNotFoundError):
+                    path.unlink()
+                self._listener = await asyncio.start_unix_server(self._handle, str(path), limit=STREAM_LIMIT)
+                os.chmod(path, 0o600)
+                self._socket_inode = path.stat().st_ino
+                self._socket_path = path
+            except BaseException:
+                self._unlock()
+                raise
+        self._idle_since = self._clock()
+        logger.info(f"Daemon listening on {self.address}")
+        return self.address
+
+    async def serve(self) -> None:
+        """Serve until cancelled, or until no client has been connected for ``idle_timeout_seconds``."""
+        if self._listener is None:
+            await self.start()
+        poll_interval = min(1.0, self.idle_timeout_seconds / 4) if self.idle_timeout_seconds else 1.0
+        try:
+            while True:
+                await asyncio.sleep(poll_interval)
+                if self.idle_timeout_seconds and self.active_sessions == 0:
+                    if self._clock() - self._idle_since >= self.idle_timeout_seconds:
+                        logger.info(f"Daemon idle for {self.idle_timeout_seconds:g}s, shutting down")
+                        return
+        finally:
+            sessions = list(self._sessions)
+            self.close()
+            if sessions:
+                await asyncio.wait(sessions)
+
+    def close(self) -> None:
+        """Stop listening and end every open session."""
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        for task in list(self._sessions):
+            task.cancel()
+        if self._socket_path is not None:
+            # Only remove the socket if it is still the one this daemon bound
+            with contextlib.suppress(OSError):
+                if self._socket_path.stat().st_ino == self._socket_inode:
+                    self._socket_path.unlink()
+        if self._token_path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                self._token_path.unlink()
+        self._socket_path = self._token_path = None
+        self._unlock()
+
+    def _lock(self, path: Path) -> None:
+        """Take the exclusive lock on ``path`` for this daemon's lifetime.
+
+        Raises:
+            DaemonAlreadyRunning: If another daemon holds it
+        """
+        import fcntl
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            raise DaemonAlreadyRunning(self.address) from None
+        self._lock_fd = fd
+
+    def _unlock(self) -> None:
+        # The lock file stays; removing it would let two daemons lock different files
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _write_token(self) -> None:
+        """Create a fresh token in a file only the current user can read."""
+        self._token = secrets.token_hex(32).encode("ascii")
+        path = token_path(self.address)
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(self._token)
+        os.chmod(path, 0o600)
+        self._token_path = path
+
+    async def _authenticate(self, reader: asyncio.StreamReader) -> bool:
+        """Check the token a TCP connection sends as its first line."""
+        if self._token is None:
+            return True
+        try:
+            line = await asyncio.wait_for(reader.readline(), AUTH_TIMEOUT_SECONDS)
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            line = b""
+        if hmac.compare_digest(line.strip(), self._token):
+            return True
+        if line:
+            logger.warning("Daemon refused a connection with a wrong token")
+        return False
+
+    def snapshot(self) -> dict:
+        """Return listener and session counts for monitoring."""
+        return {
+            "address": self.address,
+            "active_sessions": self.active_sessions,
+            "total_sessions": self.total_sessions,
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if not await self._authenticate(reader):
+            writer.close()
+            return
+        task = asyncio.current_task()
+        if task is not None:
+            self._sessions.add(task)
+        self.active_sessions += 1
+        self.total_sessions += 1
+        logger.info(f"Daemon session opened ({self.active_sessions} active)")
+        try:
+            async with socket_transport(reader, writer) as (read_stream, write_stream):
+                await self._serve_session(read_stream, write_stream)
+        except asyncio.CancelledError:
+            # Cancelled by close(); this task is the root of the session, and
+            # asyncio's stream server logs connection tasks that end cancelled
+            pass
+        except Exception as e:
+            logger.warning(f"Daemon session ended with an error: {e}")
+        finally:
+            if task is not None:
+                self._sessions.discard(task)
+            self.active_sessions -= 1
+            self._idle_since = self._clock()
+            writer.close()
+            logger.info(f"Daemon session closed ({self.active_sessions} active)")
+
+
+def start_daemon(command: List[str]) -> "subprocess.Popen[bytes]":
+    """Launch the daemon detached from this process and its stdio."""
+    if sys.platform == "win32":
+        flags = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        return subprocess.Popen(
+            command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, creationflags=flags
+        )
+    return subprocess.Popen(
+        command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True
+    )
+
+
+async def connect(
+    address: str,
+    start_command: Optional[List[str]] = None,
+    start_timeout_seconds: float = 10.0,
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect to the daemon, starting it with ``start_command`` if nothing is listening.
+
+    Raises:
+        DaemonUnavailable: If the daemon is not running and cannot be started
+    """
+    try:
+        return await open_connection(address)
+    except OSError as e:
+        if start_command is None:
+            raise DaemonUnavailable(f"No daemon listening on {address}: {e}") from e
+
+    logger.info(f"Starting daemon on {address}")
+    start_daemon(start_command)
+    deadline = time.monotonic() + start_timeout_seconds
+    while True:
+        await asyncio.sleep(0.1)
+        try:
+            return await open_connection(address)
+        except OSError as e:
+            if time.monotonic() >= deadline:
+                raise DaemonUnavailable(f"Daemon did not start listening on {address}: {e}") from e
+
+
+async def relay(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    stdin: Optional[IO[bytes]] = None,
+    stdout: Optional[IO[bytes]] = None,
+) -> None:
+    """Copy lines from ``stdin`` to the daemon and from the daemon to ``stdout``.
+
+    Returns once the daemon closes the connection, which it does after
+    ``stdin`` reaches end of file and the session ends.
+    """
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    loop = asyncio.get_running_loop()
+    lines: "asyncio.Queue[bytes]" = asyncio.Queue()
+
+    def read_stdin() -> None:
+        # A daemon thread, so a blocked read never holds up shutdown
+        try:
+            for line in iter(stdin.readline, b""):
+                loop.call_soon_threadsafe(lines.put_nowait, line)
+            loop.call_soon_threadsafe(lines.put_nowait, b"")
+        except RuntimeError:  # The loop closed first
+            pass
+
+    threading.Thread(target=read_stdin, name="mql5-daemon-shim", daemon=True).start()
+
+    async def upstream() -> None:
+        while line := await lines.get():
+            writer.write(line)
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+
+    sender = asyncio.create_task(upstream())
+    try:
+        while line := await reader.readline():
+            stdout.write(line)
+            stdout.flush()
+    finally:
+        sender.cancel()
+        writer.close()
@@ -0,0 +1,170 @@
+"""
+Persistent on-disk cache for the MQL5 MCP Server.
+
+Claude Desktop starts a fresh server process for every session, so the
+in-memory result cache always starts cold. This module keeps raw gateway
+payloads in a single SQLite file so repeated queries survive restarts.
+Rows are read on demand; nothing is loaded into memory when the file is
+opened.
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at);
+"""
+
+
+class DiskCache:
+    """
+    SQLite-backed store of raw gateway JSON keyed on the normalized query.
+
+    The file is capped at ``max_bytes`` of payload data. When a write pushes
+    it past the cap, the least recently accessed rows are deleted until the
+    payload total drops to ``compact_ratio`` of the cap and the freed pages
+    are returned to the filesystem.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int,
+        ttl_seconds: float,
+        compact_ratio: float = 0.8,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Open (or create) the cache file at ``path``.
+
+        Args:
+            path: Location of the SQLite database file
+            max_bytes: Upper bound on stored payload bytes
+            ttl_seconds: Lifetime of an entry; 0 or less disables expiry
+            compact_ratio: Fraction of ``max_bytes`` kept after compaction
+            clock: Wall-clock time source, injectable for testing
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.compact_ratio = compact_ratio
+        self.hits = 0
+        self.misses = 0
+        self.compactions = 0
+        self._clock = clock
+        self._total_bytes: Optional[int] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # The server opens the cache on the event loop thread and then uses it
+        # only from its single disk cache thread
+        self._conn = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        # auto_vacuum only takes effect on a freshly created database
+        self._conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached payload for ``key`` or None on a miss."""
+        row = self._conn.execute(
+            "SELECT payload, created_at FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        now = self._clock()
+        if row is None or self._is_expired(row[1], now):
+            self.misses += 1
+            return None
+
+        self._conn.execute(
+            "UPDATE results SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, payload: Any) -> None:
+        """Store ``payload`` under ``key`` and compact if over the size cap."""
+        text = json.dumps(payload, separators=(",", ":"))
+        size = len(text.encode("utf-8"))
+        now = self._clock()
+        total = self.total_bytes()
+
+        previous = self._conn.execute(
+            "SELECT size FROM results WHERE key = ?", (key,)
+        ).fetchone()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results (key, payload, size, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, text, size, now, now)
+        )
+        self._total_bytes = total + size - (previous[0] if previous else 0)
+
+        if self._total_bytes > self.max_bytes:
+            self.compact()
+
+    def total_bytes(self) -> int:
+        """Return the payload bytes currently stored, computed once per process."""
+        if self._total_bytes is None:
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+            self._total_bytes = int(row[0])
+        return self._total_bytes
+
+    def compact(self) -> int:
+        """Drop expired rows, then least recently used rows, until under the cap.
+
+        Returns:
+            Number of rows deleted
+        """
+        deleted = 0
+        if self.ttl_seconds > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM results WHERE created_at <= ?",
+                (self._clock() - self.ttl_seconds,)
+            )
+            deleted += cursor.rowcount
+        self._total_bytes = None
+
+        target = int(self.max_bytes * self.compact_ratio)
+        excess = self.total_bytes() - target
+        if excess > 0:
+            doomed = []
+            for key, size in self._conn.execute(
+                "SELECT key, size FROM results ORDER BY accessed_at"
+            ):
+                if excess <= 0:
+                    break
+                doomed.append((key,))
+                excess -= size
+            self._conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+            deleted += len(doomed)
+            self._total_bytes = None
+
+        self._conn.execute("PRAGMA incremental_vacuum")
+        self.compactions += 1
+        logger.info(f"Disk cache compacted: {deleted} entries removed, {self.total_bytes()} bytes kept")
+        return deleted
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/compaction counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "compactions": self.compactions,
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at >= self.ttl_seconds
@@ -0,0 +1,231 @@
+"""
+Fuzzy query cache for the MQL5 MCP Server.
+
+The exact result cache misses paraphrases such as "how to use ArrayResize"
+and "ArrayResize function". This layer reduces each query to a set of
+terms: tokens are lower-cased, identifiers are also split on camel case,
+and stop words and bare numbers are dropped. It then returns a stored result whose term set
+is similar enough.
+
+Lookups go through a MinHash locality-sensitive hashing (LSH) index, so
+only entries sharing at least one signature band are compared, however
+large the cache grows. Every candidate is then checked with two
+safeguards against false hits:
+
+* the exact Jaccard similarity of the term sets must reach the threshold;
+* both queries must name the same MQL5 identifiers (``ArrayResize`` never
+  answers for ``ArrayFree``, however similar the rest of the wording).
+"""
+
+import random
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, FrozenSet, Hashable, List, Optional, Set, Tuple
+
+from mql5_local_index import tokenize
+
+STOP_WORDS = frozenset(
+    """
+    a an and are as at be by can do does for from get how i in into is it me my
+    of on or please show the this to use used using what when where which with
+    you your example examples function functions method methods doc docs
+    documentation reference mql mql4 mql5 mt4 mt5 metatrader
+    """.split()
+)
+
+_WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def query_terms(query: str) -> FrozenSet[str]:
+    """Reduce a query to its significant, lower-cased terms."""
+    return frozenset(
+        term for term in tokenize(query) if term not in STOP_WORDS and not term.isdigit()
+    )
+
+
+def query_identifiers(query: str) -> FrozenSet[str]:
+    """Return the MQL5 identifiers named in a query, lower-cased.
+
+    A word counts as an identifier if it has an underscore (``_Symbol``,
+    ``ORDER_TYPE_BUY``) or a capital after its first letter (``ArrayResize``,
+    ``iMA``, ``RSI``). Plain capitalised words such as "How" do not count.
+    """
+    identifiers = set()
+    for word in _WORD_RE.findall(query):
+        lowered = word.lower()
+        if lowered in STOP_WORDS:
+            continue
+        if "_" in word or any(c.isupper() for c in word[1:]):
+            identifiers.add(lowered)
+    return frozenset(identifiers)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two term sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class FuzzyCacheStats:
+    """Counters for the fuzzy layer, reported apart from the exact cache."""
+
+    lookups: int = 0
+    hits: int = 0
+    misses: int = 0
+    candidates_checked: int = 0
+    rejected_identifier_mismatch: int = 0
+    rejected_below_threshold: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        """Return the counters and the hit rate as a plain dictionary."""
+        stats: Dict[str, float] = asdict(self)
+        stats["hit_rate"] = round(self.hits / self.lookups, 4) if self.lookups else 0.0
+        return stats
+
+
+@dataclass
+class _Entry:
+    terms: FrozenSet[str]
+    identifiers: FrozenSet[str]
+    max_snippets: int
+    value: Any
+    expires_at: float
+    buckets: List[Hashable]
+
+
+class FuzzyQueryCache:
+    """
+    Bounded LRU cache looked up by query similarity.
+
+    Each entry's MinHash signature of ``bands * rows`` values is split into
+    ``bands`` buckets. Two term sets with Jaccard similarity ``s`` share at
+    least one bucket with probability ``1 - (1 - s**rows) ** bands``: with
+    the defaults (8 bands of 2 rows), 99.9% at ``s = 0.75`` and about 8% at
+    ``s = 0.1``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        threshold: float,
+        ttl_seconds: float,
+        bands: int = 8,
+        rows: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+        seed: int = 5,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.bands = bands
+        self.rows = rows
+        self.stats = FuzzyCacheStats()
+        self._clock = clock
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(bands * rows)
+        ]
+        self._entries: "OrderedDict[Tuple[FrozenSet[str], int], _Entry]" = OrderedDict()
+        self._buckets: Dict[Hashable, Set[Tuple[FrozenSet[str], int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, terms: FrozenSet[str], max_snippets: int) -> List[Hashable]:
+        hashes = [zlib.crc32(term.encode("utf-8")) for term in terms]
+        signature = [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._permutations
+        ]
+        rows = self.rows
+        return [
+            (band, max_snippets, tuple(signature[band * rows:(band + 1) * rows]))
+            for band in range(self.bands)
+        ]
+
+    def get(self, query: str, max_snippets: int) -> Optional[Any]:
+        """Return the value stored for the most similar earlier query, if any."""
+        terms = query_terms(query)
+        if not terms:
+            return None
+        self.stats.lookups += 1
+
+        candidates: Set[Tuple[FrozenSet[str], int]] = set()
+        for bucket in self._band_keys(terms, max_snippets):
+            candidates.update(self._buckets.get(bucket, ()))
+
+        identifiers = query_identifiers(query)
+        now = self._clock()
+        best_key: Optional[Tuple[FrozenSet[str], int]] = None
+        best_similarity = 0.0
+        for key in candidates:
+            entry = self._entries[key]
+            if self.ttl_seconds > 0 and now >= entry.expires_at:
+                self._remove(key)
+                self.stats.expirations += 1
+                continue
+            self.stats.candidates_checked += 1
+            if entry.identifiers != identifiers:
+                self.stats.rejected_identifier_mismatch += 1
+                continue
+            similarity = jaccard(terms, entry.terms)
+            if similarity < self.threshold:
+                self.stats.rejected_below_threshold += 1
+                continue
+            if similarity > best_similarity:
+                best_key, best_similarity = key, similarity
+
+        if best_key is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key].value
+
+    def put(self, query: str, max_snippets: int, value: Any) -> None:
+        """Store ``value`` for ``query``, evicting the least recently used entry if full."""
+        terms = query_terms(query)
+        if not terms:
+            return
+        key = (terms, max_snippets)
+        if key in self._entries:
+            self._remove(key)
+
+        buckets = self._band_keys(terms, max_snippets)
+        self._entries[key] = _Entry(
+            terms=terms,
+            identifiers=query_identifiers(query),
+            max_snippets=max_snippets,
+            value=value,
+            expires_at=self._clock() + self.ttl_seconds,
+            buckets=buckets,
+        )
+        for bucket in buckets:
+            self._buckets.setdefault(bucket, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def _remove(self, key: Tuple[FrozenSet[str], int]) -> None:
+        entry = self._entries.pop(key)
+        for bucket in entry.buckets:
+            members = self._buckets.get(bucket)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._buckets[bucket]
@@ -0,0 +1,62 @@
+"""
+Rolling latency statistics for the MQL5 MCP Server.
+
+Keeps the most recent gateway latencies in a bounded window and answers
+percentile queries, which drive the adaptive request timeout and the
+hedging delay.
+"""
+
+import bisect
+import math
+from collections import deque
+from typing import Deque, List, Optional
+
+
+class LatencyHistogram:
+    """
+    Sliding window of latency samples with O(log n) percentile lookups.
+
+    Samples are kept twice: in arrival order (to know which one to drop
+    when the window is full) and in a sorted list (to read percentiles
+    without sorting on every query).
+    """
+
+    def __init__(self, window_size: int = 200):
+        if window_size < 1:
+            raise ValueError("window_size must be at least 1")
+        self.window_size = window_size
+        self.count = 0
+        self._arrivals: Deque[float] = deque()
+        self._sorted: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._arrivals)
+
+    def record(self, seconds: float) -> None:
+        """Add one latency sample, evicting the oldest if the window is full."""
+        if len(self._arrivals) >= self.window_size:
+            oldest = self._arrivals.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+        self._arrivals.append(seconds)
+        bisect.insort(self._sorted, seconds)
+        self.count += 1
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Return the nearest-rank percentile of the window, or None if empty."""
+        if not self._sorted:
+            return None
+        rank = math.ceil(percent / 100 * len(self._sorted))
+        return self._sorted[min(max(rank, 1), len(self._sorted)) - 1]
+
+    def snapshot(self) -> dict:
+        """Return common percentiles in milliseconds for reporting."""
+        return {
+            "samples": len(self),
+            "p50_ms": self._as_ms(self.percentile(50)),
+            "p95_ms": self._as_ms(self.percentile(95)),
+            "p99_ms": self._as_ms(self.percentile(99)),
+        }
+
+    @staticmethod
+    def _as_ms(seconds: Optional[float]) -> Optional[float]:
+        return None if seconds is None else round(seconds * 1000, 2)
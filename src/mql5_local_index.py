@@ -0,0 +1,265 @@
+"""
+Offline BM25 retrieval for the MQL5 MCP Server.
+
+Builds a compact inverted index from a directory of MQL5 documentation
+(HTML or Markdown) and answers queries locally with BM25 scoring. Results
+use the same ``{"snippets": [{"snippet", "source", "score"}]}`` shape as the
+AWS RAG gateway, so they flow through ``_format_search_results`` unchanged.
+
+Build an index with:
+
+    python src/mql5_local_index.py build path/to/mql5-docs mql5_docs_index.json.gz
+"""
+
+import argparse
+import gzip
+import heapq
+import json
+import logging
+import math
+import re
+import sys
+import time
+from collections import Counter
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+DOC_SUFFIXES = {".html", ".htm", ".md", ".markdown", ".txt"}
+
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms.
+
+    Identifiers are kept whole and also split on camel case and
+    underscores, so "ArrayResize" matches both "arrayresize" and "resize".
+    """
+    terms: List[str] = []
+    for token in _TOKEN_RE.findall(text):
+        lowered = token.lower()
+        terms.append(lowered)
+        parts = [part.lower() for part in _CAMEL_RE.findall(token)]
+        if len(parts) > 1:
+            terms.extend(part for part in parts if part != lowered)
+    return terms
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collect visible text from an HTML page, one block per line."""
+
+    _BLOCK_TAGS = {"p", "div", "br", "li", "tr", "pre", "h1", "h2", "h3", "h4", "h5", "h6", "table"}
+    _SKIP_TAGS = {"script", "style", "head", "title"}
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        if tag in self._SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def extract_text(path: Path) -> str:
+    """Return the plain text of an HTML or Markdown documentation file."""
+    raw = path.read_text(encoding="utf-8", errors="replace")
+    if path.suffix.lower() in (".html", ".htm"):
+        extractor = _HTMLTextExtractor()
+        extractor.feed(raw)
+        return "".join(extractor.parts)
+    return raw
+
+
+def chunk_text(text: str, max_chars: int = 800) -> List[str]:
+    """Split text into snippets of roughly ``max_chars`` on paragraph boundaries."""
+    chunks: List[str] = []
+    current: List[str] = []
+    length = 0
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = "\n".join(line.rstrip() for line in paragraph.strip().splitlines() if line.strip())
+        if not paragraph:
+            continue
+        if current and length + len(paragraph) > max_chars:
+            chunks.append("\n\n".join(current))
+            current, length = [], 0
+        current.append(paragraph)
+        length += len(paragraph)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def iter_documents(docs_dir: Path) -> Iterator[Tuple[str, str]]:
+    """Yield ``(source, text)`` for every documentation file under ``docs_dir``."""
+    for path in sorted(docs_dir.rglob("*")):
+        if path.is_file() and path.suffix.lower() in DOC_SUFFIXES:
+            yield path.relative_to(docs_dir).as_posix(), extract_text(path)
+
+
+def build_index(docs_dir: Path, index_path: Path, chunk_chars: int = 800) -> Dict[str, int]:
+    """
+    Chunk a documentation directory and write a gzip-compressed BM25 index.
+
+    Postings are stored as flat ``[snippet_id, term_frequency, ...]`` lists
+    so the file stays compact and loads with a single ``json.load``.
+
+    Returns:
+        Summary counts of the built index
+    """
+    snippets: List[List[str]] = []
+    lengths: List[int] = []
+    postings: Dict[str, List[int]] = {}
+
+    for source, text in iter_documents(docs_dir):
+        for chunk in chunk_text(text, chunk_chars):
+            snippet_id = len(snippets)
+            terms = tokenize(chunk)
+            snippets.append([chunk, source])
+            lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                postings.setdefault(term, []).extend((snippet_id, frequency))
+
+    index = {
+        "version": INDEX_FORMAT_VERSION,
+        "snippets": snippets,
+        "lengths": lengths,
+        "postings": postings,
+    }
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(index_path, "wt", encoding="utf-8") as f:
+        json.dump(index, f, separators=(",", ":"))
+
+    return {"snippets": len(snippets), "terms": len(postings)}
+
+
+class LocalIndex:
+    """In-memory BM25 searcher over an index written by ``build_index``."""
+
+    def __init__(self, index: Dict[str, Any], k1: float = 1.2, b: float = 0.75):
+        if index.get("version") != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported local index version: {index.get('version')}")
+
+        self.snippets: List[List[str]] = index["snippets"]
+        self.lengths: List[int] = index["lengths"]
+        self.postings: Dict[str, List[int]] = index["postings"]
+        self.k1 = k1
+        self.b = b
+
+        count = len(self.snippets)
+        self.avg_length = (sum(self.lengths) / count) if count else 0.0
+        # Robertson-Sparck Jones IDF, floored at zero for very common terms
+        self.idf = {
+            term: max(0.0, math.log(1 + (count - len(ids) / 2 + 0.5) / (len(ids) / 2 + 0.5)))
+            for term, ids in self.postings.items()
+        }
+
+    @classmethod
+    def load(cls, index_path: Path) -> "LocalIndex":
+        """Load an index file from disk."""
+        started = time.perf_counter()
+        with gzip.open(index_path, "rt", encoding="utf-8") as f:
+            index = cls(json.load(f))
+        logger.info(
+            f"Local index loaded from {index_path}: {len(index.snippets)} snippets "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return index
+
+    def __len__(self) -> int:
+        return len(self.snippets)
+
+    def search(self, query: str, max_snippets: int) -> Dict[str, Any]:
+        """Return the top BM25 matches in gateway response format."""
+        scores: Dict[int, float] = {}
+        k1, b, avg_length = self.k1, self.b, self.avg_length or 1.0
+
+        for term in set(tokenize(query)):
+            ids = self.postings.get(term)
+            if not ids:
+                continue
+            idf = self.idf[term]
+            for i in range(0, len(ids), 2):
+                snippet_id, frequency = ids[i], ids[i + 1]
+                norm = k1 * (1 - b + b * self.lengths[snippet_id] / avg_length)
+                scores[snippet_id] = scores.get(snippet_id, 0.0) + idf * frequency * (k1 + 1) / (frequency + norm)
+
+        top = heapq.nlargest(max_snippets, scores.items(), key=lambda item: item[1])
+        if not top or top[0][1] <= 0:
+            return {"snippets": []}
+
+        # Scale to (0, 1] so the relevance column matches the gateway's range
+        best = top[0][1]
+        return {
+            "snippets": [
+                {
+                    "snippet": self.snippets[snippet_id][0],
+                    "source": self.snippets[snippet_id][1],
+                    "score": score / best,
+                }
+                for snippet_id, score in top
+            ]
+        }
+
+    def close(self) -> None:
+        """Nothing to release; present so callers can treat both index types alike."""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for building and querying local indexes."""
+    parser = argparse.ArgumentParser(description="Build or query the offline MQL5 documentation index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build an index from a documentation directory")
+    build.add_argument("docs_dir", type=Path, help="Directory of MQL5 HTML/Markdown documentation")
+    build.add_argument("index_path", type=Path, help="Output index file (e.g. mql5_docs_index.json.gz)")
+    build.add_argument("--chunk-chars", type=int, default=800, help="Target snippet size in characters")
+
+    search = commands.add_parser("search", help="Query an existing index")
+    search.add_argument("index_path", type=Path)
+    search.add_argument("query")
+    search.add_argument("--max-snippets", type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if not args.docs_dir.is_dir():
+            print(f"Documentation directory not found: {args.docs_dir}", file=sys.stderr)
+            return 1
+        started = time.perf_counter()
+        summary = build_index(args.docs_dir, args.index_path, args.chunk_chars)
+        print(
+            f"Indexed {summary['snippets']} snippets, {summary['terms']} terms "
+            f"in {time.perf_counter() - started:.1f}s -> {args.index_path}",
+            file=sys.stderr
+        )
+        return 0
+
+    index = LocalIndex.load(args.index_path)
+    started = time.perf_counter()
+    results = index.search(args.query, args.max_snippets)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(json.dumps(results, indent=2))
+    print(f"Search took {elapsed_ms:.2f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
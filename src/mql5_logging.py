@@ -0,0 +1,149 @@
+"""
+Queued logging for the MQL5 MCP Server.
+
+The stdio event loop serves every tool call, so it must never wait on a
+slow disk or a full stderr pipe. Log calls only put the record on an
+in-memory queue. A background listener thread formats the record and
+writes it to stderr and the (optionally rotating) log file. Records
+logged before the listener starts stay in the queue and are written once
+it does, so nothing logged while the config is loading is lost.
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class RepeatLimitFilter(logging.Filter):
+    """
+    Passes at most ``limit`` identical records per ``window_seconds``.
+
+    Records are identical when logger, level, message template and
+    arguments all match. The first record let through after a window with
+    suppressions reports how many were dropped.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window_seconds: float,
+        max_keys: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self.suppressed = 0
+        self._clock = clock
+        # key -> [window start, records passed, records suppressed]
+        self._windows: Dict[Hashable, List[float]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        try:
+            key: Hashable = (record.name, record.levelno, record.msg, record.args)
+            hash(key)
+        except TypeError:
+            return True
+
+        now = self._clock()
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.window_seconds:
+            dropped = int(window[2]) if window is not None else 0
+            if window is None and len(self._windows) >= self.max_keys:
+                self._prune(now)
+            self._windows[key] = [now, 1, 0]
+            if dropped:
+                record.msg = f"{record.getMessage()} ({dropped} identical messages suppressed)"
+                record.args = ()
+            return True
+
+        if window[1] < self.limit:
+            window[1] += 1
+            return True
+        window[2] += 1
+        self.suppressed += 1
+        return False
+
+    def _prune(self, now: float) -> None:
+        expired = [k for k, w in self._windows.items() if now - w[0] >= self.window_seconds]
+        for k in expired:
+            del self._windows[k]
+        if len(self._windows) >= self.max_keys:
+            self._windows.clear()
+
+
+class _DeferredFormatQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread.
+
+    The stock ``prepare`` formats every record in the calling thread. The
+    queue here never leaves the process, so the record can be queued as is.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class QueuedLogging:
+    """Root-logger pipeline: a queue handler now, writer thread on ``start``."""
+
+    def __init__(self, level: int = logging.INFO):
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.handler = _DeferredFormatQueueHandler(self.queue)
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        root = logging.getLogger()
+        root.addHandler(self.handler)
+        root.setLevel(level)
+
+    def start(
+        self,
+        log_file: Optional[str] = "mql5_mcp_server.log",
+        max_bytes: int = 0,
+        backup_count: int = 3,
+        repeat_limit: int = 0,
+        repeat_window_seconds: float = 60.0,
+    ) -> None:
+        """Attach the output handlers and start the writer thread.
+
+        Args:
+            log_file: Log file path, or None/empty to log to stderr only
+            max_bytes: Rotate the log file at this size; 0 disables rotation
+            backup_count: Rotated files to keep
+            repeat_limit: Identical records allowed per window; 0 disables
+            repeat_window_seconds: Length of the repeat-limit window
+        """
+        if self.listener is not None:
+            return
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        handlers: List[logging.Handler] = [logging.StreamHandler(sys.stderr)]
+        if log_file:
+            if max_bytes > 0:
+                handlers.append(logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=max_bytes, backupCount=backup_count,
+                    encoding="utf-8", delay=True
+                ))
+            else:
+                handlers.append(logging.FileHandler(log_file, encoding="utf-8", delay=True))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        if repeat_limit > 0:
+            self.handler.addFilter(RepeatLimitFilter(repeat_limit, repeat_window_seconds))
+
+        self.listener = logging.handlers.QueueListener(self.queue, *handlers)
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Flush queued records, stop the writer thread and detach from root."""
+        logging.getLogger().removeHandler(self.handler)
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
@@ -11,14 +11,21 @@ technical assistance.
 """
 
 import asyncio
+import concurrent.futures
+import contextlib
+import contextvars
+import functools
+import importlib.util
+import json
 import logging
 import os
 import sys
+import time
+import weakref
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Literal, Optional, Tuple, Union
 
 import httpx
-import yaml
 from mcp.server import Server, NotificationOptions
 from mcp.server.stdio import stdio_server
 from mcp.server.models import InitializationOptions
@@ -29,18 +36,83 @@ from mcp.types import (
 )
 from pydantic import BaseModel, Field
 
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stderr),
-        logging.FileHandler("mql5_mcp_server.log")
-    ]
+from mql5_cache import ResultCache, normalize_query
+from mql5_compaction import compact_snippets
+from mql5_config_snapshot import load_snapshot, save_snapshot
+from mql5_latency import LatencyHistogram
+from mql5_metrics import MetricsRegistry, write_textfile
+from mql5_rate_limit import RateLimitExceeded, RetryBudget, TokenBucket, backoff_delay
+from mql5_breaker import HALF_OPEN, CircuitBreaker, CircuitOpenError
+from mql5_routing import Endpoint, EndpointRouter
+from mql5_wire import (
+    accept_encoding,
+    accept_header,
+    decode_payload,
+    json_parser,
+    msgpack_available,
+    payload_format,
 )
+
+# The disk cache and offline indexes are imported on first use so sessions
+# that never enable them do not pay for sqlite3 or the index modules
+if TYPE_CHECKING:
+    from mql5_daemon import ReadStream, SessionDaemon, WriteStream
+    from mql5_disk_cache import DiskCache
+    from mql5_fuzzy_cache import FuzzyQueryCache
+    from mql5_local_index import LocalIndex
+    from mql5_logging import QueuedLogging
+    from mql5_prefetch import FollowUpModel, Prefetcher
+    from mql5_streaming import ProgressReporter, SnippetBroadcast
+    from mql5_symbols import SymbolTable
+    from mql5_trace import TraceRecorder
+    from mql5_vector_index import VectorIndex
+
+
+# Hot-path log calls use %-style arguments so the message is only built
+# on the log writer thread, and only if the record passes the level check
 logger = logging.getLogger(__name__)
 
+# MCP logging levels follow syslog; map the ones logging lacks
+MCP_LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "notice": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+    "critical": logging.CRITICAL,
+    "alert": logging.CRITICAL,
+    "emergency": logging.CRITICAL,
+}
+
+# Event-loop time by which the current tool call must answer. Tasks started
+# on its behalf (coalesced fetches, hedges, batch queries) inherit it.
+_call_deadline: "contextvars.ContextVar[Optional[float]]" = contextvars.ContextVar(
+    "mql5_call_deadline", default=None
+)
+
+# Progress notifications of the current tool call, when streaming is
+# enabled and the client asked for progress
+_call_progress: "contextvars.ContextVar[Optional[ProgressReporter]]" = contextvars.ContextVar(
+    "mql5_call_progress", default=None
+)
+
+# Set while fetching on behalf of prefetch rather than a client, so those
+# fetches are logged apart from searches and never replayed as demand
+_prefetching: "contextvars.ContextVar[bool]" = contextvars.ContextVar("mql5_prefetching", default=False)
+
+
+class _RefusedSearch(List[TextContent]):
+    """
+    Error answer for a search that never reached the gateway.
+    
+    ``outcome`` is the query trace outcome: "throttled" for the client-side
+    rate limiter, "rejected" when no circuit breaker admitted the request.
+    """
+    
+    def __init__(self, outcome: str, text: str):
+        super().__init__([TextContent(type="text", text=text)])
+        self.outcome = outcome
+
 
 class ServerConfig(BaseModel):
     """Configuration model for the MQL5 MCP Server."""
@@ -49,6 +121,10 @@ class ServerConfig(BaseModel):
         ..., 
         description="AWS API Gateway URL for the RAG endpoint"
     )
+    gateway_endpoints: List[str] = Field(
+        default_factory=list,
+        description="Additional gateway URLs (other regions or stages) routed to by latency and error rate"
+    )
     api_key_env_var: str = Field(
         default="MQL5_RAG_API_KEY",
         description="Environment variable name containing the API key"
@@ -57,20 +133,409 @@ class ServerConfig(BaseModel):
         default=2,
         description="HTTP request timeout in seconds"
     )
+    connect_timeout_seconds: Optional[float] = Field(
+        default=None,
+        description="Timeout for establishing a connection (default: timeout_seconds)"
+    )
+    read_timeout_seconds: Optional[float] = Field(
+        default=None,
+        description="Timeout for reading the response (default: timeout_seconds)"
+    )
+    pool_max_connections: int = Field(
+        default=10,
+        ge=1,
+        description="Maximum number of open connections to the gateway"
+    )
+    pool_max_keepalive_connections: int = Field(
+        default=5,
+        ge=0,
+        description="Maximum number of idle keep-alive connections kept in the pool"
+    )
+    keepalive_expiry_seconds: float = Field(
+        default=120,
+        description="Seconds an idle keep-alive connection is kept open"
+    )
+    http2: bool = Field(
+        default=False,
+        description="Negotiate HTTP/2 with the gateway (requires the h2 package)"
+    )
+    gateway_compression: List[str] = Field(
+        default_factory=lambda: ["zstd", "br", "gzip"],
+        description="Response encodings offered to the gateway, most preferred first; ones that cannot be decoded here are skipped"
+    )
+    gateway_response_format: Literal["auto", "json", "msgpack"] = Field(
+        default="auto",
+        description="Response body format; auto asks for MessagePack when the msgpack package is installed"
+    )
+    streaming_enabled: bool = Field(
+        default=False,
+        description="Read JSON gateway responses incrementally and send each snippet as an MCP progress notification"
+    )
+    warmup_enabled: bool = Field(
+        default=True,
+        description="Pre-connect to the gateway in the background when the server starts"
+    )
+    latency_window_size: int = Field(
+        default=200,
+        ge=1,
+        description="Number of recent gateway latencies kept for percentile estimates"
+    )
+    latency_min_samples: int = Field(
+        default=20,
+        ge=1,
+        description="Samples required before adaptive timeouts or hedging take effect"
+    )
+    adaptive_timeout_enabled: bool = Field(
+        default=False,
+        description="Derive the request timeout from observed gateway latency percentiles"
+    )
+    adaptive_timeout_percentile: float = Field(
+        default=99,
+        gt=0,
+        le=100,
+        description="Latency percentile the adaptive timeout is based on"
+    )
+    adaptive_timeout_multiplier: float = Field(
+        default=2.0,
+        gt=0,
+        description="Multiplier applied to the percentile to get the adaptive timeout"
+    )
+    adaptive_timeout_min_seconds: float = Field(
+        default=0.5,
+        gt=0,
+        description="Lower bound of the adaptive timeout in seconds"
+    )
+    adaptive_timeout_max_seconds: float = Field(
+        default=5.0,
+        gt=0,
+        description="Upper bound of the adaptive timeout in seconds"
+    )
+    hedging_enabled: bool = Field(
+        default=False,
+        description="Send a second identical request when the first is slower than the hedge percentile"
+    )
+    hedge_percentile: float = Field(
+        default=95,
+        gt=0,
+        le=100,
+        description="Latency percentile after which a hedged request is sent"
+    )
+    rate_limit_enabled: bool = Field(
+        default=False,
+        description="Pace outgoing gateway requests with a client-side token bucket"
+    )
+    rate_limit_requests_per_second: float = Field(
+        default=10.0,
+        gt=0,
+        description="Sustained request rate, matching the API Gateway usage plan"
+    )
+    rate_limit_burst: int = Field(
+        default=20,
+        ge=1,
+        description="Requests allowed in a burst, matching the usage plan burst limit"
+    )
+    max_retries: int = Field(
+        default=2,
+        ge=0,
+        description="Retries after an HTTP 429 or timeout"
+    )
+    retry_base_delay_seconds: float = Field(
+        default=0.2,
+        gt=0,
+        description="Initial retry backoff; doubles per attempt with full jitter"
+    )
+    retry_max_delay_seconds: float = Field(
+        default=2.0,
+        gt=0,
+        description="Upper bound of a single retry backoff"
+    )
+    retry_deadline_seconds: float = Field(
+        default=8.0,
+        gt=0,
+        description="Total time a search may spend queueing and retrying"
+    )
+    tool_deadline_seconds: float = Field(
+        default=20.0,
+        ge=0,
+        description="Time a tool call may take before it answers with a timeout and its gateway requests are abandoned (0 disables)"
+    )
+    retry_budget_ratio: float = Field(
+        default=0.2,
+        ge=0,
+        description="Retries allowed per first attempt across the whole server"
+    )
+    retry_budget_max_tokens: float = Field(
+        default=10,
+        ge=0,
+        description="Retries that can be spent in a burst after an idle period"
+    )
+    metrics_prometheus_path: Optional[str] = Field(
+        default=None,
+        description="Write metrics in Prometheus text format to this file periodically"
+    )
+    metrics_export_interval_seconds: float = Field(
+        default=30,
+        gt=0,
+        description="Seconds between Prometheus metrics file updates"
+    )
     max_snippets: int = Field(
         default=5,
         description="Maximum number of documentation snippets to retrieve"
     )
+    symbol_lookup_enabled: bool = Field(
+        default=True,
+        description="Answer bare identifier and Prefix* queries from the MQL5 symbol table"
+    )
+    symbol_table_path: Optional[str] = Field(
+        default=None,
+        description="Path of a symbol table JSON file (default: the bundled mql5_symbols.json)"
+    )
+    symbol_prefix_limit: int = Field(
+        default=20,
+        ge=1,
+        description="Maximum number of symbols listed for a Prefix* query"
+    )
+    result_dedupe_threshold: float = Field(
+        default=0.8,
+        ge=0,
+        le=1,
+        description="Word-shingle overlap at which a snippet is merged into a better-ranked one (0 disables)"
+    )
+    result_max_tokens: int = Field(
+        default=2000,
+        ge=0,
+        description="Estimated token budget for snippet text in one response (0 disables trimming)"
+    )
     circuit_breaker_failures: int = Field(
         default=3,
-        description="Number of consecutive failures before circuit breaker opens"
+        ge=1,
+        description="Failed searches within the window needed before a circuit breaker can open"
+    )
+    circuit_breaker_error_rate: float = Field(
+        default=0.5,
+        gt=0,
+        le=1,
+        description="Share of failed searches within the window at which a circuit breaker opens"
+    )
+    circuit_breaker_window_seconds: float = Field(
+        default=60,
+        gt=0,
+        description="Sliding window over which circuit breaker failures and error rate are measured"
     )
-    circuit_breaker_cooldown: int = Field(
+    circuit_breaker_cooldown: float = Field(
+        default=5,
+        gt=0,
+        description="Seconds a circuit breaker stays open before probing; doubles after each failed probe"
+    )
+    circuit_breaker_max_cooldown: float = Field(
         default=300,
-        description="Circuit breaker cooldown period in seconds"
+        gt=0,
+        description="Upper bound of the growing circuit breaker cooldown in seconds"
+    )
+    circuit_breaker_half_open_probes: int = Field(
+        default=1,
+        ge=1,
+        description="Probe requests let through at once while a circuit breaker is half-open"
+    )
+    routing_ewma_alpha: float = Field(
+        default=0.2,
+        gt=0,
+        le=1,
+        description="Weight of the newest sample in each endpoint's latency and error rate averages"
+    )
+    routing_error_penalty_seconds: float = Field(
+        default=2.0,
+        ge=0,
+        description="Seconds added to an endpoint's routing score per unit of error rate"
+    )
+    routing_explore_ratio: float = Field(
+        default=0.05,
+        ge=0,
+        le=1,
+        description="Share of requests sent to a random healthy endpoint to keep its averages current"
+    )
+    cache_enabled: bool = Field(
+        default=True,
+        description="Cache successful search results in memory"
+    )
+    cache_max_entries: int = Field(
+        default=256,
+        ge=1,
+        description="Maximum number of cached search results"
+    )
+    cache_ttl_seconds: int = Field(
+        default=3600,
+        description="Lifetime of a cached search result in seconds (0 disables expiry)"
+    )
+    cache_eviction_policy: Literal["lru", "fifo", "lfu"] = Field(
+        default="lru",
+        description="Eviction policy used when the result cache is full"
+    )
+    fuzzy_cache_enabled: bool = Field(
+        default=False,
+        description="Answer paraphrased queries from earlier results with similar terms"
+    )
+    fuzzy_cache_threshold: float = Field(
+        default=0.75,
+        gt=0,
+        le=1,
+        description="Minimum Jaccard similarity of query terms for a fuzzy cache hit"
+    )
+    fuzzy_cache_max_entries: int = Field(
+        default=512,
+        ge=1,
+        description="Maximum number of queries kept in the fuzzy cache"
+    )
+    prefetch_enabled: bool = Field(
+        default=False,
+        description="Fetch likely follow-up queries into the result cache in the background"
+    )
+    prefetch_max_related: int = Field(
+        default=3,
+        ge=1,
+        description="Follow-up queries prefetched after each search"
+    )
+    prefetch_min_count: int = Field(
+        default=2,
+        ge=1,
+        description="Times a follow-up must have been seen before it is prefetched"
+    )
+    prefetch_concurrency: int = Field(
+        default=1,
+        ge=1,
+        description="Maximum number of prefetches in flight"
+    )
+    prefetch_max_per_minute: float = Field(
+        default=20,
+        gt=0,
+        description="Gateway requests prefetching may use per minute"
+    )
+    prefetch_history_path: Optional[str] = Field(
+        default=None,
+        description="File of learned follow-ups kept across sessions (default: mql5_prefetch_history.json next to config.yaml)"
+    )
+    disk_cache_enabled: bool = Field(
+        default=False,
+        description="Persist successful search results to an SQLite file across restarts"
+    )
+    disk_cache_path: Optional[str] = Field(
+        default=None,
+        description="Path of the on-disk cache file (default: mql5_rag_cache.sqlite3 next to config.yaml)"
+    )
+    disk_cache_max_mb: float = Field(
+        default=64,
+        gt=0,
+        description="Size cap of cached payloads in megabytes before compaction"
+    )
+    disk_cache_ttl_seconds: int = Field(
+        default=7 * 24 * 3600,
+        description="Lifetime of an on-disk cache entry in seconds (0 disables expiry)"
+    )
+    trace_enabled: bool = Field(
+        default=False,
+        description="Record every search to a query trace for offline replay with mql5-simulate"
+    )
+    trace_path: Optional[str] = Field(
+        default=None,
+        description="Path of the query trace (default: mql5_query_trace.jsonl next to config.yaml)"
+    )
+    trace_max_mb: float = Field(
+        default=64,
+        ge=0,
+        description="Size at which the trace is rotated to <trace_path>.1 (0 never rotates)"
+    )
+    search_mode: Literal["remote", "local", "local_fallback"] = Field(
+        default="remote",
+        description="Search the AWS gateway, the offline BM25 index, or the index only when the gateway fails"
+    )
+    local_backend: Literal["bm25", "vector"] = Field(
+        default="bm25",
+        description="Offline retrieval engine: BM25 keyword index or NumPy vector index"
+    )
+    local_index_path: Optional[str] = Field(
+        default=None,
+        description="Path of the offline index (default: mql5_docs_index.json.gz or mql5_docs_vectors/ next to config.yaml)"
+    )
+    batch_max_queries: int = Field(
+        default=10,
+        ge=1,
+        description="Maximum number of queries accepted by search_mql5_docs_batch"
+    )
+    batch_concurrency: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of batch queries searched concurrently"
+    )
+    log_level: str = Field(
+        default="INFO",
+        description="Initial log level (DEBUG, INFO, WARNING, ERROR, CRITICAL); clients can change it at runtime"
+    )
+    log_file: Optional[str] = Field(
+        default="mql5_mcp_server.log",
+        description="Log file path; empty to log to stderr only"
+    )
+    log_max_mb: float = Field(
+        default=0,
+        ge=0,
+        description="Rotate the log file when it reaches this size in megabytes (0 disables rotation)"
+    )
+    log_backup_count: int = Field(
+        default=3,
+        ge=0,
+        description="Number of rotated log files to keep"
+    )
+    log_repeat_limit: int = Field(
+        default=20,
+        ge=0,
+        description="Identical log messages written per window before the rest are dropped (0 disables)"
+    )
+    log_repeat_window_seconds: float = Field(
+        default=60.0,
+        gt=0,
+        description="Window for log_repeat_limit in seconds"
+    )
+    daemon_address: Optional[str] = Field(
+        default=None,
+        description="Unix socket path or host:port of the shared daemon (default: a per-user socket, or a per-user localhost port on Windows)"
+    )
+    daemon_idle_timeout_seconds: float = Field(
+        default=900,
+        ge=0,
+        description="Stop the daemon after this long without connected clients (0 keeps it running)"
+    )
+    daemon_start_timeout_seconds: float = Field(
+        default=10,
+        gt=0,
+        description="How long --connect waits for a daemon it started to accept connections"
     )
 
 
+def _config_schema_fingerprint() -> str:
+    """Identify the ServerConfig schema so snapshots from older versions are ignored."""
+    import hashlib
+    
+    schema = [
+        (name, repr(field.annotation), repr(field.default))
+        for name, field in sorted(ServerConfig.model_fields.items())
+    ]
+    return hashlib.sha256(repr(schema).encode("utf-8")).hexdigest()
+
+
+def parse_config(config_path: Path) -> ServerConfig:
+    """
+    Read and validate a YAML config file, without touching its snapshot.
+    
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the settings are invalid
+    """
+    import yaml
+    
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config_data = yaml.safe_load(f) or {}
+    return ServerConfig(**config_data)
+
+
 class MQL5MCPServer:
     """
     MQL5 Documentation RAG MCP Server
@@ -81,13 +546,128 @@ class MQL5MCPServer:
     
     def __init__(self, config_path: Optional[Path] = None):
         """Initialize the MQL5 MCP Server with configuration."""
-        self.config = self._load_config(config_path)
+        self.config_path = config_path if config_path is not None else Path("config.yaml")
+        self.config = self._load_config(self.config_path)
         self.api_key = self._get_api_key()
         self.http_client: Optional[httpx.AsyncClient] = None
         
-        # Circuit breaker state
-        self.failure_count = 0
-        self.circuit_breaker_open_until: Optional[float] = None
+        self._warmup_task: Optional["asyncio.Task[None]"] = None
+        
+        # Response compression and body format, limited to what can be decoded here
+        if self.config.gateway_response_format == "msgpack" and not msgpack_available():
+            logger.warning("MessagePack responses requested but msgpack is not installed, using JSON")
+        if self.config.streaming_enabled and self.config.gateway_response_format != "json" and msgpack_available():
+            logger.warning("Streaming only parses JSON responses; set gateway_response_format to json")
+        self._wire_headers = {
+            "Accept": accept_header(self.config.gateway_response_format),
+            "Accept-Encoding": accept_encoding(self.config.gateway_compression),
+        }
+        
+        # Rolling gateway latency window for adaptive timeouts and hedging
+        self.latency = LatencyHistogram(self.config.latency_window_size)
+        self.hedged_requests = 0
+        self.hedge_wins = 0
+        
+        # Client-side pacing and retry budget shared by every search
+        self.rate_limiter: Optional[TokenBucket] = None
+        if self.config.rate_limit_enabled:
+            self.rate_limiter = TokenBucket(
+                rate=self.config.rate_limit_requests_per_second,
+                burst=self.config.rate_limit_burst
+            )
+        self.retry_budget = RetryBudget(
+            ratio=self.config.retry_budget_ratio,
+            max_tokens=self.config.retry_budget_max_tokens
+        )
+        self.retries = 0
+        
+        # Per-phase timings and event counters for get_server_metrics
+        self.metrics = MetricsRegistry()
+        self._metrics_export_task: Optional["asyncio.Task[None]"] = None
+        
+        # Set while serving several clients in daemon mode
+        self.daemon: Optional["SessionDaemon"] = None
+        
+        # Gateway endpoints, each with its own circuit breaker
+        self.router = EndpointRouter(
+            [self.config.aws_api_gateway_url, *self.config.gateway_endpoints],
+            breaker_factory=self._create_circuit_breaker,
+            alpha=self.config.routing_ewma_alpha,
+            error_penalty_seconds=self.config.routing_error_penalty_seconds,
+            explore_ratio=self.config.routing_explore_ratio
+        )
+        
+        # Gateway requests currently in flight, keyed like the result cache
+        self._inflight: Dict[Tuple[str, int], "asyncio.Task[Union[Dict[str, Any], List[TextContent]]]"] = {}
+        # Searches still waiting on each in-flight request
+        self._inflight_waiters: Dict["asyncio.Task[Union[Dict[str, Any], List[TextContent]]]", int] = {}
+        # Snippets of each in-flight request as they arrive, when streaming
+        self._inflight_snippets: Dict[Tuple[str, int], "SnippetBroadcast"] = {}
+        self.coalesced_requests = 0
+        self.abandoned_requests = 0
+        
+        # In-memory result cache, keyed on (normalized query, max_snippets)
+        self.result_cache: Optional[ResultCache] = None
+        if self.config.cache_enabled:
+            self.result_cache = ResultCache(
+                max_entries=self.config.cache_max_entries,
+                ttl_seconds=self.config.cache_ttl_seconds,
+                eviction_policy=self.config.cache_eviction_policy
+            )
+        
+        # Optional similarity lookup for paraphrased queries, behind the exact cache
+        self.fuzzy_cache: Optional["FuzzyQueryCache"] = None
+        if self.config.fuzzy_cache_enabled:
+            from mql5_fuzzy_cache import FuzzyQueryCache
+            
+            self.fuzzy_cache = FuzzyQueryCache(
+                max_entries=self.config.fuzzy_cache_max_entries,
+                threshold=self.config.fuzzy_cache_threshold,
+                ttl_seconds=self.config.cache_ttl_seconds
+            )
+        
+        # Optional persistent cache shared by every session on this machine.
+        # SQLite work runs on one worker thread so it never blocks the event loop.
+        self.disk_cache: Optional["DiskCache"] = None
+        self._disk_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        if self.config.disk_cache_enabled:
+            self.disk_cache = self._open_disk_cache()
+            if self.disk_cache is not None:
+                self._disk_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="mql5-disk-cache"
+                )
+        
+        # Optional background prefetch of likely follow-up searches
+        self.prefetcher: Optional["Prefetcher"] = None
+        self.follow_ups: Optional["FollowUpModel"] = None
+        # Last search per MCP session, so clients of a shared daemon never
+        # look like each other's follow-ups; searches outside a session share one
+        self._previous_queries: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+        self._previous_query: Optional[str] = None
+        if self.config.prefetch_enabled:
+            self._setup_prefetch()
+        
+        # Optional query trace for the offline policy simulator, opened on first search
+        self.trace: Optional["TraceRecorder"] = None
+        if self.config.trace_enabled:
+            from mql5_trace import TraceRecorder
+            
+            self.trace = TraceRecorder(
+                self._trace_path(),
+                max_bytes=int(self.config.trace_max_mb * 1024 * 1024)
+            )
+        
+        # Bounds the fan-out of search_mql5_docs_batch across all batches
+        self._batch_semaphore = asyncio.Semaphore(self.config.batch_concurrency)
+        
+        # MQL5 symbol table for identifier queries, loaded on first use
+        self.symbol_table: Optional["SymbolTable"] = None
+        self._symbol_table_error: Optional[str] = None
+        
+        # Offline BM25 or vector index, loaded on first use
+        self.local_index: Optional[Union["LocalIndex", "VectorIndex"]] = None
+        self._local_index_error: Optional[str] = None
+        self._local_index_lock = asyncio.Lock()
         
         # Initialize MCP server
         self.server = Server("mql5-rag-server")
@@ -96,16 +676,49 @@ class MQL5MCPServer:
         
         logger.info("MQL5 MCP Server initialized successfully")
     
-    def _load_config(self, config_path: Optional[Path] = None) -> ServerConfig:
-        """Load configuration from YAML file."""
+    @property
+    def failure_count(self) -> int:
+        """Recent failed searches, summed over all gateway endpoints."""
+        return sum(endpoint.failure_count for endpoint in self.router.endpoints)
+    
+    def _create_circuit_breaker(self, url: str) -> CircuitBreaker:
+        """Build the circuit breaker for one gateway endpoint."""
+        return CircuitBreaker(
+            failure_threshold=self.config.circuit_breaker_failures,
+            error_rate_threshold=self.config.circuit_breaker_error_rate,
+            window_seconds=self.config.circuit_breaker_window_seconds,
+            base_cooldown_seconds=self.config.circuit_breaker_cooldown,
+            max_cooldown_seconds=self.config.circuit_breaker_max_cooldown,
+            half_open_probes=self.config.circuit_breaker_half_open_probes,
+            # A probe whose outcome never arrives frees its slot after the
+            # longest time one search can take
+            probe_timeout_seconds=self.config.retry_deadline_seconds + self.config.timeout_seconds,
+            on_transition=lambda state: self._on_circuit_breaker_transition(url, state)
+        )
+    
+    @staticmethod
+    def _load_config(config_path: Optional[Path] = None) -> ServerConfig:
+        """
+        Load configuration from YAML file.
+        
+        A validated snapshot is reused while config.yaml is unchanged, which
+        skips importing PyYAML and re-validating on most launches.
+        """
         if config_path is None:
             config_path = Path("config.yaml")
         
         try:
             if config_path.exists():
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config_data = yaml.safe_load(f) or {}
+                fingerprint = _config_schema_fingerprint()
+                snapshot = load_snapshot(config_path, fingerprint)
+                if snapshot is not None:
+                    logger.info(f"Configuration loaded from {config_path} (snapshot)")
+                    return ServerConfig.model_construct(**snapshot)
+                
+                config = parse_config(config_path)
+                save_snapshot(config_path, fingerprint, config.model_dump())
                 logger.info(f"Configuration loaded from {config_path}")
+                return config
             else:
                 logger.warning(f"Config file {config_path} not found, using defaults")
                 config_data = {
@@ -114,8 +727,7 @@ class MQL5MCPServer:
                     "api_key_env_var": "MQL5_RAG_API_KEY",
                     "timeout_seconds": 2,
                     "max_snippets": 5,
-                    "circuit_breaker_failures": 3,
-                    "circuit_breaker_cooldown": 300
+                    "circuit_breaker_failures": 3
                 }
             
             return ServerConfig(**config_data)
@@ -130,6 +742,56 @@ class MQL5MCPServer:
                 )
             raise
     
+    def _open_disk_cache(self) -> Optional["DiskCache"]:
+        """Open the persistent cache, falling back to memory-only on failure."""
+        import sqlite3
+        
+        from mql5_disk_cache import DiskCache
+        
+        if self.config.disk_cache_path:
+            path = Path(self.config.disk_cache_path).expanduser()
+        else:
+            path = self.config_path.parent / "mql5_rag_cache.sqlite3"
+        
+        try:
+            disk_cache = DiskCache(
+                path=path,
+                max_bytes=int(self.config.disk_cache_max_mb * 1024 * 1024),
+                ttl_seconds=self.config.disk_cache_ttl_seconds
+            )
+            logger.info(f"Disk cache opened at {path}")
+            return disk_cache
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Disk cache unavailable, continuing without it: {e}")
+            return None
+    
+    def _prefetch_history_path(self) -> Path:
+        """Return the file the learned follow-ups are kept in."""
+        if self.config.prefetch_history_path:
+            return Path(self.config.prefetch_history_path).expanduser()
+        return self.config_path.parent / "mql5_prefetch_history.json"
+    
+    def _trace_path(self) -> Path:
+        """Return the file searches are traced to."""
+        if self.config.trace_path:
+            return Path(self.config.trace_path).expanduser()
+        return self.config_path.parent / "mql5_query_trace.jsonl"
+    
+    def _setup_prefetch(self):
+        """Create the prefetcher and load follow-ups learned in earlier sessions."""
+        from mql5_prefetch import FollowUpModel, Prefetcher
+        
+        if self.result_cache is None:
+            logger.warning("Prefetch needs the result cache; set cache_enabled to use it")
+            return
+        self.prefetcher = Prefetcher(
+            self._prefetch,
+            concurrency=self.config.prefetch_concurrency,
+            max_per_minute=self.config.prefetch_max_per_minute
+        )
+        self.follow_ups = FollowUpModel.load(self._prefetch_history_path())
+        logger.info(f"Prefetch enabled with {len(self.follow_ups)} learned queries")
+    
     def _get_api_key(self) -> str:
         """Retrieve API key from environment variable."""
         api_key = os.getenv(self.config.api_key_env_var)
@@ -142,35 +804,7 @@ class MQL5MCPServer:
     def _setup_tools(self):
         """Register MCP tools with the server."""
         
-        @self.server.list_tools()
-        async def list_tools() -> List[Tool]:
-            """List available tools."""
-            return [
-                Tool(
-                    name="search_mql5_docs",
-                    description="Search official MQL5 documentation for functions, syntax, examples, and best practices",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "The search query for MQL5 documentation"
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                )
-            ]
-        
-        @self.server.call_tool()
-        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
-            """Handle tool calls."""
-            if name == "search_mql5_docs":
-                return await self._search_mql5_docs(arguments.get("query", ""))
-            else:
-                raise ValueError(f"Unknown tool: {name}")
-        
-        # Store tools list for testing
+        # Single source of truth for tool metadata, also used for testing
         self._available_tools = [
             {
                 "name": "search_mql5_docs",
@@ -185,8 +819,111 @@ class MQL5MCPServer:
                     },
                     "required": ["query"]
                 }
+            },
+            {
+                "name": "search_mql5_docs_batch",
+                "description": "Search official MQL5 documentation for several functions or topics at once; results are grouped per query",
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "queries": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "minItems": 1,
+                            "maxItems": self.config.batch_max_queries,
+                            "description": "The search queries for MQL5 documentation"
+                        }
+                    },
+                    "required": ["queries"]
+                }
+            },
+            {
+                "name": "get_server_metrics",
+                "description": "Report MQL5 documentation server metrics: per-phase search latency, gateway status codes, cache and circuit breaker statistics",
+                "schema": {
+                    "type": "object",
+                    "properties": {}
+                }
             }
         ]
+        
+        @self.server.list_tools()
+        async def list_tools() -> List[Tool]:
+            """List available tools."""
+            return [
+                Tool(
+                    name=tool["name"],
+                    description=tool["description"],
+                    inputSchema=tool["schema"]
+                )
+                for tool in self._available_tools
+            ]
+        
+        @self.server.call_tool()
+        async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+            """Handle tool calls."""
+            # Client-supplied names must not create a metric series each
+            label = name if any(tool["name"] == name for tool in self._available_tools) else "unknown"
+            self.metrics.increment("tool_calls", tool=label)
+            with self.metrics.timer(f"tool:{label}"), self._tool_deadline():
+                async with self._tool_progress():
+                    if name == "search_mql5_docs":
+                        return await self._search_mql5_docs(arguments.get("query", ""))
+                    elif name == "search_mql5_docs_batch":
+                        return await self._search_mql5_docs_batch(arguments.get("queries", []))
+                    elif name == "get_server_metrics":
+                        return self._get_server_metrics()
+                    else:
+                        raise ValueError(f"Unknown tool: {name}")
+    
+    @contextlib.contextmanager
+    def _tool_deadline(self):
+        """Set the deadline of the current tool call from tool_deadline_seconds."""
+        seconds = self.config.tool_deadline_seconds
+        deadline = asyncio.get_running_loop().time() + seconds if seconds else None
+        token = _call_deadline.set(deadline)
+        try:
+            yield
+        finally:
+            _call_deadline.reset(token)
+    
+    @contextlib.asynccontextmanager
+    async def _tool_progress(self):
+        """Report streamed snippets of the current tool call if the client asked for progress."""
+        reporter = None
+        if self.config.streaming_enabled:
+            from mql5_streaming import ProgressReporter
+            
+            try:
+                ctx = self.server.request_context
+            except LookupError:
+                # Called outside an MCP request, e.g. by the benchmarks
+                ctx = None
+            if ctx is not None and ctx.meta is not None and ctx.meta.progressToken is not None:
+                session, progress_token, request_id = ctx.session, ctx.meta.progressToken, str(ctx.request_id)
+                
+                async def send(progress: float, message: Optional[str]) -> None:
+                    await session.send_progress_notification(
+                        progress_token, progress, message=message, related_request_id=request_id
+                    )
+                    self.metrics.increment("progress_notifications")
+                
+                reporter = ProgressReporter(send)
+        token = _call_progress.set(reporter)
+        try:
+            yield
+        finally:
+            _call_progress.reset(token)
+            if reporter is not None:
+                await reporter.aclose()
+    
+    @staticmethod
+    def _time_left() -> Optional[float]:
+        """Seconds until the current tool call's deadline, or None without one."""
+        deadline = _call_deadline.get()
+        if deadline is None:
+            return None
+        return max(0.0, deadline - asyncio.get_running_loop().time())
     
     def get_available_tools(self) -> List[Dict[str, Any]]:
         """Get list of available tools for testing purposes."""
@@ -198,9 +935,15 @@ class MQL5MCPServer:
         @self.server.set_logging_level()
         async def set_logging_level(level: str) -> None:
             """Handle logging level changes from client."""
+            if self.daemon is not None:
+                # The level is process-wide; one daemon client must not
+                # silence or flood the log for all the others
+                logger.info(f"Ignoring logging level {level} requested by a daemon client")
+                return
             logger.info(f"Setting logging level to: {level}")
-            # Convert string level to logging constant
-            numeric_level = getattr(logging, level.upper(), logging.INFO)
+            # Convert the MCP (syslog) level name to a logging constant;
+            # levels are checked in the calling thread, before queueing
+            numeric_level = MCP_LOG_LEVELS.get(level.lower(), logging.INFO)
             logging.getLogger().setLevel(numeric_level)
             logger.setLevel(numeric_level)
     
@@ -222,25 +965,385 @@ class MQL5MCPServer:
             )]
         
         query = query.strip()
+        if self.trace is None:
+            return (await self._answer_search(query))[1]
+        
+        started_wall, started = time.time(), time.perf_counter()
+        outcome, result = await self._answer_search(query)
+        self.trace.record(
+            normalize_query(query), self.config.max_snippets, started_wall,
+            (time.perf_counter() - started) * 1000, outcome
+        )
+        return result
+    
+    async def _answer_search(self, query: str) -> Tuple[str, List[TextContent]]:
+        """
+        Answer a validated query from the first source that can.
+        
+        Returns:
+            How the search was answered (one of ``mql5_trace.OUTCOMES``)
+            and its TextContent
+        """
+        # Bare identifiers and Prefix* queries are answered from the symbol table
+        if self.config.symbol_lookup_enabled:
+            with self.metrics.timer("symbol_lookup"):
+                symbol_result = self._lookup_symbol(query)
+            if symbol_result is not None:
+                self._after_search(query)
+                return "symbol", symbol_result
+        
+        cache_key = self._cache_key(query)
+        
+        # Serve repeated queries from the cache, even while the breaker is open
+        with self.metrics.timer("cache_lookup"):
+            cached = await self._get_cached(cache_key)
+        if cached is not None:
+            logger.info("Cache hit for query: %s", query)
+            self._after_search(query, cache_key)
+            return "cache", self._format_search_results(cached, query)
+        
+        if self.fuzzy_cache is not None:
+            with self.metrics.timer("fuzzy_cache_lookup"):
+                similar = self.fuzzy_cache.get(query, cache_key[1])
+            if similar is not None:
+                logger.info("Fuzzy cache hit for query: %s", query)
+                self._after_search(query)
+                return "fuzzy", self._format_search_results(similar, query)
+        
+        search_mode = self.config.search_mode
+        if search_mode == "local":
+            return "local", await self._search_local_docs(query)
         
         # Check circuit breaker
         if self._is_circuit_breaker_open():
-            return [TextContent(
+            if search_mode == "local_fallback":
+                return "local", await self._search_local_docs(query)
+            return "rejected", [TextContent(
                 type="text",
                 text="Documentation search temporarily unavailable"
             )]
         
+        joined = cache_key in self._inflight
+        if self.prefetcher is not None:
+            with self.prefetcher.foreground():
+                outcome = await self._coalesced_fetch(query, cache_key)
+        else:
+            outcome = await self._coalesced_fetch(query, cache_key)
+        if isinstance(outcome, dict):
+            self._after_search(query)
+            return "coalesced" if joined else "gateway", self._format_search_results(outcome, query)
+        
+        if search_mode == "local_fallback":
+            local_data = await self._search_local_index(query)
+            if local_data is not None and local_data["snippets"]:
+                logger.info("Answered from local index after gateway failure: %s", query)
+                return "local", self._format_search_results(local_data, query)
+        if isinstance(outcome, _RefusedSearch):
+            return outcome.outcome, list(outcome)
+        return "error", outcome
+    
+    def _after_search(self, query: str, cache_key: Optional[Tuple[str, int]] = None):
+        """
+        Learn from a successful search and prefetch its likely follow-ups.
+        
+        ``cache_key`` is given for result cache hits, so hits on prefetched
+        results can be counted.
+        """
+        if self.prefetcher is None or self.follow_ups is None:
+            return
+        if cache_key is not None:
+            self.prefetcher.claim(cache_key)
         try:
-            # Initialize HTTP client if not already done
-            if self.http_client is None:
-                self.http_client = httpx.AsyncClient(
-                    timeout=httpx.Timeout(self.config.timeout_seconds)
-                )
+            session = self.server.request_context.session
+        except LookupError:
+            session = None
+        previous = self._previous_query if session is None else self._previous_queries.get(session)
+        if previous is not None:
+            self.follow_ups.record(previous, query)
+        if session is None:
+            self._previous_query = query
+        else:
+            self._previous_queries[session] = query
+        
+        from mql5_prefetch import related_queries
+        
+        assert self.result_cache is not None
+        candidates = self.follow_ups.followers(
+            query, self.config.prefetch_max_related, self.config.prefetch_min_count
+        ) + related_queries(query)
+        seen = {self._cache_key(query)}
+        selected: List[str] = []
+        for candidate in candidates:
+            if len(selected) >= self.config.prefetch_max_related:
+                break
+            candidate_key = self._cache_key(candidate)
+            if candidate_key in seen or candidate_key in self.result_cache:
+                continue
+            seen.add(candidate_key)
+            # Identifiers the symbol table answers never reach the gateway
+            if (
+                self.config.symbol_lookup_enabled
+                and self.symbol_table is not None
+                and self.symbol_table.lookup(candidate) is not None
+            ):
+                continue
+            selected.append(candidate)
+        if selected:
+            self.prefetcher.schedule(selected)
+    
+    async def _prefetch(self, query: str) -> Optional[bool]:
+        """
+        Fetch one follow-up query into the result cache.
+        
+        Skips queries that are already cached or in flight, and backs off
+        while any endpoint has recent failures or the shared rate limiter is
+        below half its burst, so prefetching never takes capacity a
+        foreground search needs.
+        """
+        cache_key = self._cache_key(query)
+        if self.result_cache is None or cache_key in self.result_cache or cache_key in self._inflight:
+            return None
+        if self.failure_count > 0 or self._is_circuit_breaker_open():
+            return None
+        if self.rate_limiter is not None and self.rate_limiter.available() < 1 + self.rate_limiter.burst / 2:
+            return None
+        
+        logger.debug("Prefetching query: %s", query)
+        # The worker may have been started during a tool call; its deadline
+        # does not apply to background work
+        _call_deadline.set(None)
+        _call_progress.set(None)
+        _prefetching.set(True)
+        outcome = await self._coalesced_fetch(query, cache_key)
+        if not isinstance(outcome, dict):
+            return False
+        assert self.prefetcher is not None
+        self.prefetcher.mark_prefetched(cache_key)
+        return True
+    
+    async def _search_mql5_docs_batch(self, queries: Any) -> List[TextContent]:
+        """
+        Search MQL5 documentation for several queries concurrently.
+        
+        Each query goes through ``_search_mql5_docs`` (and so shares its
+        caches, coalescing and HTTP client), with at most
+        ``batch_concurrency`` queries in flight at once.
+        
+        Args:
+            queries: List of search query strings
+            
+        Returns:
+            One TextContent per query, in the order the queries were given
+        """
+        if not isinstance(queries, list) or not queries:
+            return [TextContent(
+                type="text",
+                text="Error: queries must be a non-empty list of strings"
+            )]
+        
+        if len(queries) > self.config.batch_max_queries:
+            return [TextContent(
+                type="text",
+                text=f"Error: at most {self.config.batch_max_queries} queries are allowed per batch"
+            )]
+        
+        async def search_one(query: Any) -> List[TextContent]:
+            if not isinstance(query, str):
+                return [TextContent(
+                    type="text",
+                    text="Error: Search query must be a string"
+                )]
+            async with self._batch_semaphore:
+                return await self._search_mql5_docs(query)
+        
+        logger.info("Batch search for %d queries", len(queries))
+        outcomes = await asyncio.gather(
+            *(search_one(query) for query in queries),
+            return_exceptions=True
+        )
+        
+        results: List[TextContent] = []
+        for query, outcome in zip(queries, outcomes):
+            if isinstance(outcome, BaseException):
+                # One failing query must not fail the whole batch
+                logger.error("Batch search failed for query %r: %s", query, outcome)
+                results.append(TextContent(
+                    type="text",
+                    text=f"Documentation search failed for query: {query}"
+                ))
+            else:
+                results.extend(outcome)
+        return results
+    
+    async def _search_local_docs(self, query: str) -> List[TextContent]:
+        """Answer a query from the offline index only."""
+        local_data = await self._search_local_index(query)
+        if local_data is None:
+            return [TextContent(
+                type="text",
+                text="Local documentation index unavailable"
+            )]
+        return self._format_search_results(local_data, query)
+    
+    def _lookup_symbol(self, query: str) -> Optional[List[TextContent]]:
+        """Answer an identifier query from the symbol table, or return None."""
+        from mql5_symbols import SymbolTable, render_symbol_match
+        
+        if self.symbol_table is None:
+            if self._symbol_table_error is not None:
+                return None
+            try:
+                if self.config.symbol_table_path:
+                    self.symbol_table = SymbolTable.load(Path(self.config.symbol_table_path).expanduser())
+                else:
+                    self.symbol_table = SymbolTable.load()
+            except (OSError, ValueError, KeyError) as e:
+                self._symbol_table_error = str(e)
+                logger.error(f"Failed to load symbol table, identifier fast path disabled: {e}")
+                return None
+        
+        match = self.symbol_table.lookup(query, self.config.symbol_prefix_limit)
+        if match is None:
+            return None
+        self.metrics.increment("symbol_lookups", kind="exact" if match.exact else "prefix")
+        logger.info("Symbol table hit for query: %s", query)
+        return [TextContent(type="text", text=render_symbol_match(match))]
+    
+    async def _search_local_index(self, query: str) -> Optional[Dict[str, Any]]:
+        """Search the offline index, loading it on first use."""
+        local_index = await self._get_local_index()
+        if local_index is None:
+            return None
+        return local_index.search(query, self.config.max_snippets)
+    
+    async def _get_local_index(self) -> Optional[Union["LocalIndex", "VectorIndex"]]:
+        """Load the configured offline index once, off the event loop."""
+        if self.local_index is not None or self._local_index_error is not None:
+            return self.local_index
+        
+        async with self._local_index_lock:
+            if self.local_index is None and self._local_index_error is None:
+                use_vectors = self.config.local_backend == "vector"
+                if self.config.local_index_path:
+                    path = Path(self.config.local_index_path).expanduser()
+                elif use_vectors:
+                    path = self.config_path.parent / "mql5_docs_vectors"
+                else:
+                    path = self.config_path.parent / "mql5_docs_index.json.gz"
+                if use_vectors:
+                    from mql5_vector_index import VectorIndex
+                    loader = VectorIndex.load
+                else:
+                    from mql5_local_index import LocalIndex
+                    loader = LocalIndex.load
+                try:
+                    self.local_index = await asyncio.to_thread(loader, path)
+                except (ImportError, OSError, ValueError, KeyError) as e:
+                    self._local_index_error = str(e)
+                    logger.error(f"Failed to load local index from {path}: {e}")
+        return self.local_index
+    
+    async def _coalesced_fetch(
+        self, query: str, cache_key: Tuple[str, int]
+    ) -> Union[Dict[str, Any], List[TextContent]]:
+        """
+        Share one gateway request between concurrent identical searches.
+        
+        The first caller for a cache key starts the request; later callers
+        await the same task. Each waiter is shielded, so cancelling one of
+        them never cancels the request the others are waiting on. A waiter
+        whose tool call passes its deadline stops waiting and gets a
+        timeout message. Once the last waiter is gone, whether cancelled by
+        the client or out of time, the request is cancelled too, which
+        aborts the HTTP exchange and frees its connection.
+        
+        When streaming, every waiter whose client asked for progress is
+        sent the request's snippets as they arrive.
+        """
+        task = self._inflight.get(cache_key)
+        if task is None:
+            snippets = None
+            if self.config.streaming_enabled:
+                from mql5_streaming import SnippetBroadcast
+                
+                snippets = self._inflight_snippets[cache_key] = SnippetBroadcast()
+            task = asyncio.ensure_future(self._fetch_search_results(query, cache_key, snippets))
+            self._inflight[cache_key] = task
+            self._inflight_waiters[task] = 0
+            task.add_done_callback(lambda done: self._forget_inflight(cache_key, done))
+        else:
+            self.coalesced_requests += 1
+            logger.info("Joining in-flight search for query: %s", query)
+        
+        reporter = _call_progress.get()
+        broadcast = self._inflight_snippets.get(cache_key)
+        listener = None
+        if reporter is not None and broadcast is not None:
+            listener = functools.partial(reporter.add, query)
+            broadcast.subscribe(listener)
+        
+        self._inflight_waiters[task] += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), self._time_left())
+        except asyncio.TimeoutError:
+            self.metrics.increment("tool_deadline_exceeded")
+            logger.warning("Deadline passed while waiting for query: %s", query)
+            return [TextContent(
+                type="text",
+                text="Search timed out, please try again"
+            )]
+        finally:
+            if listener is not None:
+                assert broadcast is not None
+                broadcast.unsubscribe(listener)
+            self._release_waiter(cache_key, task)
+    
+    def _release_waiter(
+        self, cache_key: Tuple[str, int], task: "asyncio.Task[Union[Dict[str, Any], List[TextContent]]]"
+    ):
+        """Stop waiting on an in-flight request, cancelling it if nobody else waits."""
+        if task.done() or task not in self._inflight_waiters:
+            return
+        self._inflight_waiters[task] -= 1
+        if self._inflight_waiters[task] > 0:
+            return
+        # Forget it now so a new search for the same key starts afresh
+        # instead of joining a request that is being cancelled
+        self._forget_inflight(cache_key, task)
+        self.abandoned_requests += 1
+        task.cancel()
+    
+    def _forget_inflight(
+        self, cache_key: Tuple[str, int], task: "asyncio.Task[Union[Dict[str, Any], List[TextContent]]]"
+    ):
+        """Drop ``task`` from the in-flight tables."""
+        self._inflight_waiters.pop(task, None)
+        if self._inflight.get(cache_key) is task:
+            del self._inflight[cache_key]
+            self._inflight_snippets.pop(cache_key, None)
+    
+    async def _fetch_search_results(
+        self, query: str, cache_key: Tuple[str, int], snippets: Optional["SnippetBroadcast"] = None
+    ) -> Union[Dict[str, Any], List[TextContent]]:
+        """
+        Query the AWS API Gateway and cache successful responses.
+        
+        With ``snippets`` the response body is streamed and each snippet is
+        published to it as soon as it has been received.
+        
+        Returns:
+            The raw gateway payload on success, otherwise an error message
+            ready to hand back to the client
+        """
+        attempts: List[Endpoint] = []
+        try:
+            http_client = self._get_http_client()
             
             # Prepare request
             headers = {
                 "x-api-key": self.api_key,
-                "Content-Type": "application/json"
+                "Content-Type": "application/json",
+                **self._wire_headers
             }
             
             payload = {
@@ -248,62 +1351,516 @@ class MQL5MCPServer:
                 "max_snippets": self.config.max_snippets
             }
             
-            logger.info(f"Searching MQL5 docs for query: {query}")
+            if _prefetching.get():
+                logger.info("Prefetching MQL5 docs for query: %s", query)
+            else:
+                logger.info("Searching MQL5 docs for query: %s", query)
             
-            # Make request to AWS API Gateway
-            response = await self.http_client.post(
-                self.config.aws_api_gateway_url,
-                json=payload,
-                headers=headers
-            )
+            # Make request to AWS API Gateway; the outcome is charged to the
+            # endpoint that answered last
+            started = time.perf_counter()
+            response = await self._send_with_retries(http_client, payload, headers, attempts)
             
             # Handle response
-            if response.status_code == 200:
-                self._reset_circuit_breaker()
-                data = response.json()
-                return self._format_search_results(data, query)
-            
-            elif response.status_code == 401:
-                logger.error("Invalid API key")
-                self._increment_failure_count()
-                return [TextContent(
-                    type="text",
-                    text="Documentation service encountered an authentication error"
-                )]
-            
-            elif response.status_code == 429:
-                logger.warning("Rate limited by API Gateway")
-                return [TextContent(
-                    type="text",
-                    text="Search temporarily throttled"
-                )]
-            
-            else:
-                logger.error(f"API Gateway returned status {response.status_code}")
-                self._increment_failure_count()
-                return [TextContent(
-                    type="text",
-                    text="Documentation service error"
-                )]
+            self.metrics.increment("gateway_responses", status=str(response.status_code))
+            # Error bodies are never read; close every response, however it ends
+            try:
+                if response.status_code == 200:
+                    fmt = payload_format(response.headers.get("content-type", ""))
+                    content = await self._read_body(response, fmt, snippets, started)
+                    with self.metrics.timer(f"{fmt}_decode"):
+                        data = decode_payload(content, fmt)
+                    self._record_wire_bytes(response, fmt, content)
+                    if not isinstance(data, dict):
+                        logger.error(f"Unexpected response payload type: {type(data).__name__}")
+                        self._record_gateway_failure(attempts[-1])
+                        return [TextContent(
+                            type="text",
+                            text="Documentation service error"
+                        )]
+                    self._record_gateway_success(attempts[-1])
+                    if self._is_cacheable(data):
+                        self._store_cached(cache_key, data)
+                        if self.fuzzy_cache is not None:
+                            self.fuzzy_cache.put(query, cache_key[1], data)
+                    return data
+                
+                elif response.status_code == 401:
+                    logger.error("Invalid API key")
+                    self._record_gateway_failure(attempts[-1])
+                    return [TextContent(
+                        type="text",
+                        text="Documentation service encountered an authentication error"
+                    )]
+                
+                elif response.status_code == 429:
+                    logger.warning("Rate limited by API Gateway")
+                    self._record_gateway_failure(attempts[-1])
+                    return [TextContent(
+                        type="text",
+                        text="Search temporarily throttled"
+                    )]
+                
+                else:
+                    logger.error("API Gateway returned status %d", response.status_code)
+                    self._record_gateway_failure(attempts[-1])
+                    return [TextContent(
+                        type="text",
+                        text="Documentation service error"
+                    )]
+            finally:
+                await response.aclose()
+        
+        except asyncio.CancelledError:
+            # Nobody is waiting for the answer; not a backend failure
+            self.metrics.increment("gateway_requests_cancelled")
+            logger.info("Abandoned search cancelled for query: %s", query)
+            raise
+        
+        except CircuitOpenError:
+            self.metrics.increment("gateway_errors", kind="circuit_open")
+            logger.warning("No gateway endpoint available for query: %s", query)
+            text = "Documentation search temporarily unavailable"
+            if attempts:
+                # Refused on retry, after the gateway had been tried
+                return [TextContent(type="text", text=text)]
+            return _RefusedSearch("rejected", text)
+        
+        except RateLimitExceeded:
+            self.metrics.increment("gateway_errors", kind="client_throttled")
+            logger.warning("Client-side rate limit reached for query: %s", query)
+            text = "Search temporarily throttled"
+            if attempts:
+                return [TextContent(type="text", text=text)]
+            return _RefusedSearch("throttled", text)
         
         except httpx.TimeoutException:
-            logger.warning(f"Request timeout for query: {query}")
-            self._increment_failure_count()
+            self.metrics.increment("gateway_errors", kind="timeout")
+            logger.warning("Request timeout for query: %s", query)
+            self._record_gateway_failure(attempts[-1] if attempts else None)
             return [TextContent(
                 type="text",
                 text="Search timed out, please try again"
             )]
         
         except Exception as e:
-            logger.error(f"Unexpected error during search: {e}")
-            self._increment_failure_count()
+            self.metrics.increment("gateway_errors", kind="exception")
+            logger.error("Unexpected error during search: %s", e)
+            self._record_gateway_failure(attempts[-1] if attempts else None)
             return [TextContent(
                 type="text",
                 text="Documentation search temporarily unavailable"
             )]
     
+    async def _send_with_retries(
+        self,
+        http_client: httpx.AsyncClient,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+        attempts: List[Endpoint]
+    ) -> httpx.Response:
+        """
+        Send a gateway request, pacing it and retrying throttles and timeouts.
+        
+        Every attempt first waits for a rate limiter token. HTTP 429s and
+        timeouts are retried with exponential backoff and full jitter
+        (honouring ``Retry-After``) while the retry deadline (capped by the
+        tool call's deadline), the retry
+        count and the server-wide retry budget all allow it. Otherwise the
+        last response is returned, or the timeout re-raised, for the caller
+        to handle as before. Retries prefer endpoints not tried yet, and
+        every endpoint that answers is appended to ``attempts``. A half-open
+        probe that is about to be retried is recorded as failed first, so
+        its probe slot is not held by a request that is already over.
+        
+        Raises:
+            RateLimitExceeded: If no rate limiter token frees up in time
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.retry_deadline_seconds
+        call_deadline = _call_deadline.get()
+        if call_deadline is not None:
+            deadline = min(deadline, call_deadline)
+        self.retry_budget.record_request()
+        attempt = 0
+        
+        while True:
+            if self.rate_limiter is not None:
+                if not await self.rate_limiter.acquire(max_wait=deadline - loop.time()):
+                    raise RateLimitExceeded()
+            
+            retry_after = 0.0
+            tried = len(attempts)
+            try:
+                response = await self._post_with_hedging(http_client, payload, headers, attempts)
+            except httpx.TimeoutException:
+                if not self._should_retry(attempt, deadline, 0.0):
+                    raise
+                reason = "timeout"
+            else:
+                if response.status_code != 429:
+                    return response
+                retry_after = self._parse_retry_after(response)
+                if not self._should_retry(attempt, deadline, retry_after):
+                    return response
+                await response.aclose()
+                reason = "HTTP 429"
+            
+            for endpoint in attempts[tried:]:
+                if endpoint.breaker.state == HALF_OPEN:
+                    endpoint.breaker.record_failure()
+            delay = max(
+                retry_after,
+                backoff_delay(attempt, self.config.retry_base_delay_seconds, self.config.retry_max_delay_seconds)
+            )
+            delay = min(delay, max(0.0, deadline - loop.time()))
+            self.retries += 1
+            attempt += 1
+            logger.info(
+                "Retrying gateway request after %s in %.0f ms (attempt %d)", reason, delay * 1000, attempt
+            )
+            await asyncio.sleep(delay)
+    
+    async def _read_body(
+        self,
+        response: httpx.Response,
+        fmt: str,
+        snippets: Optional["SnippetBroadcast"],
+        started: float
+    ) -> bytes:
+        """
+        Return the response body, publishing JSON snippets as they arrive.
+        
+        Without ``snippets`` the body has already been read in full.
+        """
+        if snippets is None:
+            return response.content
+        
+        from mql5_streaming import SnippetParser
+        
+        parser = SnippetParser() if fmt == "json" else None
+        chunks: List[bytes] = []
+        try:
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                if parser is None:
+                    continue
+                for snippet in parser.feed(chunk):
+                    if not snippets.snippets:
+                        self.metrics.observe("first_snippet", time.perf_counter() - started)
+                    snippets.publish(snippet)
+                    self.metrics.increment("gateway_snippets_streamed")
+        finally:
+            await response.aclose()
+        return b"".join(chunks)
+    
+    def _record_wire_bytes(self, response: httpx.Response, fmt: str, content: bytes):
+        """Count bytes received on the wire and after decompression."""
+        encoding = response.headers.get("content-encoding", "identity")
+        self.metrics.increment("gateway_wire_bytes", response.num_bytes_downloaded, encoding=encoding)
+        self.metrics.increment("gateway_payload_bytes", len(content), format=fmt)
+    
+    def _should_retry(self, attempt: int, deadline: float, min_delay: float) -> bool:
+        """Check the retry count, deadline and retry budget for another attempt."""
+        if attempt >= self.config.max_retries:
+            return False
+        if asyncio.get_running_loop().time() + min_delay >= deadline:
+            return False
+        return self.retry_budget.try_spend()
+    
+    @staticmethod
+    def _parse_retry_after(response: httpx.Response) -> float:
+        """Return the Retry-After delay in seconds, or 0 if absent or not numeric."""
+        try:
+            return max(0.0, float(response.headers.get("retry-after", 0)))
+        except ValueError:
+            return 0.0
+    
+    async def _post_with_hedging(
+        self,
+        http_client: httpx.AsyncClient,
+        payload: Dict[str, Any],
+        headers: Dict[str, str],
+        attempts: List[Endpoint]
+    ) -> httpx.Response:
+        """
+        POST to the gateway, hedging slow requests when enabled.
+        
+        Each request goes to the best-scoring endpoint whose circuit breaker
+        admits it. Once the primary request has been outstanding longer than
+        the observed ``hedge_percentile`` latency, an identical second
+        request is sent, to another endpoint if there is a healthy one, and
+        only if a breaker admits it. The first response
+        to arrive wins and the other request is cancelled. A request that
+        fails with an exception only loses if the other one succeeds.
+        """
+        timeout = self._request_timeout()
+        
+        async def post(endpoint: Endpoint) -> httpx.Response:
+            started = time.perf_counter()
+            request = http_client.build_request(
+                "POST",
+                endpoint.url,
+                json=payload,
+                headers=headers,
+                timeout=timeout,
+                extensions={"trace": self._make_request_trace(started)}
+            )
+            try:
+                # When streaming, the body is read later by _read_body
+                response = await http_client.send(request, stream=self.config.streaming_enabled)
+            except asyncio.CancelledError:
+                # Abandoned or lost a hedge race: no outcome to record, but
+                # a half-open breaker gets its probe slot back
+                endpoint.breaker.release()
+                raise
+            except Exception as e:
+                elapsed = time.perf_counter() - started
+                if isinstance(e, httpx.TimeoutException):
+                    # The gateway took at least this long; leaving timeouts out
+                    # would shrink the adaptive timeout just as it gets slow
+                    self.latency.record(elapsed)
+                endpoint.observe(elapsed, error=True)
+                attempts.append(endpoint)
+                raise
+            elapsed = time.perf_counter() - started
+            self.latency.record(elapsed)
+            self.metrics.observe("gateway_request", elapsed)
+            endpoint.observe(elapsed, error=response.status_code == 429 or response.status_code >= 500)
+            attempts.append(endpoint)
+            return response
+        
+        endpoint = self.router.choose(exclude=attempts)
+        if endpoint is None:
+            raise CircuitOpenError()
+        hedge_delay = self._hedge_delay()
+        if hedge_delay is None:
+            return await post(endpoint)
+        
+        primary = asyncio.ensure_future(post(endpoint))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+            hedge_endpoint = self.router.choose(exclude=[endpoint]) if not done else None
+            if hedge_endpoint is not None:
+                self.hedged_requests += 1
+                logger.info(
+                    "Hedging gateway request to %s after %.0f ms", hedge_endpoint.url, hedge_delay * 1000
+                )
+                pending.add(asyncio.ensure_future(post(hedge_endpoint)))
+            
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if winners:
+                    if winners[0] is not primary:
+                        self.hedge_wins += 1
+                    for loser in winners[1:]:
+                        await loser.result().aclose()
+                    return winners[0].result()
+                error = next(iter(done)).exception()
+            # Every request failed; surface the last error to the caller
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    def _make_request_trace(self, started: float) -> Any:
+        """
+        Build an httpcore trace hook that times connection and first byte.
+        
+        Connection acquire covers pool wait plus any TCP/TLS setup, up to the
+        moment request headers start going out. Time to first byte runs from
+        there until the response headers have been received.
+        """
+        sent_at = started
+        
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal sent_at
+            if event_name.endswith("send_request_headers.started"):
+                sent_at = time.perf_counter()
+                self.metrics.observe("connection_acquire", sent_at - started)
+            elif event_name.endswith("receive_response_headers.complete"):
+                self.metrics.observe("time_to_first_byte", time.perf_counter() - sent_at)
+        
+        return trace
+    
+    def _request_timeout(self) -> Any:
+        """Return the per-request timeout, adapted to observed latency if enabled."""
+        if not self.config.adaptive_timeout_enabled or len(self.latency) < self.config.latency_min_samples:
+            return httpx.USE_CLIENT_DEFAULT
+        
+        observed = self.latency.percentile(self.config.adaptive_timeout_percentile) or 0.0
+        adaptive = min(
+            max(observed * self.config.adaptive_timeout_multiplier, self.config.adaptive_timeout_min_seconds),
+            self.config.adaptive_timeout_max_seconds
+        )
+        return httpx.Timeout(
+            adaptive,
+            connect=self.config.connect_timeout_seconds or self.config.timeout_seconds
+        )
+    
+    def _hedge_delay(self) -> Optional[float]:
+        """Return how long to wait before hedging, or None if hedging is off."""
+        if not self.config.hedging_enabled or len(self.latency) < self.config.latency_min_samples:
+            return None
+        return self.latency.percentile(self.config.hedge_percentile)
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the shared gateway client, creating it on first use."""
+        if self.http_client is None:
+            self.http_client = self._create_http_client()
+        return self.http_client
+    
+    def _create_http_client(
+        self, transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> httpx.AsyncClient:
+        """Build the gateway client with the configured pool and timeouts.
+        
+        Args:
+            transport: Optional transport override, used by tests and benchmarks
+        """
+        timeout = httpx.Timeout(
+            self.config.timeout_seconds,
+            connect=self.config.connect_timeout_seconds or self.config.timeout_seconds,
+            read=self.config.read_timeout_seconds or self.config.timeout_seconds
+        )
+        limits = httpx.Limits(
+            max_connections=self.config.pool_max_connections,
+            max_keepalive_connections=self.config.pool_max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry_seconds
+        )
+        
+        http2 = self.config.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but the h2 package is not installed, using HTTP/1.1")
+            http2 = False
+        
+        return httpx.AsyncClient(
+            timeout=timeout, limits=limits, http2=http2, transport=transport
+        )
+    
+    async def _warm_up_connection(self):
+        """
+        Open a pooled connection to every gateway endpoint ahead of the first search.
+        
+        Pays DNS, TCP and TLS setup off the critical path. Any HTTP status
+        means the connection is established, so the response is ignored and
+        failures never count toward the circuit breaker.
+        """
+        await asyncio.gather(*(
+            self._warm_up_endpoint(endpoint.url) for endpoint in self.router.endpoints
+        ))
+    
+    async def _warm_up_endpoint(self, url: str):
+        """Open a pooled connection to one gateway endpoint."""
+        started = time.perf_counter()
+        try:
+            response = await self._get_http_client().request("OPTIONS", url)
+            await response.aclose()
+            logger.info(
+                f"Gateway connection to {url} warmed up in {(time.perf_counter() - started) * 1000:.0f} ms "
+                f"(status {response.status_code}, {response.http_version})"
+            )
+        except httpx.HTTPError as e:
+            logger.warning(f"Gateway warm-up for {url} failed: {e}")
+    
+    def _start_warmup(self):
+        """Schedule the connection warm-up as a background task."""
+        if not self.config.warmup_enabled or self.config.search_mode == "local":
+            return
+        self._warmup_task = asyncio.create_task(self._warm_up_connection())
+    
+    def _cache_key(self, query: str) -> Tuple[str, int]:
+        """Build the result cache key for a query."""
+        return (normalize_query(query), self.config.max_snippets)
+    
+    async def _get_cached(self, cache_key: Tuple[str, int]) -> Optional[Dict[str, Any]]:
+        """Look a payload up in the memory cache, then the disk cache."""
+        if self.result_cache is not None:
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        if self.disk_cache is not None:
+            import sqlite3
+            
+            assert self._disk_executor is not None
+            try:
+                cached = await asyncio.get_running_loop().run_in_executor(
+                    self._disk_executor, self.disk_cache.get, self._disk_cache_key(cache_key)
+                )
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning("Disk cache read failed: %s", e)
+                cached = None
+            if cached is not None and self._is_cacheable(cached):
+                # Promote to memory so later hits skip the disk
+                if self.result_cache is not None:
+                    self.result_cache.put(cache_key, cached)
+                return cached
+        
+        return None
+    
+    def _store_cached(self, cache_key: Tuple[str, int], data: Dict[str, Any]):
+        """
+        Store a successful gateway payload in every enabled cache tier.
+        
+        The disk write, and any compaction it triggers, is queued on the disk
+        cache thread; the search does not wait for it.
+        """
+        if self.result_cache is not None:
+            self.result_cache.put(cache_key, data)
+        
+        if self.disk_cache is not None:
+            assert self._disk_executor is not None
+            write = self._disk_executor.submit(self.disk_cache.put, self._disk_cache_key(cache_key), data)
+            write.add_done_callback(self._check_disk_write)
+    
+    @staticmethod
+    def _check_disk_write(write: "concurrent.futures.Future[None]"):
+        """Log a failed background disk cache write."""
+        import sqlite3
+        
+        error = write.exception()
+        if isinstance(error, sqlite3.Error):
+            logger.warning("Disk cache write failed: %s", error)
+        elif error is not None:
+            logger.error("Disk cache write failed: %s", error)
+    
+    async def _close_disk_cache(self):
+        """Finish queued disk cache writes, then close the database."""
+        if self.disk_cache is None:
+            return
+        assert self._disk_executor is not None
+        await asyncio.get_running_loop().run_in_executor(self._disk_executor, self.disk_cache.close)
+        self._disk_executor.shutdown()
+        self.disk_cache = None
+        logger.info("Disk cache closed")
+    
+    @staticmethod
+    def _disk_cache_key(cache_key: Tuple[str, int]) -> str:
+        """Flatten a result cache key into the disk cache's text key."""
+        normalized_query, max_snippets = cache_key
+        return f"{max_snippets}:{normalized_query}"
+    
+    @staticmethod
+    def _is_cacheable(data: Any) -> bool:
+        """Check that a gateway payload is well-formed enough to cache."""
+        return (
+            isinstance(data, dict)
+            and isinstance(data.get("snippets", []), list)
+            and all(isinstance(snippet, dict) for snippet in data.get("snippets", []))
+        )
+    
     def _format_search_results(self, data: Dict[str, Any], query: str) -> List[TextContent]:
         """Format AWS RAG response into MCP TextContent."""
+        with self.metrics.timer("format_results"):
+            return self._render_search_results(data, query)
+    
+    def _render_search_results(self, data: Dict[str, Any], query: str) -> List[TextContent]:
+        """Render compacted snippets as markdown, one section per source."""
         try:
             snippets = data.get("snippets", [])
             
@@ -313,21 +1870,38 @@ class MQL5MCPServer:
                     text=f"No MQL5 documentation found for query: {query}"
                 )]
             
-            # Format results
-            formatted_text = f"# MQL5 Documentation Search Results\n\n"
-            formatted_text += f"**Query:** {query}\n\n"
+            compacted = compact_snippets(
+                snippets,
+                max_snippets=self.config.max_snippets,
+                dedupe_threshold=self.config.result_dedupe_threshold,
+                max_tokens=self.config.result_max_tokens
+            )
+            for action, count in (
+                ("deduplicated", compacted.duplicates),
+                ("omitted", compacted.omitted),
+                ("truncated", compacted.truncated),
+            ):
+                if count:
+                    self.metrics.increment("result_snippets_compacted", count, action=action)
             
-            for i, snippet in enumerate(snippets[:self.config.max_snippets], 1):
-                snippet_text = snippet.get("snippet", "")
-                source = snippet.get("source", "Unknown")
-                score = snippet.get("score", 0.0)
-                
-                formatted_text += f"## Result {i}\n"
-                formatted_text += f"**Source:** {source}\n"
-                formatted_text += f"**Relevance:** {score:.2f}\n\n"
-                formatted_text += f"```\n{snippet_text}\n```\n\n"
+            parts = ["# MQL5 Documentation Search Results\n\n", f"**Query:** {query}\n\n"]
+            for i, group in enumerate(compacted.groups, 1):
+                parts.append(f"## Result {i}\n")
+                parts.append(f"**Source:** {group.source}\n")
+                parts.append(f"**Relevance:** {group.score:.2f}\n")
+                also_in = [s for snippet in group.snippets for s in snippet.also_in]
+                if also_in:
+                    parts.append(f"**Also in:** {', '.join(dict.fromkeys(also_in))}\n")
+                parts.append("\n")
+                for snippet in group.snippets:
+                    parts.append(f"```\n{snippet.text}\n```\n\n")
+            
+            if compacted.omitted:
+                parts.append(
+                    f"_{compacted.omitted} lower-ranked snippet(s) omitted to fit the response budget._\n"
+                )
             
-            return [TextContent(type="text", text=formatted_text)]
+            return [TextContent(type="text", text="".join(parts))]
         
         except Exception as e:
             logger.error(f"Failed to format search results: {e}")
@@ -337,57 +1911,136 @@ class MQL5MCPServer:
             )]
     
     def _is_circuit_breaker_open(self) -> bool:
-        """Check if circuit breaker is currently open."""
-        if self.circuit_breaker_open_until is None:
-            return False
-        
-        import time
-        if time.time() < self.circuit_breaker_open_until:
-            return True
-        
-        # Reset circuit breaker after cooldown
-        self.circuit_breaker_open_until = None
-        self.failure_count = 0
-        logger.info("Circuit breaker reset after cooldown")
-        return False
+        """Check whether no gateway endpoint's circuit breaker admits a request."""
+        return not self.router.available()
     
-    def _increment_failure_count(self):
-        """Increment failure count and potentially open circuit breaker."""
-        self.failure_count += 1
-        logger.warning(f"Failure count: {self.failure_count}")
+    def _on_circuit_breaker_transition(self, url: str, state: str):
+        """Count and log a circuit breaker state change."""
+        self.metrics.increment("circuit_breaker_transitions", state=state)
+        if state == "open":
+            logger.error(f"Circuit breaker for {url} opened")
+        else:
+            logger.info(f"Circuit breaker for {url} is now {state.replace('_', '-')}")
+    
+    def _record_gateway_failure(self, endpoint: Optional[Endpoint]):
+        """
+        Count a failed search against a circuit breaker.
         
-        if self.failure_count >= self.config.circuit_breaker_failures:
-            import time
-            self.circuit_breaker_open_until = time.time() + self.config.circuit_breaker_cooldown
-            logger.error(f"Circuit breaker opened for {self.config.circuit_breaker_cooldown} seconds")
+        The failure is charged to ``endpoint``, or to every endpoint when it
+        happened before any of them answered.
+        """
+        for target in [endpoint] if endpoint is not None else self.router.endpoints:
+            target.breaker.record_failure()
+            logger.warning("Failure count for %s: %d", target.url, target.failure_count)
     
-    def _reset_circuit_breaker(self):
-        """Reset circuit breaker after successful request."""
-        if self.failure_count > 0:
-            self.failure_count = 0
-            logger.info("Circuit breaker reset after successful request")
+    def _record_gateway_success(self, endpoint: Endpoint):
+        """Count a successful search, closing a half-open circuit breaker."""
+        endpoint.breaker.record_success()
     
-    async def run(self):
-        """Run the MCP server."""
+    def _collect_server_metrics(self) -> Dict[str, Any]:
+        """Gather metrics from every component into one JSON-ready dictionary."""
+        metrics = self.metrics.snapshot()
+        metrics["gateway"] = {
+            "latency_window": self.latency.snapshot(),
+            "coalesced_requests": self.coalesced_requests,
+            "abandoned_requests": self.abandoned_requests,
+            "hedged_requests": self.hedged_requests,
+            "hedge_wins": self.hedge_wins,
+            "retries": self.retries,
+            "retry_budget_exhausted": self.retry_budget.exhausted,
+            "client_throttled": self.rate_limiter.throttled if self.rate_limiter else 0,
+            "endpoints": self.router.snapshot(),
+            "wire": {**self._wire_headers, "json_parser": json_parser()},
+        }
+        metrics["circuit_breaker"] = {
+            "open": not self.router.available(),
+            "state": self.router.state(),
+            "failure_count": self.failure_count,
+        }
+        metrics["cache"] = {
+            "memory": self.result_cache.stats.as_dict() if self.result_cache else None,
+            "memory_entries": len(self.result_cache) if self.result_cache else 0,
+            "disk": self.disk_cache.stats() if self.disk_cache else None,
+            "fuzzy": self.fuzzy_cache.stats.as_dict() if self.fuzzy_cache else None,
+            "fuzzy_entries": len(self.fuzzy_cache) if self.fuzzy_cache else 0,
+            "prefetch": self.prefetcher.stats.as_dict() if self.prefetcher else None,
+        }
+        metrics["daemon"] = self.daemon.snapshot() if self.daemon is not None else None
+        return metrics
+    
+    def _get_server_metrics(self) -> List[TextContent]:
+        """Return server metrics as JSON for the get_server_metrics tool."""
+        return [TextContent(
+            type="text",
+            text=json.dumps(self._collect_server_metrics(), indent=2)
+        )]
+    
+    def _render_prometheus_metrics(self) -> str:
+        """Render metrics, including component statistics, for Prometheus."""
+        gauges: Dict[str, float] = {
+            "circuit_breaker_open": 0 if self.router.available() else 1,
+            "circuit_breaker_failure_count": self.failure_count,
+            "gateway_endpoints": len(self.router),
+            "gateway_endpoints_open": sum(1 for e in self.router.endpoints if e.breaker.state == "open"),
+            "gateway_endpoints_half_open": sum(1 for e in self.router.endpoints if e.breaker.state == "half_open"),
+            "coalesced_requests": self.coalesced_requests,
+            "abandoned_requests": self.abandoned_requests,
+            "hedged_requests": self.hedged_requests,
+            "retries": self.retries,
+        }
+        if self.result_cache is not None:
+            for stat, value in self.result_cache.stats.as_dict().items():
+                gauges[f"result_cache_{stat}"] = value
+            gauges["result_cache_entries"] = len(self.result_cache)
+        if self.disk_cache is not None:
+            for stat, value in self.disk_cache.stats().items():
+                gauges[f"disk_cache_{stat}"] = value
+        if self.fuzzy_cache is not None:
+            for stat, value in self.fuzzy_cache.stats.as_dict().items():
+                gauges[f"fuzzy_cache_{stat}"] = value
+            gauges["fuzzy_cache_entries"] = len(self.fuzzy_cache)
+        if self.prefetcher is not None:
+            for stat, value in self.prefetcher.stats.as_dict().items():
+                gauges[f"prefetch_{stat}"] = value
+        if self.daemon is not None:
+            gauges["daemon_active_sessions"] = self.daemon.active_sessions
+            gauges["daemon_sessions_total"] = self.daemon.total_sessions
+        return self.metrics.render_prometheus(gauges)
+    
+    async def _export_metrics_periodically(self):
+        """Write the Prometheus metrics file at the configured interval."""
+        assert self.config.metrics_prometheus_path is not None
+        path = Path(self.config.metrics_prometheus_path).expanduser()
+        while True:
+            await asyncio.sleep(self.config.metrics_export_interval_seconds)
+            try:
+                await asyncio.to_thread(write_textfile, path, self._render_prometheus_metrics())
+            except OSError as e:
+                logger.warning(f"Failed to write metrics file {path}: {e}")
+    
+    def _initialization_options(self) -> InitializationOptions:
+        """Describe the server for the MCP initialize handshake."""
+        # Using details from pyproject.toml and tool description
+        return InitializationOptions(
+            server_name="mql5-rag-server",
+            server_version="0.1.0",
+            capabilities=self.server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities={}
+            ),
+            instructions="Search official MQL5 documentation for functions, syntax, examples, and best practices"
+        )
+    
+    @contextlib.asynccontextmanager
+    async def _running(self):
+        """Start background tasks, then release every resource on the way out."""
         try:
-            async with stdio_server() as (read_stream, write_stream):
-                logger.info("MCP server starting with stdio transport")
-                
-                # Define InitializationOptions for the server
-                # Using details from pyproject.toml and tool description
-                init_options = InitializationOptions(
-                    server_name="mql5-rag-server",
-                    server_version="0.1.0",
-                    capabilities=self.server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={}
-                    ),
-                    instructions="Search official MQL5 documentation for functions, syntax, examples, and best practices"
-                )
-                
-                logger.info(f"Starting MCP server with capabilities: {init_options.capabilities}")
-                await self.server.run(read_stream, write_stream, init_options)
-                
+            # Connect to the gateway while the client performs the MCP handshake
+            self._start_warmup()
+            if self.config.metrics_prometheus_path:
+                self._metrics_export_task = asyncio.create_task(self._export_metrics_periodically())
+            yield
+            
         except Exception as e:
             logger.error(f"Server error: {e}", exc_info=True)
             # Print to stderr so Claude Desktop can see the error
@@ -395,14 +2048,213 @@ class MQL5MCPServer:
             raise
         finally:
             # Cleanup
+            if self._warmup_task and not self._warmup_task.done():
+                self._warmup_task.cancel()
+            if self._metrics_export_task:
+                self._metrics_export_task.cancel()
+            if self.prefetcher is not None:
+                await self.prefetcher.close()
+            if self.follow_ups is not None:
+                self.follow_ups.save(self._prefetch_history_path())
+            if self.trace is not None:
+                self.trace.close()
             if self.http_client:
                 await self.http_client.aclose()
                 logger.info("HTTP client closed")
+            await self._close_disk_cache()
+            if self.local_index is not None:
+                self.local_index.close()
             logger.info("MCP server shutdown complete")
+    
+    async def run(self):
+        """Run the MCP server."""
+        async with self._running():
+            async with stdio_server() as (read_stream, write_stream):
+                logger.info("MCP server starting with stdio transport")
+                init_options = self._initialization_options()
+                logger.info(f"Starting MCP server with capabilities: {init_options.capabilities}")
+                await self.server.run(read_stream, write_stream, init_options)
+    
+    async def _serve_session(self, read_stream: "ReadStream", write_stream: "WriteStream"):
+        """Serve one daemon client until it disconnects."""
+        await self.server.run(read_stream, write_stream, self._initialization_options())
+    
+    def _create_daemon(self) -> "SessionDaemon":
+        """Build the listener for daemon mode from the configuration."""
+        from mql5_daemon import SessionDaemon, default_address
+        
+        return SessionDaemon(
+            self.config.daemon_address or default_address(),
+            self._serve_session,
+            idle_timeout_seconds=self.config.daemon_idle_timeout_seconds
+        )
+    
+    async def run_daemon(self):
+        """
+        Serve every client connecting to the daemon address from this process.
+        
+        All sessions share the HTTP client, circuit breakers, caches and rate
+        limits. Returns once the daemon has been idle for
+        daemon_idle_timeout_seconds.
+        
+        Raises:
+            DaemonAlreadyRunning: If another daemon is listening on the address
+        """
+        self.daemon = self._create_daemon()
+        # Fail before touching the gateway if another daemon owns the address
+        address = await self.daemon.start()
+        async with self._running():
+            logger.info(f"MCP server starting as a shared daemon on {address}")
+            await self.daemon.serve()
 
 
-def main():
+async def measure_startup(config_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Time a cold start up to a completed MCP initialize handshake.
+    
+    ``ready_ms`` launches this module as a subprocess over stdio, the way
+    Claude Desktop does, and runs until the initialize response arrives, so
+    it includes interpreter startup and imports. ``server_init_ms`` and
+    ``initialize_handshake_ms`` break down the in-process part using
+    in-memory streams.
+    """
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+    from mcp.shared.memory import create_connected_server_and_client_session
+    
+    if config_path is None:
+        config_path = Path("config.yaml")
+    config_path = config_path.resolve()
+    
+    def ms(seconds: float) -> float:
+        return round(seconds * 1000, 2)
+    
+    # The server reads config.yaml from its working directory
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[str(Path(__file__).resolve())],
+        env=dict(os.environ),
+        cwd=config_path.parent
+    )
+    launched = time.perf_counter()
+    async with stdio_client(params) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            ready = time.perf_counter()
+            await session.list_tools()
+            listed = time.perf_counter()
+    
+    started = time.perf_counter()
+    server = MQL5MCPServer(config_path)
+    constructed = time.perf_counter()
+    async with create_connected_server_and_client_session(server.server):
+        initialized = time.perf_counter()
+    
+    return {
+        "ready_ms": ms(ready - launched),
+        "list_tools_ms": ms(listed - ready),
+        "server_init_ms": ms(constructed - started),
+        "initialize_handshake_ms": ms(initialized - constructed),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point for the MQL5 MCP Server."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="MQL5 documentation RAG MCP server (stdio)")
+    parser.add_argument(
+        "--measure-startup",
+        action="store_true",
+        help="Report import, init and initialize-handshake timings as JSON and exit"
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run the shared daemon that serves every --connect client"
+    )
+    mode.add_argument(
+        "--connect",
+        action="store_true",
+        help="Relay stdio to the shared daemon, starting it if needed (standalone if it cannot be reached)"
+    )
+    args = parser.parse_args(argv)
+    
+    from mql5_logging import QueuedLogging
+    
+    # Records queue up until the config says where to write them
+    log_pipeline = QueuedLogging()
+    try:
+        if args.measure_startup:
+            log_pipeline.start()
+            report = asyncio.run(measure_startup())
+            print(json.dumps(report, indent=2))
+        elif args.daemon:
+            _serve_daemon(log_pipeline)
+        elif args.connect:
+            _connect(log_pipeline)
+        else:
+            _serve(log_pipeline)
+    finally:
+        # Fall back to the default outputs if the config never loaded
+        log_pipeline.start()
+        log_pipeline.stop()
+
+
+def _start_logging(log_pipeline: "QueuedLogging", config: ServerConfig):
+    """Apply the configured log level and start writing log records."""
+    logging.getLogger().setLevel(MCP_LOG_LEVELS.get(config.log_level.lower(), logging.INFO))
+    log_pipeline.start(
+        log_file=config.log_file,
+        max_bytes=int(config.log_max_mb * 1024 * 1024),
+        backup_count=config.log_backup_count,
+        repeat_limit=config.log_repeat_limit,
+        repeat_window_seconds=config.log_repeat_window_seconds
+    )
+
+
+def _serve_daemon(log_pipeline: "QueuedLogging"):
+    """Run the shared daemon until it has been idle for long enough."""
+    from mql5_daemon import DaemonAlreadyRunning
+    
+    server = MQL5MCPServer()
+    _start_logging(log_pipeline, server.config)
+    try:
+        asyncio.run(server.run_daemon())
+    except DaemonAlreadyRunning as e:
+        # Two clients started a daemon at the same time; the other one serves
+        logger.info(f"A daemon is already listening on {e}")
+    except KeyboardInterrupt:
+        logger.info("Daemon shutdown requested")
+
+
+def _connect(log_pipeline: "QueuedLogging"):
+    """Relay stdio to the shared daemon, or serve standalone if it cannot be reached."""
+    from mql5_daemon import DaemonUnavailable, connect, default_address, relay
+    
+    config = MQL5MCPServer._load_config(Path("config.yaml"))
+    address = config.daemon_address or default_address()
+    # The daemon inherits this working directory, and with it config.yaml
+    command = [sys.executable, str(Path(__file__).resolve()), "--daemon"]
+    
+    async def shim():
+        reader, writer = await connect(address, command, config.daemon_start_timeout_seconds)
+        # The daemon owns the log file; the shim only reports to stderr
+        log_pipeline.start(log_file=None)
+        await relay(reader, writer)
+    
+    try:
+        asyncio.run(shim())
+    except DaemonUnavailable as e:
+        logger.warning(f"{e}, running a standalone server")
+        _serve(log_pipeline)
+    except KeyboardInterrupt:
+        pass
+
+
+def _serve(log_pipeline: "QueuedLogging"):
+    """Run the stdio server until the client disconnects."""
     # Add debug output to stderr for Claude Desktop logs
     print("MQL5 MCP Server starting...", file=sys.stderr)
     
@@ -429,6 +2281,7 @@ def main():
     try:
         print("Initializing MQL5 MCP Server...", file=sys.stderr)
         server = MQL5MCPServer()
+        _start_logging(log_pipeline, server.config)
         print("Server initialized, starting async loop...", file=sys.stderr)
         asyncio.run(server.run())
     except KeyboardInterrupt:
@@ -0,0 +1,156 @@
+"""
+In-process metrics for the MQL5 MCP Server.
+
+Per-phase timings go into fixed-bucket histograms and events into labelled
+counters. Recording is a dict lookup plus a bisect, so it is cheap enough
+for the search hot path. Snapshots feed the ``get_server_metrics`` tool and
+can be rendered in the Prometheus text exposition format.
+"""
+
+import bisect
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds, from 0.1 ms to 10 s
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _escape_label_value(value: str) -> str:
+    """Escape a label value as the Prometheus text exposition format requires."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    """Cumulative-friendly bucket histogram with sum and count."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """Record one duration."""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within its bucket."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """Return count, mean and estimated percentiles in milliseconds."""
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.sum / self.count) if self.count else None,
+            "p50_ms": ms(self.quantile(0.50)),
+            "p95_ms": ms(self.quantile(0.95)),
+            "p99_ms": ms(self.quantile(0.99)),
+        }
+
+
+class MetricsRegistry:
+    """Named phase histograms and labelled counters."""
+
+    def __init__(self, prefix: str = "mql5_mcp"):
+        self.prefix = prefix
+        self.started_at = time.time()
+        self.phases: Dict[str, Histogram] = {}
+        self.counters: Dict[str, Dict[LabelKey, int]] = {}
+
+    def observe(self, phase: str, seconds: float) -> None:
+        """Record the duration of one phase."""
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        """Time the enclosed block as ``phase``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - started)
+
+    def increment(self, name: str, amount: int = 1, **labels: str) -> None:
+        """Add ``amount`` to the counter ``name`` with the given labels."""
+        series = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[str, object]:
+        """Return all metrics as JSON-serializable data."""
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "phases": {name: h.summary() for name, h in sorted(self.phases.items())},
+            "counters": {
+                name: {
+                    ",".join(f"{k}={v}" for k, v in key) or "total": value
+                    for key, value in sorted(series.items())
+                }
+                for name, series in sorted(self.counters.items())
+            },
+        }
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Render metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        name = f"{self.prefix}_phase_duration_seconds"
+        if self.phases:
+            lines.append(f"# HELP {name} Duration of each search phase")
+            lines.append(f"# TYPE {name} histogram")
+        for phase, histogram in sorted(self.phases.items()):
+            phase = _escape_label_value(phase)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{phase="{phase}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{name}_sum{{phase="{phase}"}} {histogram.sum}')
+            lines.append(f'{name}_count{{phase="{phase}"}} {histogram.count}')
+
+        for counter, series in sorted(self.counters.items()):
+            metric = f"{self.prefix}_{counter}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in sorted(series.items()):
+                labels = ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in key)
+                lines.append(f"{metric}{{{labels}}} {value}" if labels else f"{metric} {value}")
+
+        for gauge, value in sorted((gauges or {}).items()):
+            metric = f"{self.prefix}_{gauge}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def write_textfile(path: Path, content: str) -> None:
+    """Atomically replace ``path`` so scrapers never read a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
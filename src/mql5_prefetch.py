@@ -0,0 +1,283 @@
+"""
+Speculative prefetch of follow-up searches for the MQL5 MCP Server.
+
+Lookups come in predictable runs: ``ArrayResize`` is usually followed by
+``ArraySize`` or ``ArrayFree``, and ``OrderSend`` by ``MqlTradeRequest``.
+After a successful search the server queues the likely follow-ups and
+fetches them into the result cache in the background, so the next lookup
+is a cache hit instead of a gateway round trip.
+
+Follow-ups come from two sources:
+
+* ``FollowUpModel`` counts which query followed which in past sessions and
+  is saved to a small JSON file at shutdown;
+* ``RELATED_QUERIES`` is a static map of MQL5 symbols that are used together.
+
+``Prefetcher`` keeps speculation cheap: a bounded queue, a fixed number of
+workers, a per-minute quota of its own, and no prefetch while a foreground
+search is waiting on the gateway.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Set
+
+from mql5_cache import normalize_query
+from mql5_rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FORMAT_VERSION = 1
+
+_WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+# Symbols that are usually looked up together, keyed by lower-cased name
+RELATED_QUERIES: Dict[str, List[str]] = {
+    "arrayresize": ["ArraySize", "ArrayFree", "ArraySetAsSeries"],
+    "arraysize": ["ArrayResize", "ArrayFree"],
+    "arraysetasseries": ["CopyBuffer", "CopyRates", "ArrayResize"],
+    "arraycopy": ["ArrayResize", "ArraySize"],
+    "ordersend": ["MqlTradeRequest", "MqlTradeResult", "OrderCheck"],
+    "ordersendasync": ["MqlTradeRequest", "MqlTradeResult", "OnTradeTransaction"],
+    "ordercheck": ["MqlTradeCheckResult", "OrderSend"],
+    "mqltraderequest": ["OrderSend", "ENUM_TRADE_REQUEST_ACTIONS", "ENUM_ORDER_TYPE"],
+    "mqltraderesult": ["OrderSend", "TRADE_RETCODE_DONE"],
+    "ctrade": ["CTrade::Buy", "CTrade::Sell", "CTrade::PositionClose"],
+    "positionselect": ["PositionGetDouble", "PositionGetInteger", "PositionsTotal"],
+    "positionstotal": ["PositionGetTicket", "PositionSelectByTicket"],
+    "positiongetticket": ["PositionSelectByTicket", "PositionGetDouble"],
+    "copybuffer": ["iMA", "iRSI", "ArraySetAsSeries", "BarsCalculated"],
+    "copyrates": ["MqlRates", "ArraySetAsSeries"],
+    "ima": ["CopyBuffer", "ENUM_MA_METHOD", "IndicatorRelease"],
+    "irsi": ["CopyBuffer", "IndicatorRelease"],
+    "symbolinfodouble": ["SymbolInfoTick", "ENUM_SYMBOL_INFO_DOUBLE"],
+    "symbolinfotick": ["MqlTick", "SymbolInfoDouble"],
+    "oninit": ["OnDeinit", "OnTick"],
+    "ontick": ["OnInit", "SymbolInfoTick"],
+    "oncalculate": ["SetIndexBuffer", "PlotIndexSetInteger"],
+    "setindexbuffer": ["OnCalculate", "PlotIndexSetInteger"],
+}
+
+
+def related_queries(query: str) -> List[str]:
+    """Return the statically related symbols for the identifiers in ``query``."""
+    related: List[str] = []
+    for word in _WORD_RE.findall(query):
+        for candidate in RELATED_QUERIES.get(word.lower(), ()):
+            if candidate not in related:
+                related.append(candidate)
+    return related
+
+
+class FollowUpModel:
+    """
+    Counts which query followed which, bounded in size.
+
+    Queries are normalized like cache keys. The least recently seen
+    queries are forgotten first, and each query keeps only its most
+    frequent followers.
+    """
+
+    def __init__(self, max_queries: int = 2000, max_followers: int = 8):
+        self.max_queries = max_queries
+        self.max_followers = max_followers
+        self._followers: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._followers)
+
+    def record(self, previous: str, current: str) -> None:
+        """Count ``current`` as a follow-up of ``previous``."""
+        previous, current = normalize_query(previous), normalize_query(current)
+        if not previous or not current or previous == current:
+            return
+        counts = self._followers.pop(previous, {})
+        counts[current] = counts.get(current, 0) + 1
+        if len(counts) > self.max_followers:
+            del counts[min((q for q in counts if q != current), key=counts.__getitem__)]
+        self._followers[previous] = counts
+        while len(self._followers) > self.max_queries:
+            self._followers.popitem(last=False)
+
+    def followers(self, query: str, limit: int, min_count: int = 1) -> List[str]:
+        """Return up to ``limit`` follow-ups seen at least ``min_count`` times, most frequent first."""
+        counts = self._followers.get(normalize_query(query), {})
+        ranked = sorted(counts.items(), key=lambda item: -item[1])
+        return [q for q, count in ranked if count >= min_count][:limit]
+
+    @classmethod
+    def load(cls, path: Path, max_queries: int = 2000, max_followers: int = 8) -> "FollowUpModel":
+        """Load a saved model, or start empty if the file is missing or unreadable."""
+        model = cls(max_queries, max_followers)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return model
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable prefetch history {path}: {e}")
+            return model
+        if not isinstance(data, dict) or data.get("version") != HISTORY_FORMAT_VERSION:
+            logger.warning(f"Ignoring prefetch history {path} with unsupported format")
+            return model
+        for query, counts in data.get("followers", {}).items():
+            model._followers[query] = {q: int(c) for q, c in counts.items()}
+        while len(model._followers) > model.max_queries:
+            model._followers.popitem(last=False)
+        return model
+
+    def save(self, path: Path) -> None:
+        """Write the model atomically; failures are logged and ignored."""
+        data = {"version": HISTORY_FORMAT_VERSION, "followers": self._followers}
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to save prefetch history {path}: {e}")
+
+
+@dataclass
+class PrefetchStats:
+    """Counters describing how much speculation was done and how much paid off."""
+
+    scheduled: int = 0
+    dropped: int = 0
+    over_quota: int = 0
+    fetched: int = 0
+    skipped: int = 0
+    failed: int = 0
+    hits: int = 0
+
+    def as_dict(self) -> Dict[str, float]:
+        """Return the counters and the share of fetched results that were used."""
+        stats: Dict[str, float] = asdict(self)
+        stats["hit_rate"] = round(self.hits / self.fetched, 4) if self.fetched else 0.0
+        return stats
+
+
+class Prefetcher:
+    """
+    Runs speculative fetches in the background under strict limits.
+
+    ``fetch`` performs one prefetch and returns True if a result was
+    stored, False if the gateway failed, or None if it decided to skip the
+    query. Up to ``concurrency`` workers drain a queue of at most
+    ``max_pending`` queries. Workers wait while any search runs inside
+    ``foreground()``, and once ``max_per_minute`` is used up the queue is
+    dropped rather than left to go stale.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Awaitable[Optional[bool]]],
+        concurrency: int = 1,
+        max_pending: int = 16,
+        max_per_minute: float = 20,
+        max_tracked: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.max_tracked = max_tracked
+        self.stats = PrefetchStats()
+        self._fetch = fetch
+        self._quota = TokenBucket(rate=max_per_minute / 60, burst=max(1.0, max_per_minute), clock=clock)
+        self._pending: "OrderedDict[str, None]" = OrderedDict()
+        self._workers: Set["asyncio.Task[None]"] = set()
+        self._prefetched: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._foreground = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @contextmanager
+    def foreground(self) -> Iterator[None]:
+        """Hold back prefetches while a foreground search is in progress."""
+        self._foreground += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._foreground -= 1
+            if self._foreground == 0:
+                self._idle.set()
+
+    def schedule(self, queries: List[str]) -> int:
+        """Queue queries for prefetching and return how many were added."""
+        added = 0
+        for query in queries:
+            if query in self._pending:
+                continue
+            if len(self._pending) >= self.max_pending:
+                self.stats.dropped += 1
+                continue
+            self._pending[query] = None
+            added += 1
+        self.stats.scheduled += added
+        while self._pending and len(self._workers) < min(self.concurrency, len(self._pending)):
+            worker = asyncio.ensure_future(self._work())
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+        return added
+
+    async def _work(self) -> None:
+        while self._pending:
+            await self._idle.wait()
+            if not self._pending:
+                return
+            query, _ = self._pending.popitem(last=False)
+            if self._quota.reserve(max_wait=0) is None:
+                self.stats.over_quota += 1 + len(self._pending)
+                self._pending.clear()
+                logger.info("Prefetch quota used up, dropping queued prefetches")
+                return
+            try:
+                outcome = await self._fetch(query)
+            except Exception as e:
+                logger.warning("Prefetch failed for query %s: %s", query, e)
+                outcome = False
+            if outcome is None:
+                self.stats.skipped += 1
+            elif outcome:
+                self.stats.fetched += 1
+            else:
+                self.stats.failed += 1
+
+    def mark_prefetched(self, key: Hashable) -> None:
+        """Remember that the result for ``key`` was stored by a prefetch."""
+        self._prefetched[key] = None
+        self._prefetched.move_to_end(key)
+        while len(self._prefetched) > self.max_tracked:
+            self._prefetched.popitem(last=False)
+
+    def claim(self, key: Hashable) -> bool:
+        """Count a foreground cache hit on a prefetched result; return True if it was one."""
+        if key not in self._prefetched:
+            return False
+        del self._prefetched[key]
+        self.stats.hits += 1
+        return True
+
+    async def join(self) -> None:
+        """Wait until every queued prefetch has been processed."""
+        while self._workers:
+            await asyncio.gather(*list(self._workers), return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel queued and running prefetches."""
+        self._pending.clear()
+        workers = list(self._workers)
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -0,0 +1,117 @@
+"""
+Client-side rate limiting and retry pacing for the MQL5 MCP Server.
+
+A token bucket sized to the API Gateway usage plan queues bursts briefly
+instead of letting them turn into HTTP 429s, and a retry budget caps how
+much extra load retries can add on top of first attempts.
+"""
+
+import asyncio
+import random
+import time
+from typing import Callable, Optional
+
+
+class RateLimitExceeded(Exception):
+    """Raised when no request slot frees up before the call's deadline."""
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations in arrival order.
+
+    Each acquisition takes a token immediately, letting the balance go
+    negative; the caller then sleeps until the refill catches up with its
+    reservation. Callers therefore proceed in FIFO order at ``rate`` per
+    second once the ``burst`` allowance is spent.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.throttled = 0
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """Reserve one token.
+
+        Returns:
+            Seconds to wait before using the token, or None if the wait would
+            exceed ``max_wait`` (no token is taken in that case)
+        """
+        self._refill()
+        wait = max(0.0, (1 - self.tokens) / self.rate)
+        if max_wait is not None and wait > max_wait:
+            self.throttled += 1
+            return None
+        self.tokens -= 1
+        return wait
+
+    def available(self) -> float:
+        """Return the number of tokens that could be taken without waiting."""
+        self._refill()
+        return self.tokens
+
+    async def acquire(self, max_wait: Optional[float] = None) -> bool:
+        """Wait for a token; return False if it is not available within ``max_wait``."""
+        wait = self.reserve(max_wait)
+        if wait is None:
+            return False
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return True
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of first attempts.
+
+    Every first attempt deposits ``ratio`` tokens (up to ``max_tokens``);
+    every retry spends one. With ``ratio=0.2`` retries can add at most 20%
+    to sustained gateway load, while ``max_tokens`` allows short bursts of
+    retries after idle periods.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.exhausted = 0
+
+    def record_request(self) -> None:
+        """Credit the budget for a first attempt."""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Spend one retry token if available."""
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.exhausted += 1
+        return False
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    cap: float,
+    rng: Callable[[float, float], float] = random.uniform,
+) -> float:
+    """Exponential backoff with full jitter for the given retry attempt (0-based)."""
+    return rng(0, min(cap, base * (2 ** attempt)))
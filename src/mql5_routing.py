@@ -0,0 +1,137 @@
+"""
+Gateway endpoint routing for the MQL5 MCP Server.
+
+The RAG gateway can be deployed to several regions or stages. Each request
+goes to the endpoint with the lowest score: its exponentially weighted
+moving average (EWMA) latency plus its EWMA error rate times a fixed
+penalty. Slow or failing endpoints therefore lose traffic to the fastest
+healthy one, and get it back once they recover. A small share of requests
+explores a random endpoint so the averages of idle endpoints stay current.
+
+Every endpoint has its own circuit breaker. A failing region is taken out
+of rotation on its own, and search is only unavailable while no breaker
+lets a request through.
+"""
+
+import random
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from mql5_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class Endpoint:
+    """One gateway URL with its latency, error rate and circuit breaker."""
+
+    def __init__(self, url: str, alpha: float, breaker: CircuitBreaker):
+        self.url = url
+        self.alpha = alpha
+        self.breaker = breaker
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool) -> None:
+        """Fold one request's latency and outcome into the moving averages."""
+        self.requests += 1
+        if error:
+            self.errors += 1
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency += self.alpha * (seconds - self.latency)
+        self.error_rate += self.alpha * ((1.0 if error else 0.0) - self.error_rate)
+
+    @property
+    def failure_count(self) -> int:
+        """Failed searches within the breaker's sliding window."""
+        return self.breaker.failure_count
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the endpoint state for reporting."""
+        return {
+            "url": self.url,
+            "ewma_latency_ms": round(self.latency * 1000, 2) if self.latency is not None else None,
+            "ewma_error_rate": round(self.error_rate, 4),
+            "requests": self.requests,
+            "errors": self.errors,
+            "breaker": self.breaker.snapshot(),
+        }
+
+
+class EndpointRouter:
+    """
+    Picks the best endpoint for each request and keeps per-endpoint breakers.
+
+    Endpoints without a latency sample yet are tried first, in configured
+    order, so every endpoint is measured early on. Ties go to the endpoint
+    listed first. ``breaker_factory`` builds the circuit breaker for each URL.
+    """
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        breaker_factory: Callable[[str], CircuitBreaker],
+        alpha: float = 0.2,
+        error_penalty_seconds: float = 2.0,
+        explore_ratio: float = 0.05,
+        rng: Optional[random.Random] = None,
+    ):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.endpoints: List[Endpoint] = []
+        for url in urls:
+            if all(endpoint.url != url for endpoint in self.endpoints):
+                self.endpoints.append(Endpoint(url, alpha, breaker_factory(url)))
+        if not self.endpoints:
+            raise ValueError("at least one endpoint is required")
+        self.error_penalty_seconds = error_penalty_seconds
+        self.explore_ratio = explore_ratio
+        self._rng = rng if rng is not None else random.Random()
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def score(self, endpoint: Endpoint) -> float:
+        """Expected cost of a request in seconds; lower is better."""
+        return (endpoint.latency or 0.0) + endpoint.error_rate * self.error_penalty_seconds
+
+    def choose(self, exclude: Iterable[Endpoint] = ()) -> Optional[Endpoint]:
+        """Return the endpoint for the next request, or None if no breaker admits one.
+
+        Endpoints in ``exclude`` (for example the one a hedged request is
+        already waiting on) are avoided unless nothing else is available.
+        Half-open endpoints only get a probe when no closed endpoint is
+        available, or when picked for exploration.
+        """
+        admitted = [endpoint for endpoint in self.endpoints if endpoint.breaker.can_request()]
+        excluded = set(map(id, exclude))
+        candidates = [endpoint for endpoint in admitted if id(endpoint) not in excluded] or admitted
+        if not candidates:
+            return None
+        if len(candidates) > 1 and self._rng.random() < self.explore_ratio:
+            chosen = self._rng.choice(candidates)
+        else:
+            closed = [endpoint for endpoint in candidates if endpoint.breaker.state == CLOSED]
+            chosen = min(
+                closed or candidates,
+                key=lambda endpoint: (endpoint.latency is not None, self.score(endpoint))
+            )
+        chosen.breaker.acquire()
+        return chosen
+
+    def available(self) -> bool:
+        """Check whether any endpoint's breaker would let a request through."""
+        return any(endpoint.breaker.can_request() for endpoint in self.endpoints)
+
+    def state(self) -> str:
+        """Overall state: closed if any breaker is, else half-open if any is, else open."""
+        states = {endpoint.breaker.state for endpoint in self.endpoints}
+        for state in (CLOSED, HALF_OPEN):
+            if state in states:
+                return state
+        return OPEN
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return the state of every endpoint for reporting."""
+        return [endpoint.snapshot() for endpoint in self.endpoints]
@@ -0,0 +1,294 @@
+"""
+Offline cache and gateway policy simulator for the MQL5 MCP Server.
+
+Replays query traces recorded with ``trace_enabled`` (or rebuilt from
+server logs) against candidate result cache settings, using the server's
+own ``ResultCache``, ``TokenBucket`` and ``CircuitBreaker`` on a simulated
+clock. For each candidate it reports the hit rate, how many gateway calls
+would have been made and how much waiting the cache would have saved, so
+production settings can be chosen from the real workload:
+
+    mql5-simulate mql5_query_trace.jsonl
+    mql5-simulate mql5_query_trace.jsonl --policy lru:500:3600 --policy lfu:500:0
+    mql5-simulate mql5_mcp_server.log --config config.yaml --sizes 200,2000
+
+Runs fully offline; a 300,000-search trace replays in about a second per
+candidate (``benchmarks/simulator_replay.py`` measures it).
+"""
+
+import argparse
+import itertools
+import json
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mql5_breaker import CircuitBreaker
+from mql5_cache import EVICTION_POLICIES, ResultCache
+from mql5_rate_limit import TokenBucket
+from mql5_trace import TraceEntry, load_entries
+
+# Outcomes of searches that got as far as the result cache; symbol table
+# and local index answers never reach it
+CACHE_OUTCOMES = frozenset({"cache", "fuzzy", "coalesced", "gateway", "error", "throttled", "rejected"})
+# Searches that were never sent, so their gateway outcome is unknown
+UNSENT_OUTCOMES = frozenset({"throttled", "rejected"})
+
+
+@dataclass
+class CachePolicy:
+    """Result cache settings to simulate; ``eviction`` "none" means no cache."""
+
+    eviction: str
+    max_entries: int = 0
+    ttl_seconds: float = 0.0
+
+    @property
+    def name(self) -> str:
+        if self.eviction == "none":
+            return "none"
+        return f"{self.eviction}:{self.max_entries}:{self.ttl_seconds:g}"
+
+    @classmethod
+    def parse(cls, spec: str) -> "CachePolicy":
+        """Parse ``eviction:max_entries:ttl_seconds``, e.g. ``lru:500:3600``."""
+        if spec == "none":
+            return cls("none")
+        try:
+            eviction, max_entries, ttl_seconds = spec.split(":")
+            policy = cls(eviction, int(max_entries), float(ttl_seconds))
+        except ValueError:
+            raise ValueError(f"Invalid policy {spec!r}, expected eviction:max_entries:ttl_seconds") from None
+        if policy.eviction not in EVICTION_POLICIES or policy.max_entries < 1:
+            raise ValueError(f"Invalid policy {spec!r}")
+        return policy
+
+
+@dataclass
+class GatewaySettings:
+    """Client rate limit and circuit breaker settings applied to simulated gateway calls."""
+
+    rate_limit: Optional[Tuple[float, float]] = None
+    max_wait_seconds: float = 8.0
+    breaker: Optional[Dict[str, float]] = None
+
+
+@dataclass
+class LatencyModel:
+    """Gateway and cache-hit latencies estimated from a trace, in milliseconds."""
+
+    gateway_ms: float = 0.0
+    hit_ms: float = 0.0
+    per_query_ms: Dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_entries(cls, entries: List[TraceEntry], gateway_ms: Optional[float] = None) -> "LatencyModel":
+        """Use the median of answered gateway searches, per query where one was seen."""
+        gateway = [e for e in entries if e.o == "gateway" and e.ms is not None]
+        hits = [e.ms for e in entries if e.o == "cache" and e.ms is not None]
+        per_query: Dict[str, List[float]] = {}
+        for entry in gateway:
+            per_query.setdefault(entry.q, []).append(entry.ms)  # type: ignore[arg-type]
+        if gateway_ms is None:
+            gateway_ms = statistics.median(e.ms for e in gateway) if gateway else 0.0  # type: ignore[misc]
+        return cls(
+            gateway_ms=gateway_ms,
+            hit_ms=statistics.median(hits) if hits else 0.0,
+            per_query_ms={q: statistics.median(values) for q, values in per_query.items()},
+        )
+
+    def gateway(self, query: str) -> float:
+        return self.per_query_ms.get(query, self.gateway_ms)
+
+
+@dataclass
+class SimulationResult:
+    """Outcome of replaying one trace against one cache policy."""
+
+    policy: str
+    searches: int = 0
+    hits: int = 0
+    coalesced: int = 0
+    gateway_calls: int = 0
+    throttled: int = 0
+    breaker_rejected: int = 0
+    breaker_trips: int = 0
+    unsent: int = 0
+    latency_saved_s: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.searches if self.searches else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["hit_rate"] = round(self.hit_rate, 4)
+        result["latency_saved_s"] = round(self.latency_saved_s, 3)
+        return result
+
+
+def simulate(
+    entries: List[TraceEntry],
+    policy: CachePolicy,
+    latency: LatencyModel,
+    gateway: Optional[GatewaySettings] = None,
+) -> SimulationResult:
+    """Replay ``entries`` (in time order) against one cache policy.
+
+    A miss for a query whose simulated gateway call is still outstanding
+    joins it, like the server's request coalescing. Searches recorded as
+    errors fail again when replayed and are not cached. Searches the
+    recording server throttled or rejected can still hit the simulated
+    cache, but a miss is counted as ``unsent`` rather than replayed against
+    the gateway, the rate limit or the breaker.
+    """
+    gateway = gateway or GatewaySettings()
+    now = [0.0]
+
+    def clock() -> float:
+        return now[0]
+
+    cache = None
+    if policy.eviction != "none":
+        cache = ResultCache(policy.max_entries, policy.ttl_seconds, policy.eviction, clock=clock)
+    bucket = TokenBucket(*gateway.rate_limit, clock=clock) if gateway.rate_limit else None
+    breaker = CircuitBreaker(clock=clock, **gateway.breaker) if gateway.breaker else None  # type: ignore[arg-type]
+
+    result = SimulationResult(policy.name)
+    answered_at: Dict[Tuple[str, Optional[int]], float] = {}
+    for entry in entries:
+        if entry.o not in CACHE_OUTCOMES:
+            continue
+        now[0] = entry.t
+        key = (entry.q, entry.n)
+        result.searches += 1
+
+        if answered_at.get(key, 0.0) > entry.t:
+            result.coalesced += 1
+            continue
+        if cache is not None and cache.get(key) is not None:
+            result.hits += 1
+            result.latency_saved_s += (latency.gateway(entry.q) - latency.hit_ms) / 1000
+            continue
+        if entry.o in UNSENT_OUTCOMES:
+            result.unsent += 1
+            continue
+        if breaker is not None and not breaker.acquire():
+            result.breaker_rejected += 1
+            continue
+        if bucket is not None and bucket.reserve(gateway.max_wait_seconds) is None:
+            result.throttled += 1
+            continue
+
+        result.gateway_calls += 1
+        failed = entry.o == "error"
+        if breaker is not None:
+            if failed:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        if not failed:
+            answered_at[key] = entry.t + latency.gateway(entry.q) / 1000
+            if cache is not None:
+                cache.put(key, True)
+
+    if breaker is not None:
+        result.breaker_trips = breaker.trips
+    return result
+
+
+def policy_grid(evictions: List[str], sizes: List[int], ttls: List[float]) -> List[CachePolicy]:
+    """Every combination of eviction policy, size and TTL."""
+    return [CachePolicy(e, s, t) for e, s, t in itertools.product(evictions, sizes, ttls)]
+
+
+def _split(value: str, cast: Any) -> List[Any]:
+    return [cast(part) for part in value.split(",") if part]
+
+
+def _settings_from_config(path: Path) -> Tuple[CachePolicy, GatewaySettings]:
+    """Current cache, rate limit and breaker settings from a config file."""
+    from mql5_mcp_server import parse_config
+
+    config = parse_config(path)
+    policy = CachePolicy(config.cache_eviction_policy, config.cache_max_entries, config.cache_ttl_seconds)
+    if not config.cache_enabled:
+        policy = CachePolicy("none")
+    gateway = GatewaySettings(
+        rate_limit=(config.rate_limit_requests_per_second, config.rate_limit_burst) if config.rate_limit_enabled else None,
+        max_wait_seconds=config.retry_deadline_seconds,
+        breaker={
+            "failure_threshold": config.circuit_breaker_failures,
+            "error_rate_threshold": config.circuit_breaker_error_rate,
+            "window_seconds": config.circuit_breaker_window_seconds,
+            "base_cooldown_seconds": config.circuit_breaker_cooldown,
+            "max_cooldown_seconds": config.circuit_breaker_max_cooldown,
+            "half_open_probes": config.circuit_breaker_half_open_probes,
+        },
+    )
+    return policy, gateway
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for the policy simulator."""
+    parser = argparse.ArgumentParser(description="Replay MQL5 MCP query traces against cache and gateway policies")
+    parser.add_argument("traces", nargs="+", type=Path, help="Trace files (.jsonl[.gz]) or server logs (.log)")
+    parser.add_argument("--policy", action="append", default=[], help="eviction:max_entries:ttl_seconds (repeatable)")
+    parser.add_argument("--evictions", default=",".join(EVICTION_POLICIES), help="Eviction policies for the grid")
+    parser.add_argument("--sizes", default="100,1000,10000", help="Cache sizes for the grid")
+    parser.add_argument("--ttls", default="3600,0", help="TTLs in seconds for the grid (0: no expiry)")
+    parser.add_argument("--config", type=Path, help="Also simulate this config's cache and use its rate limit and breaker")
+    parser.add_argument("--rate-limit", help="Client rate limit as requests_per_second:burst")
+    parser.add_argument("--gateway-ms", type=float, help="Gateway latency to assume instead of the trace's median")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        policies = [CachePolicy("none")] + [CachePolicy.parse(spec) for spec in args.policy]
+        if not args.policy:
+            policies += policy_grid(_split(args.evictions, str), _split(args.sizes, int), _split(args.ttls, float))
+        gateway = GatewaySettings()
+        if args.config is not None:
+            current, gateway = _settings_from_config(args.config)
+            policies.insert(1, current)
+        if args.rate_limit:
+            rate, burst = args.rate_limit.split(":")
+            gateway.rate_limit = (float(rate), float(burst))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    started = time.perf_counter()
+    entries = load_entries(args.traces)
+    latency = LatencyModel.from_entries(entries, args.gateway_ms)
+    print(
+        f"Loaded {len(entries)} searches in {time.perf_counter() - started:.1f}s; "
+        f"gateway latency {latency.gateway_ms:.0f} ms, cache hit {latency.hit_ms:.1f} ms",
+        file=sys.stderr
+    )
+
+    results = [simulate(entries, policy, latency, gateway) for policy in policies]
+    print(f"{'policy':<22}{'hit rate':>10}{'gateway':>10}{'coalesced':>11}{'throttled':>11}{'rejected':>10}{'unsent':>8}{'saved s':>10}")
+    for r in results:
+        print(
+            f"{r.policy:<22}{r.hit_rate:>10.1%}{r.gateway_calls:>10}{r.coalesced:>11}"
+            f"{r.throttled:>11}{r.breaker_rejected:>10}{r.unsent:>8}{r.latency_saved_s:>10.1f}"
+        )
+
+    if args.output:
+        report = {
+            "traces": [str(path) for path in args.traces],
+            "searches": len(entries),
+            "latency_model": {"gateway_ms": latency.gateway_ms, "hit_ms": latency.hit_ms},
+            "results": [r.as_dict() for r in results],
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
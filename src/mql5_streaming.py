@@ -0,0 +1,155 @@
+"""
+Progressive results for the MQL5 MCP Server.
+
+With ``streaming_enabled`` the gateway response body is read as it arrives
+instead of in one piece. ``SnippetParser`` pulls each snippet out of the
+JSON payload as soon as its closing brace has been received, a
+``SnippetBroadcast`` hands it to every search waiting on that request, and
+a ``ProgressReporter`` per tool call sends it to the client as an MCP
+progress notification. The complete payload is still decoded and
+formatted into the final result as before, so the notifications only
+bring the first snippets forward and never change the answer.
+"""
+
+import asyncio
+import codecs
+import json
+import logging
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Start of the snippet array in a gateway payload
+_SNIPPETS_KEY = re.compile(r'"snippets"\s*:\s*\[')
+_SEPARATORS = " \t\r\n,"
+
+Snippet = Dict[str, Any]
+SnippetListener = Callable[[Snippet], None]
+
+
+class SnippetParser:
+    """
+    Incrementally extract snippet objects from a JSON gateway payload.
+
+    Feed it the body in chunks of any size; each call returns the snippets
+    completed by that chunk. Anything outside the ``snippets`` array is
+    skipped, and a payload it cannot follow simply yields nothing more.
+    """
+
+    def __init__(self) -> None:
+        self._text = codecs.getincrementaldecoder("utf-8")("replace")
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._in_array = False
+        self._done = False
+
+    def feed(self, chunk: bytes) -> List[Snippet]:
+        """Add a chunk of the body and return the snippets it completed."""
+        if self._done:
+            return []
+        self._buffer += self._text.decode(chunk)
+        if not self._in_array:
+            match = _SNIPPETS_KEY.search(self._buffer)
+            if match is None:
+                return []
+            self._buffer = self._buffer[match.end():]
+            self._in_array = True
+
+        snippets: List[Snippet] = []
+        pos = 0
+        while True:
+            while pos < len(self._buffer) and self._buffer[pos] in _SEPARATORS:
+                pos += 1
+            if pos == len(self._buffer):
+                break
+            if self._buffer[pos] == "]":
+                self._done = True
+                break
+            try:
+                value, pos = self._decoder.raw_decode(self._buffer, pos)
+            except ValueError:
+                # The rest of this snippet has not arrived yet
+                break
+            if isinstance(value, dict):
+                snippets.append(value)
+        self._buffer = "" if self._done else self._buffer[pos:]
+        return snippets
+
+
+class SnippetBroadcast:
+    """
+    Hand the snippets of one in-flight request to every search waiting on it.
+
+    Searches that join late are first given the snippets seen so far.
+    """
+
+    def __init__(self) -> None:
+        self.snippets: List[Snippet] = []
+        self._listeners: List[SnippetListener] = []
+
+    def subscribe(self, listener: SnippetListener) -> None:
+        for snippet in self.snippets:
+            listener(snippet)
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: SnippetListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def publish(self, snippet: Snippet) -> None:
+        self.snippets.append(snippet)
+        for listener in list(self._listeners):
+            listener(snippet)
+
+
+def progress_message(query: str, snippet: Snippet) -> str:
+    """Render one snippet as the message of a progress notification."""
+    try:
+        score = float(snippet.get("score", 0.0))
+    except (TypeError, ValueError):
+        score = 0.0
+    return (
+        f"{query}: {snippet.get('source', 'Unknown')} (relevance {score:.2f})\n\n"
+        f"{snippet.get('snippet', '')}"
+    )
+
+
+class ProgressReporter:
+    """
+    Send snippets to one client as progress notifications.
+
+    ``send(progress, message)`` delivers one notification. Snippets are
+    queued and sent in arrival order by a task of the reporter's own, so a
+    slow client never holds up the request, or the other searches waiting
+    on it. Whatever is still queued when the tool call answers is dropped,
+    since the final result contains it.
+    """
+
+    def __init__(self, send: Callable[[float, Optional[str]], Awaitable[None]]):
+        self.sent = 0
+        self._send = send
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def add(self, query: str, snippet: Snippet) -> None:
+        """Queue a snippet found for ``query``."""
+        self._queue.put_nowait(progress_message(query, snippet))
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            message = await self._queue.get()
+            try:
+                await self._send(self.sent + 1, message)
+            except Exception as e:
+                logger.debug(f"Stopped sending progress notifications: {e}")
+                return
+            self.sent += 1
+
+    async def aclose(self) -> None:
+        """Stop sending; no notification is sent after this returns."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
@@ -0,0 +1,172 @@
+"""
+Precomputed MQL5 symbol table for the MQL5 MCP Server.
+
+Many queries are a bare identifier such as ``OrderSend``, ``ENUM_TIMEFRAMES``
+or ``CTrade``. For those, the gateway's embedding and retrieval pipeline is
+wasted work. The symbol table maps functions, enums, constants, structures
+and standard library classes to their signature, a one-line description
+and the documentation page. Exact lookups hit a dict; ``Prefix*`` lookups
+use bisection over the sorted names, so both answer in microseconds.
+
+The bundled ``mql5_symbols.json`` covers the most used symbols. A fuller
+table in the same format can be configured with ``symbol_table_path``::
+
+    {"version": 1, "symbols": [
+        {"name": "OrderSend", "kind": "function", "signature": "...",
+         "description": "...", "source": "https://www.mql5.com/en/docs/..."}
+    ]}
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_TABLE_FORMAT_VERSION = 1
+DEFAULT_SYMBOL_TABLE = Path(__file__).with_name("mql5_symbols.json")
+
+# A whole query that is one identifier (``CTrade::Buy`` included), optionally
+# followed by "()" for a call or "*" for a prefix lookup
+_SYMBOL_QUERY_RE = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*(?:::[A-Za-z_][A-Za-z0-9_]*)?)(\(\)|\*)?$")
+
+
+@dataclass(frozen=True)
+class Symbol:
+    """One documented MQL5 symbol."""
+
+    name: str
+    kind: str
+    signature: str
+    description: str
+    source: str
+
+
+@dataclass
+class SymbolMatch:
+    """Result of a symbol query: one exact hit or a list of prefix hits."""
+
+    query: str
+    symbols: List[Symbol]
+    exact: bool
+    truncated: bool = False
+
+
+class SymbolTable:
+    """Case-insensitive exact and prefix lookup over MQL5 symbols."""
+
+    def __init__(self, symbols: List[Symbol]):
+        self._by_name: Dict[str, Symbol] = {}
+        for symbol in symbols:
+            self._by_name.setdefault(symbol.name.lower(), symbol)
+        self._sorted_names = sorted(self._by_name)
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_SYMBOL_TABLE) -> "SymbolTable":
+        """Load a symbol table file."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != SYMBOL_TABLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported symbol table version: {data.get('version')}")
+        table = cls([
+            Symbol(
+                name=entry["name"],
+                kind=entry.get("kind", "symbol"),
+                signature=entry.get("signature", ""),
+                description=entry.get("description", ""),
+                source=entry.get("source", ""),
+            )
+            for entry in data["symbols"]
+        ])
+        logger.info(f"Symbol table loaded from {path}: {len(table)} symbols")
+        return table
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def get(self, name: str) -> Optional[Symbol]:
+        """Return the symbol named ``name`` (case-insensitive), if known."""
+        return self._by_name.get(name.lower())
+
+    def prefix(self, prefix: str, limit: int) -> List[Symbol]:
+        """Return up to ``limit`` symbols whose names start with ``prefix``."""
+        key = prefix.lower()
+        start = bisect.bisect_left(self._sorted_names, key)
+        matches: List[Symbol] = []
+        for name in self._sorted_names[start:start + limit]:
+            if not name.startswith(key):
+                break
+            matches.append(self._by_name[name])
+        return matches
+
+    def lookup(self, query: str, prefix_limit: int = 20) -> Optional[SymbolMatch]:
+        """Answer a query that is a single identifier or an ``Identifier*`` prefix.
+
+        Returns None for free-text queries and unknown identifiers, which
+        should go to full retrieval instead.
+        """
+        match = _SYMBOL_QUERY_RE.match(query.strip())
+        if match is None:
+            return None
+        name, suffix = match.groups()
+
+        if suffix == "*":
+            symbols = self.prefix(name, prefix_limit + 1)
+            if not symbols:
+                return None
+            return SymbolMatch(
+                query=query,
+                symbols=symbols[:prefix_limit],
+                exact=False,
+                truncated=len(symbols) > prefix_limit,
+            )
+
+        symbol = self.get(name)
+        if symbol is None:
+            return None
+        return SymbolMatch(query=query, symbols=[symbol], exact=True)
+
+
+def render_symbol_match(match: SymbolMatch) -> str:
+    """Render a symbol lookup as markdown in the style of search results."""
+    if match.exact:
+        symbol = match.symbols[0]
+        return (
+            f"# MQL5 Symbol: {symbol.name}\n\n"
+            f"**Kind:** {symbol.kind}\n"
+            f"**Source:** {symbol.source}\n\n"
+            f"```mql5\n{symbol.signature}\n```\n\n"
+            f"{symbol.description}\n"
+        )
+
+    parts = [f"# MQL5 Symbols matching `{match.query.strip()}`\n\n"]
+    for symbol in match.symbols:
+        parts.append(f"- `{symbol.name}` ({symbol.kind}): {symbol.description}\n")
+    if match.truncated:
+        parts.append(f"\n_Showing the first {len(match.symbols)} matches; refine the prefix for more._\n")
+    return "".join(parts)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for querying a symbol table."""
+    parser = argparse.ArgumentParser(description="Look up MQL5 symbols in a precomputed table")
+    parser.add_argument("query", help="Identifier such as OrderSend, or a prefix such as Position*")
+    parser.add_argument("--table", type=Path, default=DEFAULT_SYMBOL_TABLE, help="Symbol table JSON file")
+    args = parser.parse_args(argv)
+
+    match = SymbolTable.load(args.table).lookup(args.query)
+    if match is None:
+        print(f"No symbol matches {args.query!r}", file=sys.stderr)
+        return 1
+    print(render_symbol_match(match))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
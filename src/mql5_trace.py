@@ -0,0 +1,195 @@
+"""
+Query trace recorder for the MQL5 MCP Server.
+
+Writes one compact JSON line per search so the real workload can be
+replayed offline by ``mql5_simulator``:
+
+    {"t": 1760659200.125, "q": "ordersend", "n": 5, "ms": 182.4, "o": "gateway"}
+
+``t`` is the wall-clock time the search started, ``q`` the normalized query
+and ``n`` the snippet count, which together form the result cache key. ``ms``
+is the time to answer and ``o`` how the search was answered (see OUTCOMES).
+
+Traces can also be rebuilt, with less detail, from the query lines of
+existing server logs. Prefetch fetches are logged as "Prefetching MQL5
+docs" and are not searches, so they are left out. Logs written before
+that message was introduced count them as gateway searches and overstate
+demand on servers with ``prefetch_enabled``.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Callable, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# symbol: symbol table; cache: memory or disk cache hit; fuzzy: fuzzy cache
+# hit; coalesced: joined an identical in-flight gateway request; gateway:
+# answered by the gateway; local: offline index; error: the gateway was
+# called but could not answer (error status, HTTP 429 or timeout);
+# throttled / rejected: never sent, held back by the client-side rate
+# limiter or by open circuit breakers
+OUTCOMES = ("symbol", "cache", "fuzzy", "coalesced", "gateway", "local", "error", "throttled", "rejected")
+
+# Server log lines that name a search, and the outcome each one implies
+_LOG_LINE = re.compile(
+    r"^(?P<time>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(?P<millis>\d{3}) - \S+ - \w+ - "
+    r"(?P<event>Searching MQL5 docs|Cache hit|Fuzzy cache hit|Joining in-flight search) for query: (?P<query>.*)$"
+)
+_LOG_OUTCOMES = {
+    "Searching MQL5 docs": "gateway",
+    "Cache hit": "cache",
+    "Fuzzy cache hit": "fuzzy",
+    "Joining in-flight search": "coalesced",
+}
+
+
+@dataclass
+class TraceEntry:
+    """One recorded search."""
+
+    t: float
+    q: str
+    n: Optional[int] = None
+    ms: Optional[float] = None
+    o: str = "gateway"
+
+
+class TraceRecorder:
+    """
+    Append trace entries to a JSON-lines file.
+
+    Writes go through a buffered file and are flushed at most once per
+    ``flush_interval_seconds``, so recording costs a dictionary dump per
+    search. When the file grows past ``max_bytes`` it is renamed to
+    ``<name>.1`` (replacing an older one) and a new file is started.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = 0,
+        flush_interval_seconds: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_interval_seconds = flush_interval_seconds
+        self.recorded = 0
+        self._clock = clock
+        self._last_flush = clock()
+        self._file: Optional[IO[str]] = None
+        self._size = 0
+
+    def record(self, query: str, max_snippets: int, started: float, latency_ms: float, outcome: str) -> None:
+        """Append one search; ``started`` is a wall-clock timestamp."""
+        line = json.dumps(
+            {"t": round(started, 3), "q": query, "n": max_snippets, "ms": round(latency_ms, 2), "o": outcome},
+            ensure_ascii=False, separators=(",", ":")
+        ) + "\n"
+        try:
+            if self._file is None:
+                self._open()
+            assert self._file is not None
+            self._file.write(line)
+        except OSError as e:
+            logger.warning(f"Failed to write query trace {self.path}: {e}")
+            return
+        self.recorded += 1
+        self._size += len(line)
+        if self.max_bytes and self._size >= self.max_bytes:
+            self._rotate()
+        elif self._clock() - self._last_flush >= self.flush_interval_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered entries to disk."""
+        self._last_flush = self._clock()
+        if self._file is not None:
+            try:
+                self._file.flush()
+            except OSError as e:
+                logger.warning(f"Failed to flush query trace {self.path}: {e}")
+
+    def close(self) -> None:
+        """Flush and close the trace file."""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=64 * 1024)
+        self._size = self._file.tell()
+
+    def _rotate(self) -> None:
+        self.close()
+        try:
+            os.replace(self.path, self.path.with_name(self.path.name + ".1"))
+        except OSError as e:
+            logger.warning(f"Failed to rotate query trace {self.path}: {e}")
+        self._size = 0
+
+
+def _open_text(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def read_trace(path: Union[str, Path]) -> Iterator[TraceEntry]:
+    """Yield the entries of a trace file (gzip-compressed if it ends in .gz).
+
+    Lines that are not valid entries, such as one cut short by a crash,
+    are skipped.
+    """
+    with _open_text(Path(path)) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                yield TraceEntry(
+                    t=float(entry["t"]), q=str(entry["q"]), n=entry.get("n"),
+                    ms=entry.get("ms"), o=entry.get("o", "gateway")
+                )
+            except (ValueError, KeyError, TypeError):
+                continue
+
+
+def read_server_log(path: Union[str, Path]) -> Iterator[TraceEntry]:
+    """Yield entries rebuilt from the query lines of a server log.
+
+    Logs have no latency or snippet count, and a gateway request that
+    failed still reads as "gateway".
+    """
+    from mql5_cache import normalize_query
+
+    with _open_text(Path(path)) as f:
+        for line in f:
+            match = _LOG_LINE.match(line.rstrip("\n"))
+            if match is None:
+                continue
+            started = datetime.strptime(match["time"], "%Y-%m-%d %H:%M:%S").timestamp()
+            yield TraceEntry(
+                t=started + int(match["millis"]) / 1000,
+                q=normalize_query(match["query"]),
+                o=_LOG_OUTCOMES[match["event"]],
+            )
+
+
+def load_entries(paths: List[Union[str, Path]]) -> List[TraceEntry]:
+    """Read traces and server logs (``*.log``, ``*.log.N``) in time order."""
+    entries: List[TraceEntry] = []
+    for path in paths:
+        name = Path(path).name
+        reader = read_server_log if re.search(r"\.log(\.\d+)?(\.gz)?$", name) else read_trace
+        entries.extend(reader(path))
+    entries.sort(key=lambda entry: entry.t)
+    return entries
@@ -0,0 +1,228 @@
+"""
+Dense-vector semantic index for the MQL5 MCP Server.
+
+Snippets are embedded on the CPU with signed feature hashing of TF-IDF
+weights, so no model, GPU or network is needed and embeddings are fully
+deterministic. Vectors live in a contiguous float32 ``vectors.npy`` matrix
+that is memory-mapped at load time, which keeps startup near zero even for
+tens of thousands of snippets. A query costs one matrix-vector product plus
+``argpartition``.
+
+Requires NumPy (``pip install mcp-mql5-rag[semantic]``). Build an index with:
+
+    python src/mql5_vector_index.py build path/to/mql5-docs mql5_docs_vectors
+"""
+
+import argparse
+import json
+import logging
+import math
+import mmap
+import sys
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mql5_local_index import chunk_text, iter_documents, tokenize
+
+logger = logging.getLogger(__name__)
+
+VECTOR_FORMAT_VERSION = 1
+
+
+def _require_numpy() -> Any:
+    """Import NumPy on first use so remote-only servers never pay for it."""
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "The vector index requires NumPy. Install it with: uv add numpy"
+        ) from e
+    return numpy
+
+
+def _hashed_term_counts(text: str, dim: int) -> Dict[int, float]:
+    """Map text to signed, log-scaled term frequencies per hash bucket."""
+    buckets: Dict[int, float] = {}
+    for term, count in Counter(tokenize(text)).items():
+        digest = zlib.crc32(term.encode("utf-8"))
+        bucket = digest % dim
+        sign = -1.0 if digest & 0x80000000 else 1.0
+        buckets[bucket] = buckets.get(bucket, 0.0) + sign * (1.0 + math.log(count))
+    return buckets
+
+
+def build_vector_index(
+    docs_dir: Path, index_dir: Path, dim: int = 256, chunk_chars: int = 800
+) -> Dict[str, int]:
+    """
+    Chunk a documentation directory and write a memory-mappable vector index.
+
+    Writes ``vectors.npy`` (float32, one L2-normalized row per snippet),
+    ``idf.npy``, ``snippets.jsonl`` with ``offsets.npy`` for random access to
+    snippet text, and ``meta.json``.
+
+    Returns:
+        Summary counts of the built index
+    """
+    np = _require_numpy()
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    rows: List[Dict[int, float]] = []
+    offsets = [0]
+    with open(index_dir / "snippets.jsonl", "wb") as f:
+        for source, text in iter_documents(docs_dir):
+            for chunk in chunk_text(text, chunk_chars):
+                rows.append(_hashed_term_counts(chunk, dim))
+                line = json.dumps([chunk, source], ensure_ascii=False).encode("utf-8") + b"\n"
+                f.write(line)
+                offsets.append(offsets[-1] + len(line))
+
+    document_frequency = np.zeros(dim, dtype=np.float64)
+    for row in rows:
+        document_frequency[list(row)] += 1
+    idf = (np.log((1 + len(rows)) / (1 + document_frequency)) + 1).astype(np.float32)
+
+    vectors = np.lib.format.open_memmap(
+        index_dir / "vectors.npy", mode="w+", dtype=np.float32, shape=(len(rows), dim)
+    )
+    for i, row in enumerate(rows):
+        if row:
+            buckets = np.fromiter(row.keys(), dtype=np.int64, count=len(row))
+            vectors[i, buckets] = np.fromiter(row.values(), dtype=np.float32, count=len(row))
+    vectors *= idf
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    vectors.flush()
+    del vectors
+
+    np.save(index_dir / "idf.npy", idf)
+    np.save(index_dir / "offsets.npy", np.asarray(offsets, dtype=np.int64))
+    (index_dir / "meta.json").write_text(
+        json.dumps({"version": VECTOR_FORMAT_VERSION, "dim": dim, "count": len(rows)}),
+        encoding="utf-8"
+    )
+    return {"snippets": len(rows), "dim": dim}
+
+
+class VectorIndex:
+    """Cosine-similarity searcher over a memory-mapped vector index."""
+
+    def __init__(self, index_dir: Path):
+        np = _require_numpy()
+        self._np = np
+        self.index_dir = Path(index_dir)
+
+        meta = json.loads((self.index_dir / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != VECTOR_FORMAT_VERSION:
+            raise ValueError(f"Unsupported vector index version: {meta.get('version')}")
+        self.dim: int = meta["dim"]
+
+        # mmap keeps load time independent of index size; pages fault in on use
+        self.vectors = np.load(self.index_dir / "vectors.npy", mmap_mode="r")
+        self.offsets = np.load(self.index_dir / "offsets.npy", mmap_mode="r")
+        self.idf = np.load(self.index_dir / "idf.npy")
+        self._snippet_file = open(self.index_dir / "snippets.jsonl", "rb")
+        self._snippets = (
+            mmap.mmap(self._snippet_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.offsets[-1] > 0 else b""
+        )
+
+    @classmethod
+    def load(cls, index_dir: Path) -> "VectorIndex":
+        """Open an index directory written by ``build_vector_index``."""
+        started = time.perf_counter()
+        index = cls(index_dir)
+        logger.info(
+            f"Vector index opened from {index_dir}: {len(index)} snippets "
+            f"in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return index
+
+    def __len__(self) -> int:
+        return int(self.vectors.shape[0])
+
+    def embed(self, text: str) -> Any:
+        """Embed a query into the index's vector space."""
+        np = self._np
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for bucket, weight in _hashed_term_counts(text, self.dim).items():
+            vector[bucket] = weight
+        vector *= self.idf
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def search(self, query: str, max_snippets: int) -> Dict[str, Any]:
+        """Return the most similar snippets in gateway response format."""
+        np = self._np
+        query_vector = self.embed(query)
+        if len(self) == 0 or not query_vector.any():
+            return {"snippets": []}
+
+        scores = self.vectors @ query_vector
+        k = min(max_snippets, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return {
+            "snippets": [
+                self._snippet(int(i), float(scores[i]))
+                for i in top if scores[i] > 0
+            ]
+        }
+
+    def _snippet(self, i: int, score: float) -> Dict[str, Any]:
+        text, source = json.loads(self._snippets[int(self.offsets[i]):int(self.offsets[i + 1])])
+        return {"snippet": text, "source": source, "score": score}
+
+    def close(self) -> None:
+        """Release the memory maps."""
+        if isinstance(self._snippets, mmap.mmap):
+            self._snippets.close()
+        self._snippet_file.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point for building and querying vector indexes."""
+    parser = argparse.ArgumentParser(description="Build or query the MQL5 documentation vector index")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Build an index from a documentation directory")
+    build.add_argument("docs_dir", type=Path, help="Directory of MQL5 HTML/Markdown documentation")
+    build.add_argument("index_dir", type=Path, help="Output directory (e.g. mql5_docs_vectors)")
+    build.add_argument("--dim", type=int, default=256, help="Embedding dimensions")
+    build.add_argument("--chunk-chars", type=int, default=800, help="Target snippet size in characters")
+
+    search = commands.add_parser("search", help="Query an existing index")
+    search.add_argument("index_dir", type=Path)
+    search.add_argument("query")
+    search.add_argument("--max-snippets", type=int, default=5)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        if not args.docs_dir.is_dir():
+            print(f"Documentation directory not found: {args.docs_dir}", file=sys.stderr)
+            return 1
+        started = time.perf_counter()
+        summary = build_vector_index(args.docs_dir, args.index_dir, args.dim, args.chunk_chars)
+        print(
+            f"Embedded {summary['snippets']} snippets into {summary['dim']} dimensions "
+            f"in {time.perf_counter() - started:.1f}s -> {args.index_dir}",
+            file=sys.stderr
+        )
+        return 0
+
+    index = VectorIndex.load(args.index_dir)
+    started = time.perf_counter()
+    results = index.search(args.query, args.max_snippets)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(json.dumps(results, indent=2))
+    print(f"Search took {elapsed_ms:.2f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
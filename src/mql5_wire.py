@@ -0,0 +1,101 @@
+"""
+Wire format negotiation between the MQL5 MCP Server and the RAG gateway.
+
+Search responses with several long snippets compress well. The server
+offers the content encodings httpx can decode in this environment:
+gzip and deflate always, ``br`` with the brotli (or brotlicffi) package,
+and ``zstd`` with zstandard on httpx 0.27.1 or later. The list comes from
+httpx's own decoder table, so an encoding is never offered that httpx
+would pass through undecoded. httpx decompresses transparently.
+
+The body itself is JSON unless the gateway answers with MessagePack, which
+is requested only when the msgpack package is installed. JSON is decoded
+with orjson when it is available and with the standard library otherwise.
+Everything here is capability-detected, so no optional package is required.
+"""
+
+import importlib.util
+import json
+from typing import Any, Callable, List, Optional
+
+# Content encodings to offer, in order of preference
+_PREFERRED_ENCODINGS = ("br", "zstd", "gzip", "deflate")
+
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack", "application/vnd.msgpack")
+
+_json_loads: Optional[Callable[[bytes], Any]] = None
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def available_encodings() -> List[str]:
+    """Return the content encodings the installed httpx can decode."""
+    # httpx registers br and zstd only when their package imported, and
+    # zstd not at all before 0.27.1
+    from httpx._decoders import SUPPORTED_DECODERS
+
+    return [encoding for encoding in _PREFERRED_ENCODINGS if encoding in SUPPORTED_DECODERS]
+
+
+def accept_encoding(preferred: List[str]) -> str:
+    """Build an Accept-Encoding header from ``preferred``, keeping decodable encodings only.
+
+    Returns "identity" when nothing usable is left, which turns compression off.
+    """
+    available = available_encodings()
+    usable = [encoding for encoding in preferred if encoding in available]
+    return ", ".join(usable) if usable else "identity"
+
+
+def msgpack_available() -> bool:
+    """Check whether MessagePack responses can be decoded."""
+    return _installed("msgpack")
+
+
+def accept_header(response_format: str) -> str:
+    """Build the Accept header for ``response_format`` ("auto", "json" or "msgpack").
+
+    MessagePack is only offered when it can be decoded, always with JSON as
+    the fallback a gateway without MessagePack support will pick.
+    """
+    if response_format in ("auto", "msgpack") and msgpack_available():
+        return "application/msgpack, application/json;q=0.9"
+    return "application/json"
+
+
+def payload_format(content_type: str) -> str:
+    """Return "msgpack" or "json" for a response Content-Type."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return "msgpack" if media_type in MSGPACK_CONTENT_TYPES else "json"
+
+
+def json_parser() -> str:
+    """Name of the JSON parser in use, for reporting."""
+    return "orjson" if _installed("orjson") else "json"
+
+
+def decode_payload(content: bytes, fmt: str) -> Any:
+    """Decode a (decompressed) response body in format ``fmt``.
+
+    Raises:
+        ValueError: If the body is not valid in that format
+    """
+    if fmt == "msgpack":
+        import msgpack
+
+        try:
+            return msgpack.unpackb(content, raw=False)
+        except Exception as e:
+            raise ValueError(f"Invalid MessagePack payload: {e}") from e
+
+    global _json_loads
+    if _json_loads is None:
+        if _installed("orjson"):
+            import orjson
+
+            _json_loads = orjson.loads
+        else:
+            _json_loads = json.loads
+    return _json_loads(content)
@@ -0,0 +1,58 @@
+"""Shared fixtures for the MQL5 MCP Server test suite."""
+
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import httpx
+import pytest
+import yaml
+
+# Add src to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mql5_mcp_server import MQL5MCPServer  # noqa: E402
+
+GATEWAY_URL = "https://test.execute-api.us-east-1.amazonaws.com/prod/rag"
+
+
+def gateway_payload(query: str) -> Dict[str, Any]:
+    """Build a well-formed gateway response for ``query``."""
+    return {
+        "snippets": [
+            {"snippet": f"{query} documentation", "source": f"{query}.html", "score": 0.9}
+        ]
+    }
+
+
+
+class FakeClock:
+    """Manually advanced clock for the ``clock`` argument of caches, limiters and breakers."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def make_server(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Callable[..., MQL5MCPServer]:
+    """Return a factory building servers from a temporary config file.
+
+    Keyword arguments override config values. Passing ``handler`` installs an
+    ``httpx.MockTransport`` so no request ever leaves the process.
+    """
+    monkeypatch.setenv("MQL5_RAG_API_KEY", "test-key")
+
+    def factory(handler: Any = None, **overrides: Any) -> MQL5MCPServer:
+        config_path = tmp_path / "config.yaml"
+        # Most tests query bare identifiers to exercise the gateway path
+        config_data = {"aws_api_gateway_url": GATEWAY_URL, "symbol_lookup_enabled": False, **overrides}
+        config_path.write_text(yaml.safe_dump(config_data), encoding="utf-8")
+        server = MQL5MCPServer(config_path=config_path)
+        if handler is not None:
+            server.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return server
+
+    return factory
@@ -0,0 +1,75 @@
+"""Tests for the search_mql5_docs_batch tool."""
+
+import asyncio
+import json
+
+import httpx
+from mcp.types import TextContent
+
+from conftest import gateway_payload
+
+
+def test_batch_tool_is_registered(make_server):
+    server = make_server()
+    names = [tool["name"] for tool in server.get_available_tools()]
+
+    assert names[:2] == ["search_mql5_docs", "search_mql5_docs_batch"]
+
+
+async def test_batch_returns_results_in_query_order(make_server):
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        if query == "broken":
+            return httpx.Response(500)
+        return httpx.Response(200, json=gateway_payload(query))
+
+    server = make_server(handler, circuit_breaker_failures=10)
+    results = await server._search_mql5_docs_batch(["CopyBuffer", "broken", "iMA"])
+
+    assert len(results) == 3
+    assert "CopyBuffer.html" in results[0].text
+    assert results[1].text == "Documentation service error"
+    assert "iMA.html" in results[2].text
+
+
+async def test_batch_respects_concurrency_limit(make_server):
+    active = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200, json=gateway_payload("x"))
+
+    server = make_server(handler, batch_concurrency=2)
+    await server._search_mql5_docs_batch([f"query {i}" for i in range(6)])
+
+    assert peak == 2
+
+
+async def test_batch_survives_unexpected_exception(make_server, monkeypatch):
+    server = make_server()
+
+    async def search(query: str):
+        if query == "bad":
+            raise RuntimeError("boom")
+        return [TextContent(type="text", text=query)]
+
+    monkeypatch.setattr(server, "_search_mql5_docs", search)
+    results = await server._search_mql5_docs_batch(["good", "bad"])
+
+    assert results[0].text == "good"
+    assert results[1].text == "Documentation search failed for query: bad"
+
+
+async def test_batch_rejects_invalid_input(make_server):
+    server = make_server(batch_max_queries=2)
+
+    too_many = await server._search_mql5_docs_batch(["a", "b", "c"])
+    empty = await server._search_mql5_docs_batch([])
+
+    assert too_many[0].text.startswith("Error: at most 2 queries")
+    assert empty[0].text.startswith("Error: queries must be")
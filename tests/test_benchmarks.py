@@ -0,0 +1,41 @@
+"""Smoke tests for the benchmark harness and stand-in gateway."""
+
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from fake_gateway import FakeGateway, GatewayProfile  # noqa: E402
+from run_benchmarks import Scenario, compare_reports, run_scenario  # noqa: E402
+
+
+async def test_fake_gateway_injects_throttling():
+    gateway = FakeGateway(GatewayProfile(latency_median=0.001, throttle_rate=1.0))
+    async with httpx.AsyncClient(transport=gateway.transport()) as client:
+        response = await client.post("https://gateway/rag", json={"query": "iMA"})
+
+    assert response.status_code == 429
+    assert gateway.stats.statuses[429] == 1
+    assert gateway.stats.queries["iMA"] == 1
+
+
+async def test_scenario_report_shape(tmp_path):
+    scenario = Scenario(
+        name="smoke",
+        description="tiny run",
+        server_config={"cache_enabled": False},
+        gateway=GatewayProfile(latency_median=0.001),
+        requests=10,
+        concurrency=2,
+    )
+    report = await run_scenario(scenario, tmp_path)
+
+    assert report["outcomes"] == {"ok": 10}
+    assert 0 < report["gateway_requests"] <= 10
+    assert set(report["latency_ms"]) == {"p50", "p95", "p99", "max", "mean"}
+    assert report["throughput_rps"] > 0
+
+    comparison = compare_reports({"scenarios": [report]}, {"scenarios": [report]})
+    assert "smoke" in comparison and "+0.0%" in comparison
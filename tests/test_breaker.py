@@ -0,0 +1,180 @@
+"""Tests for the closed/open/half-open circuit breaker."""
+
+import asyncio
+
+import httpx
+
+from conftest import FakeClock, gateway_payload
+from mql5_breaker import CircuitBreaker
+
+
+def make_breaker(clock, transitions=None, **overrides):
+    options = {
+        "failure_threshold": 3,
+        "error_rate_threshold": 0.5,
+        "window_seconds": 60,
+        "base_cooldown_seconds": 5,
+        "max_cooldown_seconds": 18,
+        "probe_timeout_seconds": 10,
+    }
+    options.update(overrides)
+    on_transition = transitions.append if transitions is not None else None
+    return CircuitBreaker(on_transition=on_transition, clock=clock, **options)
+
+
+def test_trips_on_window_error_rate_not_raw_count():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    for _ in range(4):
+        breaker.record_success()
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.snapshot()["window_error_rate"] == 0.5
+
+
+def test_old_failures_leave_the_window():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    clock.now = 61.0
+    breaker.record_failure()
+
+    assert breaker.failure_count == 1 and breaker.state == "closed"
+
+
+def test_half_open_admits_limited_probes_and_closes_on_success():
+    clock = FakeClock()
+    transitions = []
+    breaker = make_breaker(clock, transitions, failure_threshold=1)
+    breaker.record_failure()
+    assert not breaker.acquire()
+
+    clock.now = 5.0
+    assert breaker.acquire()
+    assert not breaker.acquire()
+    breaker.record_success()
+
+    assert transitions == ["open", "half_open", "closed"]
+    assert breaker.failure_count == 0 and breaker.acquire()
+
+
+def test_failed_probes_double_the_cooldown_up_to_the_maximum():
+    clock = FakeClock()
+    breaker = make_breaker(clock, failure_threshold=1)
+    breaker.record_failure()
+
+    cooldowns = []
+    for _ in range(3):
+        clock.now += breaker.cooldown_seconds
+        assert breaker.acquire()
+        breaker.record_failure()
+        cooldowns.append(breaker.cooldown_seconds)
+
+    assert cooldowns == [10, 18, 18]
+    assert breaker.snapshot()["retry_in_seconds"] == 18
+
+    clock.now += 18
+    breaker.acquire()
+    breaker.record_success()
+    assert breaker.cooldown_seconds == 5
+
+
+def test_abandoned_probe_frees_its_slot_after_timeout():
+    clock = FakeClock()
+    breaker = make_breaker(clock, failure_threshold=1)
+    breaker.record_failure()
+    clock.now = 5.0
+    assert breaker.acquire()
+
+    clock.now = 14.0
+    assert not breaker.can_request()
+    clock.now = 15.0
+    assert breaker.acquire()
+
+
+def test_released_probe_slot_is_reused_without_an_outcome():
+    clock = FakeClock()
+    breaker = make_breaker(clock, failure_threshold=1)
+    breaker.record_failure()
+    clock.now = 5.0
+    assert breaker.acquire() and not breaker.acquire()
+
+    breaker.release()
+
+    assert breaker.state == "half_open" and breaker.acquire()
+    assert breaker.snapshot()["window_requests"] == 1
+
+
+async def test_search_resumes_after_a_short_outage(make_server):
+    healthy = False
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if not healthy:
+            return httpx.Response(503)
+        return httpx.Response(200, json=gateway_payload("OrderSend"))
+
+    server = make_server(handler, circuit_breaker_failures=1, circuit_breaker_cooldown=0.05)
+    await server._search_mql5_docs("OrderSend")
+    unavailable = await server._search_mql5_docs("OrderSend")
+
+    healthy = True
+    await asyncio.sleep(0.06)
+    recovered = await server._search_mql5_docs("OrderSend")
+
+    assert unavailable[0].text == "Documentation search temporarily unavailable"
+    assert "OrderSend.html" in recovered[0].text
+    assert server.metrics.counters["circuit_breaker_transitions"] == {
+        (("state", "open"),): 1, (("state", "half_open"),): 1, (("state", "closed"),): 1
+    }
+
+
+async def test_throttling_counts_toward_the_breaker(make_server):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(429)
+
+    server = make_server(handler, max_retries=0)
+    result = await server._search_mql5_docs("OrderSend")
+
+    assert result[0].text == "Search temporarily throttled"
+    assert server.failure_count == 1
+
+
+async def test_retried_half_open_probe_is_settled_before_the_retry(make_server):
+    responses = [httpx.Response(503), httpx.Response(429)]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0) if responses else httpx.Response(200, json=gateway_payload("OrderSend"))
+
+    server = make_server(
+        handler, circuit_breaker_failures=1, circuit_breaker_cooldown=0.05, retry_base_delay_seconds=0.001
+    )
+    await server._search_mql5_docs("OrderSend")
+    await asyncio.sleep(0.06)
+    # The probe is throttled; the retry finds the breaker open again
+    result = await server._search_mql5_docs("OrderSend")
+
+    breaker = server.router.endpoints[0].breaker
+    assert result[0].text == "Documentation search temporarily unavailable"
+    assert breaker.state == "open" and breaker.trips == 2
+    assert breaker.cooldown_seconds == 0.1
+    assert not breaker._probes
+
+
+async def test_undecodable_probe_response_is_a_failure_not_a_success(make_server):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b'{"snippets": [', headers={"Content-Type": "application/json"})
+
+    server = make_server(handler, circuit_breaker_failures=1, circuit_breaker_cooldown=0.05)
+    await server._search_mql5_docs("OrderSend")
+    await asyncio.sleep(0.06)
+    await server._search_mql5_docs("OrderSend")
+
+    breaker = server.router.endpoints[0].breaker
+    assert breaker.state == "open" and breaker.cooldown_seconds == 0.1
+    assert (("state", "closed"),) not in server.metrics.counters["circuit_breaker_transitions"]
@@ -0,0 +1,118 @@
+"""Tests for the in-memory result cache."""
+
+import httpx
+import pytest
+
+from conftest import FakeClock, gateway_payload
+from mql5_cache import ResultCache, normalize_query
+
+
+def test_normalize_query_collapses_case_and_whitespace():
+    assert normalize_query("  ArrayResize \t function ") == "arrayresize function"
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2, ttl_seconds=0, eviction_policy="lru")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.stats.evictions == 1
+
+
+def test_fifo_ignores_recent_hits():
+    cache = ResultCache(max_entries=2, ttl_seconds=0, eviction_policy="fifo")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert "a" not in cache
+    assert cache.get("b") == 2
+
+
+def test_lfu_keeps_frequently_hit_entries():
+    cache = ResultCache(max_entries=2, ttl_seconds=0, eviction_policy="lfu")
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("a")
+    cache.put("b", 2)
+    cache.get("b")
+    cache.put("c", 3)
+    assert "b" not in cache
+    cache.put("d", 4)
+
+    # c was never hit, so it goes before a
+    assert "c" not in cache
+    assert cache.get("a") == 1 and cache.get("d") == 4
+    assert cache.stats.evictions == 2
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = ResultCache(max_entries=4, ttl_seconds=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.stats.as_dict() == {"hits": 1, "misses": 1, "evictions": 0, "expirations": 1}
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        ResultCache(max_entries=1, ttl_seconds=0, eviction_policy="random")
+
+
+async def test_repeated_query_is_served_from_cache(make_server):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=gateway_payload("ArrayResize"))
+
+    server = make_server(handler)
+    first = await server._search_mql5_docs("ArrayResize")
+    second = await server._search_mql5_docs("  arrayresize ")
+
+    assert len(calls) == 1
+    assert "ArrayResize.html" in second[0].text
+    assert "**Query:** arrayresize" in second[0].text
+    assert first[0].text != "Documentation service error"
+    assert server.result_cache.stats.hits == 1
+
+
+async def test_errors_are_not_cached(make_server):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ReadTimeout("timed out", request=request)
+        return httpx.Response(200, json=gateway_payload("OrderSend"))
+
+    server = make_server(handler, max_retries=0)
+    first = await server._search_mql5_docs("OrderSend")
+    second = await server._search_mql5_docs("OrderSend")
+
+    assert first[0].text == "Search timed out, please try again"
+    assert "OrderSend.html" in second[0].text
+    assert len(calls) == 2
+
+
+async def test_cache_can_be_disabled(make_server):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=gateway_payload("iMA"))
+
+    server = make_server(handler, cache_enabled=False)
+    await server._search_mql5_docs("iMA")
+    await server._search_mql5_docs("iMA")
+
+    assert server.result_cache is None
+    assert len(calls) == 2
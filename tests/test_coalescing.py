@@ -0,0 +1,68 @@
+"""Tests for single-flight coalescing of identical searches."""
+
+import asyncio
+
+import httpx
+
+from conftest import gateway_payload
+
+
+def slow_handler(calls, release: asyncio.Event):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await release.wait()
+        return httpx.Response(200, json=gateway_payload("CopyBuffer"))
+
+    return handler
+
+
+async def test_concurrent_identical_queries_share_one_request(make_server):
+    calls = []
+    release = asyncio.Event()
+    server = make_server(slow_handler(calls, release), cache_enabled=False)
+
+    searches = [
+        asyncio.create_task(server._search_mql5_docs(query))
+        for query in ("CopyBuffer", "copybuffer", " CopyBuffer  ")
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*searches)
+
+    assert len(calls) == 1
+    assert server.coalesced_requests == 2
+    assert all("CopyBuffer.html" in result[0].text for result in results)
+    assert "**Query:** copybuffer" in results[1][0].text
+    assert server._inflight == {}
+
+
+async def test_cancelling_one_waiter_keeps_shared_request(make_server):
+    calls = []
+    release = asyncio.Event()
+    server = make_server(slow_handler(calls, release), cache_enabled=False)
+
+    first = asyncio.create_task(server._search_mql5_docs("CopyBuffer"))
+    second = asyncio.create_task(server._search_mql5_docs("CopyBuffer"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    release.set()
+    result = await second
+
+    assert first.cancelled()
+    assert "CopyBuffer.html" in result[0].text
+    assert len(calls) == 1
+
+
+async def test_different_queries_are_not_coalesced(make_server):
+    calls = []
+    release = asyncio.Event()
+    release.set()
+    server = make_server(slow_handler(calls, release), cache_enabled=False)
+
+    await asyncio.gather(
+        server._search_mql5_docs("CopyBuffer"),
+        server._search_mql5_docs("iMA"),
+    )
+
+    assert len(calls) == 2
+    assert server.coalesced_requests == 0
@@ -0,0 +1,114 @@
+"""Tests for near-duplicate removal, budget trimming and grouping of results."""
+
+from mql5_compaction import (
+    CHARS_PER_TOKEN,
+    compact_snippets,
+    containment,
+    shingle_set,
+    truncate_text,
+)
+
+ORDER_SEND = (
+    "OrderSend sends a trade request to the server. The function returns true "
+    "when the request was accepted and fills the MqlTradeResult structure."
+)
+
+
+def snippet(text, source, score):
+    return {"snippet": text, "source": source, "score": score}
+
+
+def test_containment_detects_near_duplicates():
+    a = shingle_set(ORDER_SEND)
+    b = shingle_set(ORDER_SEND.replace("server.", "trade server."))
+
+    assert containment(a, b) > 0.8
+    assert containment(a, shingle_set("ArrayResize changes the size of a dynamic array")) == 0.0
+
+
+def test_duplicates_merge_into_best_ranked_copy():
+    result = compact_snippets(
+        [
+            snippet(ORDER_SEND + " See also OrderCheck.", "OrderSend.html", 0.7),
+            snippet(ORDER_SEND, "trade_functions.html", 0.9),
+            snippet("ArrayResize changes the size of a dynamic array.", "ArrayResize.html", 0.5),
+        ],
+        max_snippets=5,
+    )
+
+    assert result.duplicates == 1
+    assert [g.source for g in result.groups] == ["trade_functions.html", "ArrayResize.html"]
+    assert result.groups[0].snippets[0].also_in == ["OrderSend.html"]
+
+
+def test_longer_snippet_quoting_a_better_ranked_one_survives():
+    extra = (
+        " Before sending, check the request with OrderCheck and inspect the retcode "
+        "field of MqlTradeResult, since a filled request can still be rejected later."
+    )
+    result = compact_snippets(
+        [snippet(ORDER_SEND, "a.html", 0.9), snippet(ORDER_SEND + extra, "b.html", 0.8)],
+        max_snippets=5,
+    )
+
+    assert result.duplicates == 0
+    assert [g.source for g in result.groups] == ["a.html", "b.html"]
+    assert "OrderCheck" in result.groups[1].snippets[0].text
+
+
+def test_snippets_are_grouped_by_source():
+    result = compact_snippets(
+        [
+            snippet("CopyBuffer copies indicator buffer data.", "CopyBuffer.html", 0.9),
+            snippet("iMA returns the handle of a moving average.", "iMA.html", 0.8),
+            snippet("Use BarsCalculated before calling CopyBuffer.", "CopyBuffer.html", 0.6),
+        ],
+        max_snippets=5,
+    )
+
+    assert [(g.source, len(g.snippets)) for g in result.groups] == [
+        ("CopyBuffer.html", 2), ("iMA.html", 1)
+    ]
+
+
+def test_budget_keeps_highest_scores_and_truncates_one_snippet():
+    words = " ".join(f"word{i}" for i in range(200))
+    result = compact_snippets(
+        [
+            snippet("a " + words, "a.html", 0.9),
+            snippet("b " + words, "b.html", 0.8),
+            snippet("c " + words, "c.html", 0.7),
+        ],
+        max_snippets=5,
+        dedupe_threshold=0,
+        max_tokens=(len(words) + len(words) // 2) // CHARS_PER_TOKEN,
+    )
+
+    kept = [s for g in result.groups for s in g.snippets]
+    assert [s.source for s in kept] == ["a.html", "b.html"]
+    assert kept[1].truncated and kept[1].text.endswith(" …")
+    assert (result.omitted, result.truncated) == (1, 1)
+
+
+def test_truncate_text_cuts_at_word_boundary():
+    assert truncate_text("alpha beta gamma", 100) == "alpha beta gamma"
+    assert truncate_text("alpha beta gamma", 13) == "alpha beta …"
+
+
+async def test_server_response_is_compacted(make_server):
+    server = make_server(result_max_tokens=0)
+    data = {
+        "snippets": [
+            snippet(ORDER_SEND, "OrderSend.html", 0.9),
+            snippet(ORDER_SEND, "OrderSend.html", 0.8),
+            snippet("OrderCheck validates a request before sending.", "OrderCheck.html", 0.6),
+        ]
+    }
+
+    text = server._format_search_results(data, "ordersend")[0].text
+
+    assert text.count("OrderSend sends a trade request") == 1
+    assert "## Result 2\n**Source:** OrderCheck.html" in text
+    assert server.metrics.snapshot()["counters"]["result_snippets_compacted"] == {
+        "action=deduplicated": 1
+    }
@@ -0,0 +1,163 @@
+"""Tests for the shared daemon and its stdio shim."""
+
+import asyncio
+import io
+import json
+import os
+import socket
+
+import httpx
+import pytest
+from mcp import ClientSession
+
+from conftest import gateway_payload
+from mql5_daemon import (
+    DaemonAlreadyRunning,
+    DaemonUnavailable,
+    SessionDaemon,
+    connect,
+    open_connection,
+    parse_address,
+    relay,
+    socket_transport,
+    token_path,
+)
+
+unix_sockets = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture(autouse=True)
+def runtime_dir(tmp_path, monkeypatch):
+    """Keep the token files of TCP daemons out of the real runtime directory."""
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+
+
+def test_parse_address():
+    assert parse_address("127.0.0.1:8765") == ("127.0.0.1", 8765)
+    assert parse_address("/run/user/1000/mql5-mcp/daemon.sock") == "/run/user/1000/mql5-mcp/daemon.sock"
+    assert parse_address(r"C:\temp\daemon.sock") == r"C:\temp\daemon.sock"
+
+
+async def search_as_client(address, query):
+    reader, writer = await open_connection(address)
+    async with socket_transport(reader, writer) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            result = await session.call_tool("search_mql5_docs", {"query": query})
+    writer.close()
+    return result.content[0].text
+
+
+async def test_clients_share_one_server(make_server):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(json.loads(request.content)["query"])
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json=gateway_payload("OrderSend"))
+
+    server = make_server(handler, daemon_address="127.0.0.1:0")
+    server.daemon = server._create_daemon()
+    address = await server.daemon.start()
+    serving = asyncio.create_task(server.daemon.serve())
+    try:
+        results = await asyncio.gather(*(search_as_client(address, "OrderSend") for _ in range(3)))
+        later = await search_as_client(address, "OrderSend")
+        while server.daemon.active_sessions:
+            await asyncio.sleep(0.01)
+    finally:
+        serving.cancel()
+        await asyncio.gather(serving, return_exceptions=True)
+
+    assert all("OrderSend.html" in text for text in [*results, later])
+    # Concurrent clients coalesce onto one request and the late one is cached
+    assert calls == ["OrderSend"]
+    metrics = server._collect_server_metrics()
+    assert metrics["daemon"] == {"address": address, "active_sessions": 0, "total_sessions": 4}
+
+
+async def echo_session(read_stream, write_stream):
+    async with write_stream:
+        async for message in read_stream:
+            await write_stream.send(message)
+
+
+async def test_relay_forwards_stdio_until_end_of_input():
+    daemon = SessionDaemon("127.0.0.1:0", echo_session)
+    address = await daemon.start()
+    try:
+        reader, writer = await connect(address)
+        stdin = io.BytesIO(b'{"jsonrpc":"2.0","id":1,"method":"ping"}\n')
+        stdout = io.BytesIO()
+        await asyncio.wait_for(relay(reader, writer, stdin, stdout), 5)
+    finally:
+        daemon.close()
+
+    assert json.loads(stdout.getvalue()) == {"jsonrpc": "2.0", "id": 1, "method": "ping"}
+    assert daemon.total_sessions == 1
+
+
+async def test_tcp_daemon_only_serves_clients_with_its_token():
+    daemon = SessionDaemon("127.0.0.1:0", echo_session)
+    address = await daemon.start()
+    path = token_path(address)
+    try:
+        if hasattr(os, "getuid"):
+            assert oct(path.stat().st_mode & 0o777) == "0o600"
+        host, port = parse_address(address)
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(b"not-the-token\n" + b'{"jsonrpc":"2.0","id":1,"method":"ping"}\n')
+        assert await asyncio.wait_for(reader.read(), 5) == b""
+        writer.close()
+    finally:
+        daemon.close()
+
+    assert daemon.total_sessions == 0
+    assert not path.exists()
+
+
+async def test_connect_without_daemon_or_start_command_fails():
+    with pytest.raises(DaemonUnavailable):
+        await connect("127.0.0.1:1")
+
+
+@unix_sockets
+async def test_second_daemon_refuses_the_address_and_idle_daemon_exits(tmp_path):
+    path = tmp_path / "daemon" / "daemon.sock"
+    daemon = SessionDaemon(str(path), echo_session, idle_timeout_seconds=0.1)
+    await daemon.start()
+    assert oct(path.stat().st_mode & 0o777) == "0o600"
+
+    with pytest.raises(DaemonAlreadyRunning):
+        await SessionDaemon(str(path), echo_session).start()
+
+    await asyncio.wait_for(daemon.serve(), 2)
+    assert not path.exists()
+
+
+@unix_sockets
+async def test_daemons_starting_together_share_one_socket(tmp_path):
+    path = tmp_path / "daemon.sock"
+    daemons = [SessionDaemon(str(path), echo_session) for _ in range(4)]
+    results = await asyncio.gather(*(d.start() for d in daemons), return_exceptions=True)
+    try:
+        assert sum(result == str(path) for result in results) == 1
+        assert sum(isinstance(result, DaemonAlreadyRunning) for result in results) == 3
+    finally:
+        for daemon in daemons:
+            daemon.close()
+
+
+@unix_sockets
+async def test_close_keeps_a_socket_another_daemon_bound(tmp_path):
+    path = tmp_path / "daemon.sock"
+    orphan = SessionDaemon(str(path), echo_session)
+    await orphan.start()
+    path.unlink()
+    replacement = socket.socket(socket.AF_UNIX)
+    replacement.bind(str(path))
+    try:
+        orphan.close()
+        assert path.exists()
+    finally:
+        replacement.close()
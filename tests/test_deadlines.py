@@ -0,0 +1,94 @@
+"""Tests for tool call deadlines and cancellation of abandoned gateway requests."""
+
+import asyncio
+
+import httpx
+import mcp.types as types
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from conftest import gateway_payload
+
+
+def hanging_handler(started: asyncio.Event, aborted: list):
+    """Gateway stand-in that never answers and notes when it is aborted."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            aborted.append(request)
+            raise
+        return httpx.Response(200, json=gateway_payload("OrderSend"))
+
+    return handler
+
+
+async def test_cancelled_search_aborts_its_request_without_a_failure(make_server):
+    started, aborted = asyncio.Event(), []
+    server = make_server(hanging_handler(started, aborted))
+
+    search = asyncio.create_task(server._search_mql5_docs("OrderSend"))
+    await started.wait()
+    search.cancel()
+    await asyncio.gather(search, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert len(aborted) == 1
+    assert server.failure_count == 0
+    assert server._inflight == {} and server._inflight_waiters == {}
+    assert server.abandoned_requests == 1
+    assert server.metrics.counters["gateway_requests_cancelled"] == {(): 1}
+
+
+async def test_request_runs_until_its_last_waiter_leaves(make_server):
+    started, aborted = asyncio.Event(), []
+    server = make_server(hanging_handler(started, aborted), cache_enabled=False)
+
+    first = asyncio.create_task(server._search_mql5_docs("OrderSend"))
+    second = asyncio.create_task(server._search_mql5_docs("OrderSend"))
+    await started.wait()
+    first.cancel()
+    await asyncio.sleep(0.01)
+    assert aborted == []
+
+    second.cancel()
+    await asyncio.gather(first, second, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert len(aborted) == 1
+
+
+async def test_tool_deadline_answers_with_a_timeout_and_frees_the_request(make_server):
+    started, aborted = asyncio.Event(), []
+    server = make_server(hanging_handler(started, aborted), tool_deadline_seconds=0.05)
+
+    with server._tool_deadline():
+        result = await server._search_mql5_docs("OrderSend")
+    await asyncio.sleep(0)
+
+    assert result[0].text == "Search timed out, please try again"
+    assert len(aborted) == 1
+    assert server.failure_count == 0
+    assert server.metrics.counters["tool_deadline_exceeded"] == {(): 1}
+
+
+async def test_mcp_cancellation_reaches_the_gateway_request(make_server):
+    started, aborted = asyncio.Event(), []
+    server = make_server(hanging_handler(started, aborted))
+
+    async with create_connected_server_and_client_session(server.server) as client:
+        call = asyncio.create_task(client.call_tool("search_mql5_docs", {"query": "OrderSend"}))
+        await started.wait()
+        # The initialize request used id 0
+        await client.send_notification(types.ClientNotification(types.CancelledNotification(
+            method="notifications/cancelled",
+            params=types.CancelledNotificationParams(requestId=1, reason="user gave up"),
+        )))
+        for _ in range(100):
+            if aborted:
+                break
+            await asyncio.sleep(0.01)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+
+    assert len(aborted) == 1
+    assert server.failure_count == 0
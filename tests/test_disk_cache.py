@@ -0,0 +1,88 @@
+"""Tests for the persistent SQLite cache."""
+
+import threading
+
+import httpx
+
+from conftest import FakeClock, gateway_payload
+from mql5_disk_cache import DiskCache
+
+
+def test_round_trip_survives_reopen(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = DiskCache(path, max_bytes=1 << 20, ttl_seconds=0)
+    cache.put("5:ordersend", gateway_payload("OrderSend"))
+    cache.close()
+
+    reopened = DiskCache(path, max_bytes=1 << 20, ttl_seconds=0)
+    assert reopened.get("5:ordersend") == gateway_payload("OrderSend")
+    assert reopened.get("5:missing") is None
+    assert reopened.stats() == {"hits": 1, "misses": 1, "compactions": 0}
+
+
+def test_expired_entries_are_misses(tmp_path):
+    clock = FakeClock(1_000_000.0)
+    cache = DiskCache(tmp_path / "cache.sqlite3", max_bytes=1 << 20, ttl_seconds=60, clock=clock)
+    cache.put("k", {"snippets": []})
+    clock.now += 60
+    assert cache.get("k") is None
+
+
+def test_compaction_keeps_recently_used_entries(tmp_path):
+    clock = FakeClock(1_000_000.0)
+    payload_size = len('{"snippets":[],"pad":"' + "x" * 100 + '"}')
+    cache = DiskCache(
+        tmp_path / "cache.sqlite3",
+        max_bytes=payload_size * 3,
+        ttl_seconds=0,
+        clock=clock,
+    )
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        cache.put(key, {"snippets": [], "pad": "x" * 100})
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.put("d", {"snippets": [], "pad": "x" * 100})
+
+    assert cache.compactions == 1
+    assert cache.total_bytes() <= payload_size * 3 * 0.8
+    assert cache.get("a") is not None
+    assert cache.get("d") is not None
+    assert cache.get("b") is None
+
+
+async def test_new_server_process_starts_warm(make_server, tmp_path):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=gateway_payload("CopyRates"))
+
+    first = make_server(handler, disk_cache_enabled=True)
+    await first._search_mql5_docs("CopyRates")
+    await first._close_disk_cache()
+
+    second = make_server(handler, disk_cache_enabled=True)
+    result = await second._search_mql5_docs("copyrates")
+
+    assert len(calls) == 1
+    assert "CopyRates.html" in result[0].text
+    assert (tmp_path / "mql5_rag_cache.sqlite3").exists()
+
+
+async def test_disk_cache_work_runs_off_the_event_loop(make_server):
+    server = make_server(
+        lambda request: httpx.Response(200, json=gateway_payload("CopyRates")),
+        disk_cache_enabled=True, cache_enabled=False
+    )
+    threads = []
+    disk_get, disk_put = server.disk_cache.get, server.disk_cache.put
+    server.disk_cache.get = lambda *args: threads.append(threading.current_thread()) or disk_get(*args)
+    server.disk_cache.put = lambda *args: threads.append(threading.current_thread()) or disk_put(*args)
+
+    await server._search_mql5_docs("CopyRates")
+    await server._close_disk_cache()
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
@@ -0,0 +1,77 @@
+"""Tests for the fuzzy query cache."""
+
+import json
+
+import httpx
+
+from conftest import FakeClock, gateway_payload
+from mql5_fuzzy_cache import FuzzyQueryCache, query_identifiers, query_terms
+
+
+def test_query_terms_drop_stop_words_and_split_identifiers():
+    assert query_terms("How to use ArrayResize in MQL5?") == {"arrayresize", "array", "resize"}
+    assert query_identifiers("How do I call iMA with ORDER_TYPE_BUY") == {"ima", "order_type_buy"}
+
+
+def test_paraphrase_hits_only_for_the_same_max_snippets():
+    cache = FuzzyQueryCache(max_entries=8, threshold=0.75, ttl_seconds=0)
+    cache.put("ArrayResize function", 5, "resize docs")
+
+    assert cache.get("how to use ArrayResize", 5) == "resize docs"
+    assert cache.get("ArrayResize function", 3) is None
+
+    stats = cache.stats.as_dict()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_different_identifiers_never_match():
+    cache = FuzzyQueryCache(max_entries=8, threshold=0.5, ttl_seconds=0)
+    cache.put("OrderSend retcode handling", 5, "ordersend docs")
+
+    assert cache.get("OrderSendAsync retcode handling", 5) is None
+    assert cache.stats.rejected_identifier_mismatch == 1
+
+
+def test_dissimilar_queries_are_rejected():
+    cache = FuzzyQueryCache(max_entries=8, threshold=0.75, ttl_seconds=0)
+    cache.put("copy indicator buffer values", 5, "copy docs")
+
+    assert cache.get("copy indicator buffer values quickly", 5) == "copy docs"
+    assert cache.get("indicator buffer colors and styles", 5) is None
+
+
+def test_eviction_and_expiry_clean_up_buckets():
+    clock = FakeClock()
+    cache = FuzzyQueryCache(max_entries=1, threshold=0.75, ttl_seconds=10, clock=clock)
+    cache.put("open a market position", 5, "first")
+    cache.put("close a market position", 5, "second")
+
+    assert len(cache) == 1 and cache.stats.evictions == 1
+    assert cache.get("open market position", 5) is None
+
+    clock.now = 10.0
+    assert cache.get("close market position", 5) is None
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0 and not cache._buckets
+
+
+async def test_paraphrased_search_skips_the_gateway(make_server):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=gateway_payload("ArrayResize"))
+
+    server = make_server(handler, fuzzy_cache_enabled=True)
+    await server._search_mql5_docs("ArrayResize function")
+    result = await server._search_mql5_docs("how to use ArrayResize")
+    await server._search_mql5_docs("ArrayFree function")
+
+    assert len(calls) == 2
+    assert "ArrayResize.html" in result[0].text
+    assert "**Query:** how to use ArrayResize" in result[0].text
+
+    metrics = json.loads(server._get_server_metrics()[0].text)
+    assert metrics["cache"]["fuzzy"]["hits"] == 1
+    assert metrics["cache"]["fuzzy_entries"] == 2
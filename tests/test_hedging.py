@@ -0,0 +1,113 @@
+"""Tests for latency tracking, adaptive timeouts and hedged requests."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from conftest import gateway_payload
+from mql5_latency import LatencyHistogram
+
+
+def test_histogram_percentiles_follow_sliding_window():
+    histogram = LatencyHistogram(window_size=4)
+    for sample in (0.1, 0.2, 0.3, 0.4, 1.0):
+        histogram.record(sample)
+
+    assert len(histogram) == 4
+    assert histogram.percentile(50) == 0.3
+    assert histogram.percentile(100) == 1.0
+    assert histogram.snapshot()["p99_ms"] == 1000.0
+    assert LatencyHistogram().percentile(95) is None
+
+
+def test_adaptive_timeout_is_clamped_percentile(make_server):
+    server = make_server(
+        adaptive_timeout_enabled=True,
+        latency_min_samples=3,
+        adaptive_timeout_multiplier=2,
+        adaptive_timeout_min_seconds=0.5,
+        adaptive_timeout_max_seconds=3,
+    )
+    assert server._request_timeout() is httpx.USE_CLIENT_DEFAULT
+
+    for sample in (0.4, 0.5, 0.6):
+        server.latency.record(sample)
+    assert server._request_timeout().read == pytest.approx(1.2)
+
+    server.latency.record(5.0)
+    assert server._request_timeout().read == 3
+
+
+async def test_timed_out_requests_count_toward_the_latency_window(make_server):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.05)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    server = make_server(handler, max_retries=0)
+    await server._search_mql5_docs("ArrayFree")
+
+    assert len(server.latency) == 1
+    assert server.latency.percentile(100) >= 0.05
+
+
+async def test_slow_request_is_hedged_and_loser_cancelled(make_server):
+    calls = 0
+    cancelled = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        return httpx.Response(200, json=gateway_payload("OrderSend"))
+
+    server = make_server(handler, hedging_enabled=True, latency_min_samples=1)
+    server.latency.record(0.01)
+    result = await server._search_mql5_docs("OrderSend")
+
+    assert "OrderSend.html" in result[0].text
+    assert calls == 2
+    assert server.hedged_requests == 1
+    assert server.hedge_wins == 1
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+
+async def test_fast_request_is_not_hedged(make_server):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200, json=gateway_payload("iMA"))
+
+    server = make_server(handler, hedging_enabled=True, latency_min_samples=1)
+    server.latency.record(1.0)
+    await server._search_mql5_docs("iMA")
+
+    assert calls == 1
+    assert server.hedged_requests == 0
+
+
+async def test_hedge_survives_one_failed_request(make_server):
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(0.05)
+            raise httpx.ReadTimeout("timed out", request=request)
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json=gateway_payload("iMA"))
+
+    server = make_server(handler, hedging_enabled=True, latency_min_samples=1)
+    server.latency.record(0.01)
+    result = await server._search_mql5_docs("iMA")
+
+    assert "iMA.html" in result[0].text
+    assert server.failure_count == 0
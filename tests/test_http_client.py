@@ -0,0 +1,65 @@
+"""Tests for gateway client construction and connection warm-up."""
+
+import httpx
+
+from conftest import GATEWAY_URL
+
+
+def test_client_uses_configured_pool_and_timeouts(make_server):
+    server = make_server(
+        connect_timeout_seconds=0.5,
+        read_timeout_seconds=3,
+        pool_max_connections=7,
+        pool_max_keepalive_connections=3,
+        keepalive_expiry_seconds=30,
+    )
+    client = server._get_http_client()
+
+    assert client.timeout.connect == 0.5
+    assert client.timeout.read == 3
+    assert client.timeout.write == server.config.timeout_seconds
+    pool = client._transport._pool
+    assert pool._max_connections == 7
+    assert pool._max_keepalive_connections == 3
+    assert pool._keepalive_expiry == 30
+    assert server._get_http_client() is client
+
+
+def test_http2_falls_back_without_h2(make_server, monkeypatch):
+    monkeypatch.setattr("importlib.util.find_spec", lambda name: None)
+    server = make_server(http2=True)
+
+    assert server._get_http_client()._transport._pool._http2 is False
+
+
+async def test_warmup_sends_request_without_touching_breaker(make_server):
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(403)
+
+    server = make_server(handler)
+    server._start_warmup()
+    await server._warmup_task
+
+    assert [(r.method, str(r.url)) for r in requests] == [("OPTIONS", GATEWAY_URL)]
+    assert server.failure_count == 0
+
+
+async def test_warmup_failure_is_ignored(make_server):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("unreachable", request=request)
+
+    server = make_server(handler)
+    server._start_warmup()
+    await server._warmup_task
+
+    assert server.failure_count == 0
+
+
+def test_warmup_skipped_in_local_mode(make_server):
+    server = make_server(search_mode="local")
+    server._start_warmup()
+
+    assert server._warmup_task is None
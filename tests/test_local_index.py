@@ -0,0 +1,100 @@
+"""Tests for the offline BM25 index."""
+
+import httpx
+import pytest
+
+from conftest import gateway_payload
+from mql5_local_index import LocalIndex, build_index, chunk_text, main, tokenize
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "array").mkdir(parents=True)
+    (docs / "array" / "arrayresize.html").write_text(
+        "<html><head><title>ArrayResize</title><style>p {}</style></head><body>"
+        "<h1>ArrayResize</h1><p>The function sets a new size for the first dimension "
+        "of a dynamic array.</p><pre>int ArrayResize(void&amp; array[], int new_size);</pre>"
+        "</body></html>",
+        encoding="utf-8",
+    )
+    (docs / "trade.md").write_text(
+        "# OrderSend\n\nThe OrderSend() function is used for executing trade operations.\n\n"
+        "# PositionSelect\n\nChooses an open position for further working with it.\n",
+        encoding="utf-8",
+    )
+    return docs
+
+
+@pytest.fixture
+def index_path(tmp_path, docs_dir):
+    path = tmp_path / "mql5_docs_index.json.gz"
+    build_index(docs_dir, path, chunk_chars=80)
+    return path
+
+
+def test_tokenize_splits_identifiers():
+    assert tokenize("ArrayResize(ENUM_TIMEFRAMES)") == [
+        "arrayresize", "array", "resize", "enum_timeframes", "enum", "timeframes",
+    ]
+
+
+def test_chunk_text_respects_paragraphs():
+    chunks = chunk_text("first\n\nsecond\n\n\nthird", max_chars=10)
+    assert chunks == ["first", "second", "third"]
+
+
+def test_search_ranks_matching_snippet_first(index_path):
+    index = LocalIndex.load(index_path)
+    results = index.search("resize dynamic array", max_snippets=3)
+
+    top = results["snippets"][0]
+    assert top["source"] == "array/arrayresize.html"
+    assert top["score"] == 1.0
+    assert "p {}" not in top["snippet"]
+    assert index.search("nonexistentterm", max_snippets=3) == {"snippets": []}
+
+
+def test_cli_builds_index(tmp_path, docs_dir):
+    path = tmp_path / "cli.json.gz"
+    assert main(["build", str(docs_dir), str(path)]) == 0
+    assert len(LocalIndex.load(path)) > 0
+
+
+async def test_local_mode_never_calls_gateway(make_server, index_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("gateway must not be called in local mode")
+
+    server = make_server(handler, search_mode="local", local_index_path=str(index_path))
+    result = await server._search_mql5_docs("OrderSend")
+
+    assert "trade.md" in result[0].text
+
+
+async def test_local_fallback_answers_when_gateway_fails(make_server, index_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503)
+
+    server = make_server(handler, search_mode="local_fallback", local_index_path=str(index_path))
+    result = await server._search_mql5_docs("PositionSelect")
+
+    assert "trade.md" in result[0].text
+    assert server.failure_count == 1
+
+
+async def test_remote_mode_ignores_local_index(make_server, index_path):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=gateway_payload("OrderSend"))
+
+    server = make_server(handler, local_index_path=str(index_path))
+    result = await server._search_mql5_docs("OrderSend")
+
+    assert "OrderSend.html" in result[0].text
+    assert server.local_index is None
+
+
+async def test_missing_index_reports_unavailable(make_server, tmp_path):
+    server = make_server(search_mode="local", local_index_path=str(tmp_path / "missing.json.gz"))
+    result = await server._search_mql5_docs("OrderSend")
+
+    assert result[0].text == "Local documentation index unavailable"
@@ -0,0 +1,102 @@
+"""Tests for the queued logging pipeline."""
+
+import logging
+
+import mcp.types as types
+import pytest
+
+from mql5_logging import QueuedLogging, RepeatLimitFilter
+
+
+@pytest.fixture
+def restore_root_logger():
+    root, server_logger = logging.getLogger(), logging.getLogger("mql5_mcp_server")
+    levels, handlers = (root.level, server_logger.level), list(root.handlers)
+    yield
+    root.setLevel(levels[0])
+    server_logger.setLevel(levels[1])
+    root.handlers[:] = handlers
+
+
+def make_record(msg, *args, level=logging.WARNING):
+    return logging.LogRecord("mql5", level, __file__, 1, msg, args, None)
+
+
+def test_repeat_filter_limits_identical_records_per_window():
+    now = [0.0]
+    repeat_filter = RepeatLimitFilter(limit=2, window_seconds=10, clock=lambda: now[0])
+
+    passed = [repeat_filter.filter(make_record("timeout for %s", "OrderSend")) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    # Different arguments are a different message
+    assert repeat_filter.filter(make_record("timeout for %s", "ArrayResize"))
+
+    now[0] = 10.0
+    record = make_record("timeout for %s", "OrderSend")
+    assert repeat_filter.filter(record)
+    assert record.getMessage() == "timeout for OrderSend (3 identical messages suppressed)"
+    assert repeat_filter.suppressed == 3
+
+
+def test_records_are_queued_unformatted_and_written_by_listener(tmp_path, restore_root_logger):
+    log_file = tmp_path / "server.log"
+    pipeline = QueuedLogging()
+    test_logger = logging.getLogger("mql5.test")
+
+    test_logger.info("before start: %s", "queued")
+    record = pipeline.queue.get_nowait()
+    assert record.msg == "before start: %s"
+    pipeline.queue.put(record)
+
+    pipeline.start(log_file=str(log_file))
+    test_logger.info("after start: %d", 42)
+    pipeline.stop()
+
+    lines = log_file.read_text(encoding="utf-8").splitlines()
+    assert lines[0].endswith("mql5.test - INFO - before start: queued")
+    assert lines[1].endswith("mql5.test - INFO - after start: 42")
+
+
+def test_log_file_rotates_at_max_bytes(tmp_path, restore_root_logger):
+    log_file = tmp_path / "server.log"
+    pipeline = QueuedLogging()
+    pipeline.start(log_file=str(log_file), max_bytes=500, backup_count=2)
+    for i in range(40):
+        logging.getLogger("mql5.test").info("line %d %s", i, "x" * 40)
+    pipeline.stop()
+
+    assert (tmp_path / "server.log.1").exists()
+    assert (tmp_path / "server.log.2").exists()
+    assert not (tmp_path / "server.log.3").exists()
+
+
+async def test_set_logging_level_controls_what_is_queued(make_server, restore_root_logger):
+    server = make_server()
+    pipeline = QueuedLogging()
+    handler = server.server.request_handlers[types.SetLevelRequest]
+
+    await handler(types.SetLevelRequest(
+        method="logging/setLevel", params=types.SetLevelRequestParams(level="error")
+    ))
+    while not pipeline.queue.empty():
+        pipeline.queue.get_nowait()
+    logging.getLogger("mql5.test").warning("dropped before the queue")
+    assert pipeline.queue.empty()
+
+    await handler(types.SetLevelRequest(
+        method="logging/setLevel", params=types.SetLevelRequestParams(level="emergency")
+    ))
+    assert logging.getLogger().level == logging.CRITICAL
+    pipeline.stop()
+
+
+async def test_daemon_ignores_client_logging_levels(make_server, restore_root_logger):
+    server = make_server(daemon_address="127.0.0.1:0")
+    server.daemon = server._create_daemon()
+    logging.getLogger().setLevel(logging.INFO)
+    handler = server.server.request_handlers[types.SetLevelRequest]
+
+    await handler(types.SetLevelRequest(
+        method="logging/setLevel", params=types.SetLevelRequestParams(level="emergency")
+    ))
+    assert logging.getLogger().level == logging.INFO
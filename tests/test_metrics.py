@@ -0,0 +1,105 @@
+"""Tests for metrics collection and the get_server_metrics tool."""
+
+import json
+
+import httpx
+import mcp.types as types
+import pytest
+
+from conftest import gateway_payload
+from mql5_metrics import Histogram, MetricsRegistry, write_textfile
+
+
+async def call_tool(server, name, arguments):
+    handler = server.server.request_handlers[types.CallToolRequest]
+    request = types.CallToolRequest(
+        method="tools/call",
+        params=types.CallToolRequestParams(name=name, arguments=arguments),
+    )
+    result = await handler(request)
+    return result.root.content
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram(buckets=(0.1, 0.2, 0.4))
+    for sample in (0.05, 0.15, 0.15, 0.3):
+        histogram.observe(sample)
+
+    assert histogram.count == 4
+    assert histogram.quantile(0.5) == pytest.approx(0.15)
+    assert histogram.summary()["mean_ms"] == 162.5
+
+
+def test_prometheus_rendering(tmp_path):
+    metrics = MetricsRegistry(prefix="test")
+    metrics.observe("json_decode", 0.002)
+    metrics.increment("gateway_responses", status="200")
+    text = metrics.render_prometheus({"result_cache_hits": 3})
+
+    assert 'test_phase_duration_seconds_bucket{phase="json_decode",le="0.0025"} 1' in text
+    assert 'test_phase_duration_seconds_count{phase="json_decode"} 1' in text
+    assert 'test_gateway_responses_total{status="200"} 1' in text
+    assert "test_result_cache_hits 3" in text
+
+    path = tmp_path / "metrics" / "mql5.prom"
+    write_textfile(path, text)
+    assert path.read_text(encoding="utf-8") == text
+
+
+def test_prometheus_label_values_are_escaped():
+    metrics = MetricsRegistry(prefix="test")
+    metrics.increment("gateway_wire_bytes", encoding='gz"ip\\\n')
+    metrics.observe('tool:"odd"', 0.002)
+    text = metrics.render_prometheus()
+
+    assert 'test_gateway_wire_bytes_total{encoding="gz\\"ip\\\\\\n"} 1' in text
+    assert 'test_phase_duration_seconds_count{phase="tool:\\"odd\\""} 1' in text
+
+
+async def test_trace_hook_records_connection_and_ttfb(make_server):
+    server = make_server()
+    trace = server._make_request_trace(started=0.0)
+    await trace("http11.send_request_headers.started", {})
+    await trace("http11.receive_response_headers.complete", {})
+
+    assert server.metrics.phases["connection_acquire"].count == 1
+    assert server.metrics.phases["time_to_first_byte"].count == 1
+
+
+async def test_metrics_tool_reports_search_phases(make_server):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=gateway_payload("OrderSend"))
+
+    server = make_server(handler)
+    await call_tool(server, "search_mql5_docs", {"query": "OrderSend"})
+    await call_tool(server, "search_mql5_docs", {"query": "OrderSend"})
+    content = await call_tool(server, "get_server_metrics", {})
+    metrics = json.loads(content[0].text)
+
+    for phase in ("cache_lookup", "gateway_request", "json_decode", "format_results"):
+        assert metrics["phases"][phase]["count"] >= 1
+    assert metrics["phases"]["gateway_request"]["count"] == 1
+    assert metrics["counters"]["gateway_responses"] == {"status=200": 1}
+    assert metrics["counters"]["tool_calls"]["tool=search_mql5_docs"] == 2
+    assert metrics["cache"]["memory"]["hits"] == 1
+    assert metrics["circuit_breaker"] == {"open": False, "state": "closed", "failure_count": 0}
+
+
+async def test_unknown_tool_names_share_one_series(make_server):
+    server = make_server()
+    for name in ("no_such_tool", "another_made_up_tool"):
+        await call_tool(server, name, {})
+
+    assert server.metrics.counters["tool_calls"] == {(("tool", "unknown"),): 2}
+    assert set(server.metrics.phases) == {"tool:unknown"}
+
+
+async def test_breaker_transitions_are_counted(make_server):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500)
+
+    server = make_server(handler, circuit_breaker_failures=1)
+    await server._search_mql5_docs("OrderSend")
+
+    assert server.metrics.counters["circuit_breaker_transitions"] == {(("state", "open"),): 1}
+    assert "mql5_mcp_circuit_breaker_open 1" in server._render_prometheus_metrics()
@@ -0,0 +1,125 @@
+"""Tests for speculative prefetch of follow-up searches."""
+
+import asyncio
+import json
+
+import httpx
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from conftest import gateway_payload
+from mql5_prefetch import FollowUpModel, Prefetcher, related_queries
+
+
+def test_related_queries_follow_identifiers_in_the_query():
+    assert related_queries("how to use ArrayResize") == ["ArraySize", "ArrayFree", "ArraySetAsSeries"]
+    assert related_queries("closing positions") == []
+
+
+def test_follow_up_model_ranks_and_persists(tmp_path):
+    model = FollowUpModel(max_followers=2)
+    for follower in ["ArraySize", "ArraySize", "ArrayFree", "ArrayCopy", "ArrayCopy", "arraycopy"]:
+        model.record("ArrayResize", follower)
+    model.record("ArrayResize", "arrayresize")
+
+    assert model.followers("arrayresize", limit=5) == ["arraycopy", "arraysize"]
+    assert model.followers("ArrayResize", limit=5, min_count=3) == ["arraycopy"]
+
+    path = tmp_path / "history.json"
+    model.save(path)
+    assert FollowUpModel.load(path).followers("ArrayResize", limit=1) == ["arraycopy"]
+
+    path.write_text("not json", encoding="utf-8")
+    assert len(FollowUpModel.load(path)) == 0
+
+
+async def test_prefetcher_limits_concurrency_and_quota():
+    running = 0
+    peak = 0
+
+    async def fetch(query):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.005)
+        running -= 1
+        return True
+
+    prefetcher = Prefetcher(fetch, concurrency=2, max_pending=4, max_per_minute=3)
+    assert prefetcher.schedule(["a", "b", "c", "d", "e"]) == 4
+    await prefetcher.join()
+
+    assert peak == 2
+    stats = prefetcher.stats
+    assert (stats.fetched, stats.over_quota, stats.dropped) == (3, 1, 1)
+
+
+async def test_prefetcher_waits_for_foreground_searches():
+    fetched = []
+
+    async def fetch(query):
+        fetched.append(query)
+        return True
+
+    prefetcher = Prefetcher(fetch)
+    with prefetcher.foreground():
+        prefetcher.schedule(["a"])
+        await asyncio.sleep(0.01)
+        assert fetched == []
+    await prefetcher.join()
+
+    assert fetched == ["a"]
+
+
+async def test_follow_up_lookups_are_served_from_cache(make_server, tmp_path):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        calls.append(query)
+        return httpx.Response(200, json=gateway_payload(query))
+
+    history_path = tmp_path / "history.json"
+    server = make_server(handler, prefetch_enabled=True, prefetch_history_path=str(history_path))
+
+    await server._search_mql5_docs("ArrayResize")
+    await server.prefetcher.join()
+    result = await server._search_mql5_docs("ArraySize")
+
+    assert calls == ["ArrayResize", "ArraySize", "ArrayFree", "ArraySetAsSeries"]
+    assert "ArraySize.html" in result[0].text
+    metrics = json.loads(server._get_server_metrics()[0].text)
+    assert metrics["cache"]["prefetch"]["fetched"] == 3
+    assert metrics["cache"]["prefetch"]["hits"] == 1
+
+    server.follow_ups.save(history_path)
+    assert "arraysize" in json.loads(history_path.read_text())["followers"]["arrayresize"]
+
+
+async def test_follow_ups_are_learned_per_session(make_server):
+    server = make_server(
+        lambda request: httpx.Response(200, json=gateway_payload("ArrayResize")), prefetch_enabled=True
+    )
+    async with create_connected_server_and_client_session(server.server) as first:
+        async with create_connected_server_and_client_session(server.server) as second:
+            await first.call_tool("search_mql5_docs", {"query": "ArrayResize"})
+            await second.call_tool("search_mql5_docs", {"query": "OrderSend"})
+            await first.call_tool("search_mql5_docs", {"query": "ArrayCopy"})
+    await server.prefetcher.join()
+
+    assert server.follow_ups.followers("ArrayResize", limit=5) == ["arraycopy"]
+    assert server.follow_ups.followers("OrderSend", limit=5) == []
+
+
+async def test_prefetch_is_off_by_default(make_server):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=gateway_payload("ArrayResize"))
+
+    server = make_server(handler)
+    await server._search_mql5_docs("ArrayResize")
+    await asyncio.sleep(0.01)
+
+    assert server.prefetcher is None
+    assert len(calls) == 1
@@ -0,0 +1,113 @@
+"""Tests for client-side rate limiting and retries."""
+
+import httpx
+
+from conftest import FakeClock, gateway_payload
+from mql5_rate_limit import RetryBudget, TokenBucket, backoff_delay
+
+
+def test_token_bucket_queues_after_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0.1
+    assert round(bucket.reserve(), 6) == 0.2
+    clock.now = 1.0
+    assert bucket.reserve() == 0
+
+
+def test_token_bucket_refuses_waits_past_deadline():
+    bucket = TokenBucket(rate=1, burst=1, clock=FakeClock())
+    bucket.reserve()
+
+    assert bucket.reserve(max_wait=0.5) is None
+    assert bucket.throttled == 1
+    assert bucket.tokens == 0
+
+
+def test_retry_budget_limits_retries_to_ratio():
+    budget = RetryBudget(ratio=0.5, max_tokens=1)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.record_request()
+    budget.record_request()
+    assert budget.try_spend()
+    assert budget.exhausted == 1
+
+
+def test_backoff_grows_exponentially_up_to_cap():
+    upper = lambda low, high: high  # noqa: E731
+    assert [backoff_delay(n, 0.1, 0.5, rng=upper) for n in range(4)] == [0.1, 0.2, 0.4, 0.5]
+
+
+async def test_throttled_request_is_retried(make_server):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, json=gateway_payload("ArrayFree"))
+
+    server = make_server(handler, retry_base_delay_seconds=0.001)
+    result = await server._search_mql5_docs("ArrayFree")
+
+    assert "ArrayFree.html" in result[0].text
+    assert server.retries == 2
+
+
+async def test_retries_stop_at_max_retries(make_server):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    server = make_server(handler, max_retries=1, retry_base_delay_seconds=0.001)
+    result = await server._search_mql5_docs("ArrayFree")
+
+    assert result[0].text == "Search timed out, please try again"
+    assert calls == 2
+    assert server.failure_count == 1
+
+
+async def test_retries_respect_global_budget(make_server):
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(429)
+
+    server = make_server(
+        handler, retry_budget_ratio=0, retry_budget_max_tokens=1, retry_base_delay_seconds=0.001
+    )
+    result = await server._search_mql5_docs("ArrayFree")
+
+    assert result[0].text == "Search temporarily throttled"
+    assert calls == 2
+    assert server.retry_budget.exhausted == 1
+
+
+async def test_client_rate_limit_reports_throttling(make_server):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=gateway_payload("x"))
+
+    server = make_server(
+        handler,
+        cache_enabled=False,
+        rate_limit_enabled=True,
+        rate_limit_requests_per_second=0.01,
+        rate_limit_burst=1,
+        retry_deadline_seconds=0.5,
+    )
+    first = await server._search_mql5_docs("first")
+    second = await server._search_mql5_docs("second")
+
+    assert "x.html" in first[0].text
+    assert second[0].text == "Search temporarily throttled"
+    assert server.failure_count == 0
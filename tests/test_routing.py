@@ -0,0 +1,146 @@
+"""Tests for latency-aware routing across several gateway endpoints."""
+
+import asyncio
+import json
+
+import httpx
+
+from conftest import GATEWAY_URL, FakeClock, gateway_payload
+from mql5_breaker import CircuitBreaker
+from mql5_routing import EndpointRouter
+
+EU_URL = "https://eu.execute-api.eu-west-1.amazonaws.com/prod/rag"
+AP_URL = "https://ap.execute-api.ap-southeast-1.amazonaws.com/prod/rag"
+
+
+def make_router(clock=None, **overrides):
+    clock = clock or FakeClock()
+    options = {"explore_ratio": 0}
+    options.update(overrides)
+    return EndpointRouter(
+        ["a", "b", "c"],
+        breaker_factory=lambda url: CircuitBreaker(failure_threshold=2, base_cooldown_seconds=30, clock=clock),
+        **options,
+    )
+
+
+def test_unmeasured_endpoints_first_then_lowest_latency():
+    router = make_router()
+    a, b, c = router.endpoints
+
+    assert router.choose() is a
+    a.observe(0.05, error=False)
+    assert router.choose() is b
+    b.observe(0.01, error=False)
+    c.observe(0.03, error=False)
+
+    assert router.choose() is b
+    assert router.choose(exclude=[b]) is c
+
+
+def test_errors_outweigh_a_small_latency_lead():
+    router = make_router(error_penalty_seconds=1.0)
+    a, b, c = router.endpoints
+    a.observe(0.01, error=False)
+    b.observe(0.02, error=False)
+    c.observe(0.50, error=False)
+
+    a.observe(0.01, error=True)
+
+    assert router.score(a) > router.score(b)
+    assert router.choose() is b
+
+
+def test_open_breakers_are_skipped_and_half_open_ones_only_probed():
+    clock = FakeClock()
+    router = make_router(clock=clock)
+    a, b, c = router.endpoints
+    for endpoint in router.endpoints:
+        endpoint.observe(0.01, error=False)
+
+    a.breaker.record_failure()
+    a.breaker.record_failure()
+    assert router.choose() is b and router.available()
+
+    for endpoint in (b, c):
+        endpoint.breaker.record_failure()
+        endpoint.breaker.record_failure()
+    assert router.choose() is None and router.state() == "open"
+
+    clock.now = 30.0
+    assert router.state() == "half_open"
+    assert router.choose() is a
+    assert router.choose(exclude=[a]) is b
+    a.breaker.record_success()
+    assert router.choose() is a and router.state() == "closed"
+
+
+def gateway_handler(latencies, statuses=None, calls=None):
+    """Stand-in for several regional gateways, keyed by host."""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        if calls is not None:
+            calls.append(host)
+        await asyncio.sleep(latencies[host])
+        status = (statuses or {}).get(host, 200)
+        if status != 200:
+            return httpx.Response(status)
+        return httpx.Response(200, json=gateway_payload(json.loads(request.content)["query"]))
+
+    return handler
+
+
+async def test_traffic_moves_to_the_fastest_endpoint(make_server):
+    calls = []
+    handler = gateway_handler(
+        {"test.execute-api.us-east-1.amazonaws.com": 0.04, "eu.execute-api.eu-west-1.amazonaws.com": 0.005,
+         "ap.execute-api.ap-southeast-1.amazonaws.com": 0.08},
+        calls=calls,
+    )
+    server = make_server(handler, gateway_endpoints=[EU_URL, AP_URL], routing_explore_ratio=0)
+
+    for query in ["OrderSend", "OrderCheck", "OrderCalcMargin", "iMA", "iRSI", "CopyBuffer"]:
+        result = await server._search_mql5_docs(query)
+        assert f"{query}.html" in result[0].text
+
+    assert calls[3:] == ["eu.execute-api.eu-west-1.amazonaws.com"] * 3
+    endpoints = json.loads(server._get_server_metrics()[0].text)["gateway"]["endpoints"]
+    assert [e["url"] for e in endpoints] == [GATEWAY_URL, EU_URL, AP_URL]
+    assert endpoints[1]["requests"] == 4
+
+
+async def test_failing_endpoint_is_taken_out_of_rotation(make_server):
+    calls = []
+    handler = gateway_handler(
+        {"test.execute-api.us-east-1.amazonaws.com": 0.001, "eu.execute-api.eu-west-1.amazonaws.com": 0.01},
+        statuses={"test.execute-api.us-east-1.amazonaws.com": 503},
+        calls=calls,
+    )
+    server = make_server(
+        handler, gateway_endpoints=[EU_URL], circuit_breaker_failures=1, routing_explore_ratio=0
+    )
+
+    first = await server._search_mql5_docs("OrderSend")
+    second = await server._search_mql5_docs("OrderCheck")
+
+    assert first[0].text == "Documentation service error"
+    assert "OrderCheck.html" in second[0].text
+    assert calls == ["test.execute-api.us-east-1.amazonaws.com", "eu.execute-api.eu-west-1.amazonaws.com"]
+    metrics = json.loads(server._get_server_metrics()[0].text)
+    assert [e["breaker"]["state"] for e in metrics["gateway"]["endpoints"]] == ["open", "closed"]
+    assert metrics["circuit_breaker"]["open"] is False
+
+
+async def test_search_unavailable_only_when_every_breaker_is_open(make_server):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500)
+
+    server = make_server(handler, gateway_endpoints=[EU_URL], circuit_breaker_failures=1)
+    await server._search_mql5_docs("OrderSend")
+    assert not server._is_circuit_breaker_open()
+    await server._search_mql5_docs("OrderCheck")
+
+    result = await server._search_mql5_docs("OrderCalcMargin")
+
+    assert result[0].text == "Documentation search temporarily unavailable"
+    assert server.metrics.counters["circuit_breaker_transitions"] == {(("state", "open"),): 2}
@@ -0,0 +1,61 @@
+"""Tests for the config snapshot and startup measurement."""
+
+import json
+
+import yaml
+
+from conftest import GATEWAY_URL
+from mql5_config_snapshot import load_snapshot, save_snapshot, snapshot_path
+from mql5_mcp_server import ServerConfig, _config_schema_fingerprint, measure_startup
+
+
+def write_config(path, **values):
+    path.write_text(yaml.safe_dump({"aws_api_gateway_url": GATEWAY_URL, **values}), encoding="utf-8")
+
+
+def test_snapshot_is_written_and_reused(make_server, tmp_path):
+    make_server(max_snippets=7)
+    assert snapshot_path(tmp_path / "config.yaml").exists()
+
+    server = make_server(max_snippets=7)
+    assert server.config.max_snippets == 7
+    # Built with model_construct from the full dump, not validated from YAML
+    assert server.config.model_fields_set == set(ServerConfig.model_fields)
+
+
+def test_snapshot_is_ignored_after_config_changes(make_server):
+    make_server(max_snippets=7)
+    server = make_server(max_snippets=8)
+
+    assert server.config.max_snippets == 8
+
+
+def test_snapshot_is_ignored_for_other_schema(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    write_config(config_path)
+    save_snapshot(config_path, "old-schema", {"aws_api_gateway_url": GATEWAY_URL})
+
+    assert load_snapshot(config_path, _config_schema_fingerprint()) is None
+    assert load_snapshot(config_path, "old-schema") == {"aws_api_gateway_url": GATEWAY_URL}
+
+
+def test_corrupt_snapshot_falls_back_to_yaml(make_server, tmp_path):
+    make_server(max_snippets=6)
+    snapshot_path(tmp_path / "config.yaml").write_text("{not json", encoding="utf-8")
+
+    server = make_server(max_snippets=6)
+
+    assert server.config.max_snippets == 6
+    snapshot = json.loads(snapshot_path(tmp_path / "config.yaml").read_text(encoding="utf-8"))
+    assert snapshot["config"]["max_snippets"] == 6
+
+
+async def test_measure_startup_reports_handshake(tmp_path, monkeypatch):
+    monkeypatch.setenv("MQL5_RAG_API_KEY", "test-key")
+    config_path = tmp_path / "config.yaml"
+    write_config(config_path, warmup_enabled=False)
+
+    report = await measure_startup(config_path)
+
+    assert set(report) == {"ready_ms", "list_tools_ms", "server_init_ms", "initialize_handshake_ms"}
+    assert report["ready_ms"] > report["server_init_ms"] + report["initialize_handshake_ms"]
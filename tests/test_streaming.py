@@ -0,0 +1,92 @@
+"""Tests for streamed gateway responses and progress notifications."""
+
+import asyncio
+import json
+
+import httpx
+from mcp.shared.memory import create_connected_server_and_client_session
+
+from mql5_streaming import SnippetBroadcast, SnippetParser
+
+PAYLOAD = {
+    "query": "ignored \"snippets\": [",
+    "snippets": [
+        {"snippet": "OrderSend sends a trade request ✓", "source": "OrderSend.html", "score": 0.9},
+        {"snippet": "MqlTradeRequest {\n  ENUM_TRADE_REQUEST_ACTIONS action; }", "source": "MqlTradeRequest.html", "score": 0.7},
+    ],
+    "took_ms": 12,
+}
+
+
+def test_parser_finds_each_snippet_wherever_the_body_is_split():
+    body = json.dumps(PAYLOAD, ensure_ascii=False).encode("utf-8")
+    for size in (1, 2, 7, len(body)):
+        parser = SnippetParser()
+        found = []
+        for i in range(0, len(body), size):
+            found.extend(parser.feed(body[i:i + size]))
+        assert found == PAYLOAD["snippets"]
+
+
+def test_broadcast_replays_earlier_snippets_to_late_subscribers():
+    broadcast = SnippetBroadcast()
+    first, late = [], []
+    broadcast.subscribe(first.append)
+    broadcast.publish({"source": "a"})
+    broadcast.subscribe(late.append)
+    broadcast.publish({"source": "b"})
+    broadcast.unsubscribe(first.append)
+    broadcast.publish({"source": "c"})
+
+    assert [s["source"] for s in first] == ["a", "b"]
+    assert [s["source"] for s in late] == ["a", "b", "c"]
+
+
+def dripping_handler(release: asyncio.Event):
+    """Gateway stand-in that sends the first snippet, then the rest once released."""
+    body = json.dumps(PAYLOAD).encode("utf-8")
+    split = body.index(b'{"snippet": "MqlTradeRequest')
+
+    async def stream():
+        yield body[:split]
+        await release.wait()
+        yield body[split:]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=stream(), headers={"Content-Type": "application/json"})
+
+    return handler
+
+
+async def test_first_snippet_arrives_as_progress_before_the_result(make_server):
+    release = asyncio.Event()
+    server = make_server(dripping_handler(release), streaming_enabled=True)
+    messages = []
+
+    async def on_progress(progress, total, message):
+        messages.append((progress, message))
+        release.set()
+
+    async with create_connected_server_and_client_session(server.server) as client:
+        result = await asyncio.wait_for(
+            client.call_tool("search_mql5_docs", {"query": "OrderSend"}, progress_callback=on_progress), 5
+        )
+
+    assert messages[0][0] == 1
+    assert messages[0][1].startswith("OrderSend: OrderSend.html (relevance 0.90)")
+    text = result.content[0].text
+    assert "OrderSend.html" in text and "MqlTradeRequest.html" in text
+    assert server.metrics.counters["gateway_snippets_streamed"] == {(): 2}
+    assert server.metrics.snapshot()["phases"]["first_snippet"]["count"] == 1
+
+
+async def test_streamed_result_matches_and_is_cached(make_server):
+    release = asyncio.Event()
+    release.set()
+    streamed = make_server(dripping_handler(release), streaming_enabled=True)
+    first = await streamed._search_mql5_docs("OrderSend")
+    again = await streamed._search_mql5_docs("OrderSend")
+
+    plain = make_server(lambda request: httpx.Response(200, json=PAYLOAD))
+    assert first == again == await plain._search_mql5_docs("OrderSend")
+    assert streamed.result_cache.stats.hits == 1
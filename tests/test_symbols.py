@@ -0,0 +1,77 @@
+"""Tests for the MQL5 symbol table fast path."""
+
+import httpx
+
+from conftest import gateway_payload
+from mql5_symbols import Symbol, SymbolTable, render_symbol_match
+
+
+def make_table():
+    return SymbolTable([
+        Symbol(name, "function", f"void {name}();", f"{name} description", f"docs/{name.lower()}")
+        for name in ("PositionGetDouble", "PositionSelect", "PositionsTotal", "OrderSend", "CTrade::Buy")
+    ])
+
+
+def test_exact_lookup_is_case_insensitive_and_accepts_call_syntax():
+    table = make_table()
+
+    assert table.lookup("ordersend").symbols[0].name == "OrderSend"
+    assert table.lookup(" OrderSend() ").exact
+    assert table.lookup("CTrade::Buy").symbols[0].name == "CTrade::Buy"
+
+
+def test_prefix_lookup_lists_matches_in_name_order():
+    table = make_table()
+
+    match = table.lookup("Position*", prefix_limit=2)
+    assert [s.name for s in match.symbols] == ["PositionGetDouble", "PositionSelect"]
+    assert match.truncated and not match.exact
+    assert table.lookup("Zzz*") is None
+
+
+def test_free_text_and_unknown_identifiers_fall_through():
+    table = make_table()
+
+    assert table.lookup("how to send an order") is None
+    assert table.lookup("OrderSendAsync") is None
+
+
+def test_bundled_table_loads_and_renders():
+    table = SymbolTable.load()
+
+    match = table.lookup("ENUM_TIMEFRAMES")
+    text = render_symbol_match(match)
+    assert "PERIOD_H1" in text and "**Kind:** enum" in text
+    assert len(table.prefix("Copy", 50)) >= 5
+
+
+async def test_identifier_queries_skip_the_gateway(make_server):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(200, json=gateway_payload("positions"))
+
+    server = make_server(handler, symbol_lookup_enabled=True)
+    exact = await server._search_mql5_docs("CopyRates")
+    prefix = await server._search_mql5_docs("Position*")
+    await server._search_mql5_docs("how to close all positions")
+
+    assert len(calls) == 1
+    assert "MqlRates rates_array[]" in exact[0].text
+    assert "`PositionSelect`" in prefix[0].text
+    assert server.metrics.snapshot()["counters"]["symbol_lookups"] == {"kind=exact": 1, "kind=prefix": 1}
+
+
+async def test_missing_symbol_table_disables_fast_path(make_server, tmp_path):
+    server = make_server(
+        lambda request: httpx.Response(200, json=gateway_payload("OrderSend")),
+        symbol_lookup_enabled=True,
+        symbol_table_path=str(tmp_path / "missing.json"),
+    )
+
+    result = await server._search_mql5_docs("OrderSend")
+
+    assert "OrderSend.html" in result[0].text
+    assert server._symbol_table_error is not None
@@ -0,0 +1,176 @@
+"""Tests for the query trace recorder and the offline policy simulator."""
+
+import asyncio
+import gzip
+import json
+import logging
+
+import httpx
+import pytest
+
+from conftest import gateway_payload
+from mql5_simulator import CachePolicy, GatewaySettings, LatencyModel, main, simulate
+from mql5_trace import TraceEntry, TraceRecorder, load_entries, read_server_log, read_trace
+
+
+def test_recorder_writes_and_rotates(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    recorder = TraceRecorder(path, max_bytes=100)
+    recorder.record("ordersend", 5, 1000.0, 182.4, "gateway")
+    recorder.record("ordersend", 5, 1001.0, 0.3, "cache")
+    recorder.close()
+    assert [e.o for e in read_trace(path.with_name("trace.jsonl.1"))] == ["gateway", "cache"]
+
+    recorder.record("arrayresize", 5, 1002.0, 90.0, "gateway")
+    recorder.close()
+    assert list(read_trace(path)) == [TraceEntry(t=1002.0, q="arrayresize", n=5, ms=90.0, o="gateway")]
+
+
+def test_read_trace_skips_truncated_lines_and_reads_gzip(tmp_path):
+    path = tmp_path / "trace.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write('{"t": 1, "q": "a", "n": 5, "ms": 2.0, "o": "cache"}\n{"t": 2, "q": "b"')
+    assert [e.q for e in read_trace(path)] == ["a"]
+
+
+def test_read_server_log(tmp_path):
+    path = tmp_path / "mql5_mcp_server.log"
+    path.write_text(
+        "2026-10-17 12:00:00,250 - mql5_mcp_server - INFO - Searching MQL5 docs for query: OrderSend\n"
+        "2026-10-17 12:00:01,000 - mql5_mcp_server - INFO - Search completed, 3 snippets\n"
+        "2026-10-17 12:00:02,500 - mql5_mcp_server - INFO - Cache hit for query: ordersend \n",
+        encoding="utf-8"
+    )
+    entries = list(read_server_log(path))
+    assert [(e.q, e.o) for e in entries] == [("ordersend", "gateway"), ("ordersend", "cache")]
+    assert entries[1].t - entries[0].t == 2.25
+    assert load_entries([path]) == entries
+
+
+async def test_server_records_each_search(make_server, tmp_path):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=gateway_payload("OrderSend"))
+
+    path = tmp_path / "trace.jsonl"
+    server = make_server(handler, trace_enabled=True, trace_path=str(path))
+    await asyncio.gather(server._search_mql5_docs("OrderSend"), server._search_mql5_docs(" ordersend"))
+    await server._search_mql5_docs("ORDERSEND")
+    await server._search_mql5_docs("   ")
+    server.trace.close()
+
+    entries = list(read_trace(path))
+    assert [e.o for e in entries] == ["gateway", "coalesced", "cache"]
+    assert {(e.q, e.n) for e in entries} == {("ordersend", server.config.max_snippets)}
+    assert entries[0].ms >= 10
+    assert len(calls) == 1
+
+
+async def test_prefetch_fetches_are_not_replayed_from_logs(make_server, tmp_path, caplog):
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=gateway_payload(json.loads(request.content)["query"]))
+
+    server = make_server(handler, prefetch_enabled=True)
+    with caplog.at_level(logging.INFO, logger="mql5_mcp_server"):
+        await server._search_mql5_docs("ArrayResize")
+        await server.prefetcher.join()
+    assert server.prefetcher.stats.fetched > 0
+
+    path = tmp_path / "mql5_mcp_server.log"
+    formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    path.write_text("".join(formatter.format(r) + "\n" for r in caplog.records), encoding="utf-8")
+    assert [(e.q, e.o) for e in read_server_log(path)] == [("arrayresize", "gateway")]
+
+
+async def test_server_records_refused_searches(make_server, tmp_path):
+    path = tmp_path / "trace.jsonl"
+    server = make_server(
+        lambda request: httpx.Response(200, json=gateway_payload("OrderSend")),
+        trace_enabled=True, trace_path=str(path),
+        rate_limit_enabled=True, rate_limit_requests_per_second=0.01, rate_limit_burst=1,
+        retry_deadline_seconds=0.01, circuit_breaker_failures=1,
+    )
+    await server._search_mql5_docs("OrderSend")
+    throttled = await server._search_mql5_docs("ArrayResize")
+    server.router.endpoints[0].breaker.record_failure()
+    await server._search_mql5_docs("CopyBuffer")
+    server.trace.close()
+
+    assert throttled[0].text == "Search temporarily throttled"
+    assert [e.o for e in read_trace(path)] == ["gateway", "throttled", "rejected"]
+
+
+def trace(*queries, step=1.0, outcome="gateway"):
+    return [TraceEntry(t=i * step, q=q, n=5, ms=100.0, o=outcome) for i, q in enumerate(queries)]
+
+
+def test_lfu_beats_lru_on_a_hot_query_between_scans():
+    entries = trace(*"aabcaadeaafgaa")
+    latency = LatencyModel.from_entries(entries)
+    lru = simulate(entries, CachePolicy.parse("lru:2:0"), latency)
+    lfu = simulate(entries, CachePolicy.parse("lfu:2:0"), latency)
+    none = simulate(entries, CachePolicy("none"), latency)
+
+    assert none.gateway_calls == len(entries) and none.hits == 0
+    assert lfu.hits > lru.hits
+    assert lfu.gateway_calls == lfu.searches - lfu.hits
+    assert lfu.latency_saved_s == pytest.approx(lfu.hits * 0.1)
+
+
+def test_ttl_and_coalescing():
+    entries = trace("a", "a", "a", step=0.05)
+    latency = LatencyModel(gateway_ms=80.0)
+    result = simulate(entries, CachePolicy.parse("lru:10:0.07"), latency)
+    # The second search joins the first call, which has expired by the third
+    assert (result.coalesced, result.hits, result.gateway_calls) == (1, 0, 2)
+
+
+def test_rate_limit_and_breaker():
+    entries = trace(*"abcdefgh", step=0.01)
+    throttled = simulate(entries, CachePolicy("none"), LatencyModel(), GatewaySettings(rate_limit=(1, 2), max_wait_seconds=0))
+    assert (throttled.gateway_calls, throttled.throttled) == (2, 6)
+
+    unsent = trace(*"abcdefgh", step=0.01, outcome="rejected")
+    replayed = simulate(unsent, CachePolicy("none"), LatencyModel(), GatewaySettings(breaker={"failure_threshold": 3}))
+    assert (replayed.gateway_calls, replayed.unsent, replayed.breaker_trips) == (0, 8, 0)
+
+    failing = trace(*"abcdefgh", step=0.01, outcome="error")
+    broken = simulate(failing, CachePolicy("none"), LatencyModel(), GatewaySettings(breaker={"failure_threshold": 3}))
+    assert (broken.gateway_calls, broken.breaker_rejected, broken.breaker_trips) == (3, 5, 1)
+
+
+def test_cli_writes_a_report(tmp_path, capsys):
+    path = tmp_path / "trace.jsonl"
+    path.write_text("".join(
+        json.dumps({"t": e.t, "q": e.q, "n": e.n, "ms": e.ms, "o": e.o}) + "\n" for e in trace(*"abab")
+    ), encoding="utf-8")
+    output = tmp_path / "report.json"
+
+    assert main([str(path), "--policy", "lfu:10:0", "--output", str(output)]) == 0
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert [r["policy"] for r in report["results"]] == ["none", "lfu:10:0"]
+    assert report["results"][1]["hit_rate"] == 0.5
+    assert "lfu:10:0" in capsys.readouterr().out
+
+    assert main([str(path), "--policy", "mru:10:0"]) == 2
+
+
+def test_cli_reads_a_config_without_writing_its_snapshot(tmp_path, capsys):
+    path = tmp_path / "trace.jsonl"
+    path.write_text("".join(
+        json.dumps({"t": e.t, "q": e.q, "n": e.n, "ms": e.ms, "o": e.o}) + "\n" for e in trace(*"abab")
+    ), encoding="utf-8")
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        "aws_api_gateway_url: https://example.com/rag\n"
+        "cache_eviction_policy: lfu\ncache_max_entries: 7\ncache_ttl_seconds: 60\n",
+        encoding="utf-8"
+    )
+
+    assert main([str(path), "--policy", "lru:10:0", "--config", str(config_path)]) == 0
+    assert "lfu:7:60" in capsys.readouterr().out
+    assert set(tmp_path.iterdir()) == {path, config_path}
+    assert main([str(path), "--config", str(tmp_path / "missing.yaml")]) == 2
@@ -0,0 +1,60 @@
+"""Tests for the NumPy vector index."""
+
+import httpx
+import pytest
+
+from mql5_vector_index import VectorIndex, build_vector_index
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    (docs / "arrays.md").write_text(
+        "ArrayResize sets a new size for the first dimension of a dynamic array.\n\n"
+        "ArrayFree frees up the buffer of any dynamic array.\n",
+        encoding="utf-8",
+    )
+    (docs / "trade.md").write_text(
+        "OrderSend is used for executing trade operations by sending requests to a trade server.\n",
+        encoding="utf-8",
+    )
+    path = tmp_path / "vectors"
+    build_vector_index(docs, path, dim=64, chunk_chars=40)
+    return path
+
+
+def test_vectors_are_contiguous_normalized_float32(index_dir):
+    index = VectorIndex.load(index_dir)
+
+    assert isinstance(index.vectors, np.memmap)
+    assert index.vectors.dtype == np.float32
+    assert index.vectors.flags["C_CONTIGUOUS"]
+    assert np.allclose(np.linalg.norm(index.vectors, axis=1), 1.0, atol=1e-5)
+    index.close()
+
+
+def test_search_returns_most_similar_snippet(index_dir):
+    index = VectorIndex.load(index_dir)
+    results = index.search("send a trade request", max_snippets=2)
+
+    assert results["snippets"][0]["source"] == "trade.md"
+    assert 0 < results["snippets"][0]["score"] <= 1.0
+    assert len(results["snippets"]) <= 2
+    assert index.search("", max_snippets=2) == {"snippets": []}
+    index.close()
+
+
+async def test_server_uses_vector_backend(make_server, index_dir):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("gateway must not be called in local mode")
+
+    server = make_server(
+        handler, search_mode="local", local_backend="vector", local_index_path=str(index_dir)
+    )
+    result = await server._search_mql5_docs("free dynamic array buffer")
+
+    assert isinstance(server.local_index, VectorIndex)
+    assert "arrays.md" in result[0].text
@@ -0,0 +1,77 @@
+"""Tests for response compression and body format negotiation."""
+
+import gzip
+import json
+
+import httpx
+import pytest
+
+from conftest import gateway_payload
+from mql5_wire import accept_encoding, accept_header, decode_payload, payload_format
+
+
+def test_accept_encoding_keeps_only_decodable_encodings():
+    assert accept_encoding(["gzip", "deflate"]) == "gzip, deflate"
+    assert accept_encoding(["compress"]) == "identity"
+    assert accept_encoding([]) == "identity"
+
+
+def test_accept_encoding_follows_the_decoders_httpx_supports(monkeypatch):
+    decoders = {k: v for k, v in httpx._decoders.SUPPORTED_DECODERS.items() if k not in ("br", "zstd")}
+    monkeypatch.setattr(httpx._decoders, "SUPPORTED_DECODERS", decoders)
+    assert accept_encoding(["zstd", "br", "gzip"]) == "gzip"
+
+    monkeypatch.setitem(decoders, "zstd", httpx._decoders.GZipDecoder)
+    assert accept_encoding(["zstd", "br", "gzip"]) == "zstd, gzip"
+
+
+def test_payload_format_and_json_decoding():
+    assert payload_format("application/msgpack") == "msgpack"
+    assert payload_format("application/json; charset=utf-8") == "json"
+    assert payload_format("") == "json"
+    assert decode_payload(b'{"snippets": []}', "json") == {"snippets": []}
+    with pytest.raises(ValueError):
+        decode_payload(b"{", "json")
+
+
+async def test_compressed_responses_are_decoded_and_measured(make_server):
+    seen = []
+    body = json.dumps(gateway_payload("OrderSend" * 50)).encode("utf-8")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers)
+        return httpx.Response(
+            200,
+            content=gzip.compress(body),
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+
+    server = make_server(handler, gateway_compression=["gzip"], gateway_response_format="json")
+    result = await server._search_mql5_docs("OrderSend")
+
+    assert "OrderSend" in result[0].text
+    assert seen[0]["accept-encoding"] == "gzip"
+    assert seen[0]["accept"] == "application/json"
+    counters = server.metrics.snapshot()["counters"]
+    assert counters["gateway_payload_bytes"] == {"format=json": len(body)}
+    assert counters["gateway_wire_bytes"]["encoding=gzip"] < len(body)
+
+
+async def test_msgpack_responses_are_decoded(make_server):
+    msgpack = pytest.importorskip("msgpack")
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["accept"])
+        return httpx.Response(
+            200,
+            content=msgpack.packb(gateway_payload("CopyRates")),
+            headers={"Content-Type": "application/msgpack"},
+        )
+
+    server = make_server(handler)
+    result = await server._search_mql5_docs("CopyRates")
+
+    assert seen == [accept_header("auto")]
+    assert "CopyRates.html" in result[0].text
+    assert "msgpack_decode" in server.metrics.snapshot()["phases"]